@@ -1,17 +1,82 @@
+import threading
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple
 from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+
+from .charset import get_charset_resolver
+from .extraction_profiles import get_extraction_profiles
+from .html_parser import HtmlParser
+from .http_client import DEFAULT_HEADERS, get_http_client
+from .seen_index import content_hash, get_seen_index, is_identifying_content, normalize_url
 
 class NewItem:
-    """新聞項目類"""
+    """新聞項目類（固定欄位，不建立__dict__）"""
+    
+    __slots__ = (
+        'title', 'content', 'url', 'published_time', 'source', 'keyword',
+        'priority_score', 'content_hash', 'canonical_url', 'fetch_latency', 'body_fetched'
+    )
+    
     def __init__(self, title: str, content: str, url: str, 
-                 published_time: datetime, source: str, keyword: str):
+                 published_time: datetime, source: str, keyword: str,
+                 priority_score: float = 0.0, content_hash: Optional[str] = None,
+                 canonical_url: Optional[str] = None, fetch_latency: Optional[float] = None,
+                 body_fetched: bool = False):
         self.title = title
         self.content = content
         self.url = url
         self.published_time = published_time
         self.source = source
         self.keyword = keyword  # 相關的關鍵詞
+        self.priority_score = priority_score  # 相關性分數
+        self.content_hash = content_hash  # 內容雜湊（延後計算）
+        self.canonical_url = canonical_url or normalize_url(url)  # 正規化網址
+        self.fetch_latency = fetch_latency  # 抓取全文耗時（秒）
+        self.body_fetched = body_fetched  # 是否已抓取全文
+    
+    def compute_hash(self) -> str:
+        """計算並快取內容雜湊"""
+        if self.content_hash is None:
+            self.content_hash = content_hash(self.content)
+        return self.content_hash
+    
+    def identity_hash(self) -> Optional[str]:
+        """供已處理索引比對的內容雜湊；空內容或抓取失敗的佔位文字返回None，只以網址比對"""
+        if not is_identifying_content(self.content, self.body_fetched):
+            return None
+        return self.compute_hash()
+    
+    def to_row(self) -> Tuple:
+        """轉為可存入資料庫的列（時間以timestamp保存）"""
+        return (
+            self.title, self.content, self.url, self.published_time.timestamp(), self.source, self.keyword,
+            self.priority_score, self.content_hash, self.canonical_url, self.fetch_latency, int(self.body_fetched)
+        )
+    
+    @classmethod
+    def from_row(cls, row: Sequence) -> 'NewItem':
+        """由to_row的結果還原"""
+        (title, content, url, timestamp, source, keyword,
+         priority_score, hash_value, canonical_url, fetch_latency, body_fetched) = row
+        return cls(
+            title, content, url, datetime.fromtimestamp(timestamp), source, keyword,
+            priority_score=priority_score, content_hash=hash_value, canonical_url=canonical_url,
+            fetch_latency=fetch_latency, body_fetched=bool(body_fetched)
+        )
+    
+    def to_dict(self, summary: str) -> Dict[str, Any]:
+        """轉為通知器使用的摘要項目"""
+        return {
+            'title': self.title,
+            'summary': summary,
+            'url': self.url,
+            'source': self.source,
+            'keyword': self.keyword,
+            'published_time': self.published_time.strftime("%Y-%m-%d %H:%M")
+        }
     
     def __repr__(self) -> str:
         return f"News(title={self.title}, source={self.source}, keyword={self.keyword})"
@@ -25,12 +90,65 @@ class BaseCrawler(ABC):
         self.search_terms = config['search_terms']
         self.max_news_per_term = config.get('max_news_per_term', 3)
         self.time_period = config.get('time_period', '1d')
+        self._cancel_event = threading.Event()
+        
+        # 共用的HTTP抓取層（每個主機獨立限速）
+        self.http = get_http_client(config)
+        self.headers = dict(DEFAULT_HEADERS)
+        self.html_parser = HtmlParser(config.get('html_parser', 'lxml'))
+        self.charsets = get_charset_resolver(config)
+        
+        # 各網域學到的內文選擇器
+        self.extraction_profiles = get_extraction_profiles(config)
+        
+        # 跨執行的已處理文章索引，已處理過的文章不再抓取
+        self.seen_index = get_seen_index(config)
     
     @abstractmethod
     def crawl(self) -> List[NewItem]:
         """執行爬蟲並返回新聞列表"""
         pass
     
+    def iter_crawl(self) -> Iterator[NewItem]:
+        """逐則產出新聞；預設包裝crawl()，可串流的爬蟲可覆寫"""
+        yield from self.crawl()
+    
+    def cancel(self):
+        """要求爬蟲盡快停止"""
+        self._cancel_event.set()
+    
+    def is_cancelled(self) -> bool:
+        """是否已被要求停止"""
+        return self._cancel_event.is_set()
+    
+    def _is_seen(self, url: str) -> bool:
+        """文章是否已在先前的執行中處理過"""
+        return bool(self.seen_index and self.seen_index.contains(url=url))
+    
+    def _fetch(self, url: str, **kwargs) -> requests.Response:
+        """透過共用HTTP層抓取網頁，並在爬蟲取消時中止等待"""
+        kwargs.setdefault('headers', self.headers)
+        response = self.http.get(url, cancel_event=self._cancel_event, **kwargs)
+        response.raise_for_status()
+        return response
+    
+    def _decode(self, response: requests.Response) -> str:
+        """依標頭、<meta charset>或主機快取判斷編碼後取得文字"""
+        return self.charsets.apply(response).text
+    
+    def _extract_article(self, url: str, html: str) -> str:
+        """擷取文章內文，優先使用該網域學到的選擇器"""
+        if not self.extraction_profiles:
+            content_text, _ = self.html_parser.extract_article(html)
+            return content_text
+        
+        domain = urlparse(url).netloc.lower()
+        content_text, selector = self.html_parser.extract_article(
+            html, selectors=self.extraction_profiles.selectors_for(domain)
+        )
+        self.extraction_profiles.record(domain, selector, len(content_text), len(html))
+        return content_text
+    
     def sort_by_priority(self, news_items: List[NewItem]) -> List[NewItem]:
         """根據關鍵詞優先順序排序新聞"""
         # 為每個關鍵詞創建優先級順序映射
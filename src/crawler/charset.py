@@ -0,0 +1,125 @@
+import codecs
+import re
+import threading
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+from loguru import logger
+
+import requests
+
+try:
+    import chardet
+    CHARDET_AVAILABLE = True
+except ImportError:  # chardet列於requirements，缺少時只以UTF-8試解
+    CHARDET_AVAILABLE = False
+
+# 常見編碼改用其超集合，避免罕用字解碼失敗
+CHARSET_ALIASES = {
+    'big5': 'cp950',
+    'big5-tw': 'cp950',
+    'x-x-big5': 'cp950',
+    'gb2312': 'gb18030',
+    'gbk': 'gb18030',
+    'ascii': 'utf-8',
+    'us-ascii': 'utf-8',
+}
+
+_HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+_META_CHARSET = re.compile(
+    rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE
+)
+
+
+def normalize_charset(name: Optional[str]) -> Optional[str]:
+    """統一編碼名稱，無法識別時返回None"""
+    if not name:
+        return None
+    name = name.strip().strip('"\'').lower()
+    name = CHARSET_ALIASES.get(name, name)
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+class CharsetResolver:
+    """判斷回應的文字編碼：HTTP標頭 → 頁首<meta charset> → 主機快取 → 抽樣偵測"""
+
+    def __init__(self, meta_scan_bytes: int = 4096, sample_bytes: int = 16384):
+        self.meta_scan_bytes = meta_scan_bytes
+        self.sample_bytes = sample_bytes
+        self._host_charsets: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _from_header(response: requests.Response) -> Optional[str]:
+        """Content-Type標頭中的charset"""
+        match = _HEADER_CHARSET.search(response.headers.get('Content-Type', ''))
+        return normalize_charset(match.group(1)) if match else None
+
+    def _from_meta(self, content: bytes) -> Optional[str]:
+        """文件開頭的 <meta charset> 或 http-equiv 宣告"""
+        match = _META_CHARSET.search(content[:self.meta_scan_bytes])
+        return normalize_charset(match.group(1).decode('ascii', 'ignore')) if match else None
+
+    def _detect(self, content: bytes) -> str:
+        """只對有限長度的樣本做偵測"""
+        sample = content[:self.sample_bytes]
+        try:
+            sample.decode('utf-8')
+            return 'utf-8'
+        except UnicodeDecodeError as e:
+            # 樣本截斷在多位元組字元中間時仍視為UTF-8
+            if e.start >= len(sample) - 3 and e.reason == 'unexpected end of data':
+                return 'utf-8'
+
+        if CHARDET_AVAILABLE:
+            detected = normalize_charset(chardet.detect(sample).get('encoding'))
+            if detected:
+                return detected
+        return 'utf-8'
+
+    def resolve(self, response: requests.Response) -> str:
+        """判斷回應的編碼"""
+        charset = self._from_header(response)
+        if charset:
+            return charset
+
+        content = response.content or b''
+        charset = self._from_meta(content)
+        if charset:
+            return charset
+
+        host = urlparse(response.url or '').netloc.lower()
+        with self._lock:
+            charset = self._host_charsets.get(host)
+        if charset:
+            return charset
+
+        charset = self._detect(content)
+        with self._lock:
+            self._host_charsets[host] = charset
+        logger.debug(f"🔤 {host} 偵測編碼為 {charset}")
+        return charset
+
+    def apply(self, response: requests.Response) -> requests.Response:
+        """設定回應的編碼，之後讀取response.text即以此解碼"""
+        response.encoding = self.resolve(response)
+        return response
+
+
+_shared_resolver: Optional[CharsetResolver] = None
+_shared_lock = threading.Lock()
+
+
+def get_charset_resolver(config: Dict[str, Any]) -> CharsetResolver:
+    """取得共用的編碼判斷器，讓各爬蟲共享主機編碼快取"""
+    global _shared_resolver
+    with _shared_lock:
+        if _shared_resolver is None:
+            charset_config = config.get('charset', {}) or {}
+            _shared_resolver = CharsetResolver(
+                meta_scan_bytes=charset_config.get('meta_scan_bytes', 4096),
+                sample_bytes=charset_config.get('sample_bytes', 16384)
+            )
+        return _shared_resolver
@@ -0,0 +1,88 @@
+import hashlib
+import re
+from collections import defaultdict
+from typing import List, Dict, Any
+
+from .base_crawler import NewItem
+
+SIMHASH_BITS = 64
+
+# 計算指紋前移除空白與標點，只保留文字與數字
+_NON_WORD_PATTERN = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def _shingles(text: str, size: int) -> List[str]:
+    """將文字切成字元n-gram"""
+    text = _NON_WORD_PATTERN.sub('', text or '').lower()
+    if len(text) <= size:
+        return [text] if text else []
+    return [text[i:i + size] for i in range(len(text) - size + 1)]
+
+
+def simhash(text: str, shingle_size: int = 2) -> int:
+    """計算64位元SimHash指紋"""
+    weights = [0] * SIMHASH_BITS
+    for shingle in _shingles(text, shingle_size):
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """兩個指紋間的漢明距離"""
+    return bin(a ^ b).count('1')
+
+
+class NearDuplicateDetector:
+    """以SimHash + LSH分段索引找出跨來源的近似重複新聞"""
+
+    def __init__(self, config: Dict[str, Any]):
+        dedup_config = config.get('dedup', {}) or {}
+        self.max_distance = dedup_config.get('max_distance', 6)
+        self.shingle_size = dedup_config.get('shingle_size', 2)
+        self.content_chars = dedup_config.get('content_chars', 200)
+
+        # 分段數大於容許距離時，由鴿籠原理保證相似指紋至少有一段完全相同
+        self.bands = self.max_distance + 1
+        self.band_bits = SIMHASH_BITS // self.bands
+
+        # 增量索引：分段鍵 -> [(指紋, 群組編號)]
+        self._stream_buckets = defaultdict(list)
+        self._next_cluster_id = 0
+
+    def fingerprint(self, item: NewItem) -> int:
+        """以標題加內容開頭計算指紋"""
+        return simhash(f"{item.title} {(item.content or '')[:self.content_chars]}", self.shingle_size)
+
+    def _band_keys(self, fingerprint: int) -> List[tuple]:
+        """將指紋切成LSH分段鍵"""
+        mask = (1 << self.band_bits) - 1
+        return [(band, fingerprint >> (band * self.band_bits) & mask) for band in range(self.bands)]
+
+    def assign(self, item: NewItem) -> int:
+        """將新聞加入增量索引並返回所屬群組編號（新群組則配發新編號）"""
+        fingerprint = self.fingerprint(item)
+        band_keys = self._band_keys(fingerprint)
+
+        cluster_id = None
+        for key in band_keys:
+            for other, other_cluster in self._stream_buckets[key]:
+                if hamming_distance(fingerprint, other) <= self.max_distance:
+                    cluster_id = other_cluster
+                    break
+            if cluster_id is not None:
+                break
+
+        if cluster_id is None:
+            cluster_id = self._next_cluster_id
+            self._next_cluster_id += 1
+
+        for key in band_keys:
+            self._stream_buckets[key].append((fingerprint, cluster_id))
+        return cluster_id
@@ -0,0 +1,85 @@
+import threading
+from typing import List, Dict, Any, Optional
+from loguru import logger
+
+from .html_parser import DEFAULT_CONTENT_SELECTORS
+from .state_store import StateStore
+from .utils import resolve_data_path
+
+
+class ExtractionProfileCache:
+    """每個網域的內文擷取設定檔 - 記住成功的選擇器與文字密度，版面改變時重新學習"""
+
+    def __init__(self, path: str, relearn_after: int = 3, density_drop: float = 0.3):
+        self.store = StateStore(path)
+        self.relearn_after = relearn_after  # 連續失準幾次後放棄已學到的選擇器
+        self.density_drop = density_drop  # 文字密度低於平均值的此比例視為失準
+        self._lock = threading.Lock()
+
+    def selectors_for(self, domain: str) -> List[str]:
+        """返回該網域的選擇器順序：已學到的選擇器優先"""
+        profile = self.store.get(domain)
+        if not profile or not profile.get('selector'):
+            return list(DEFAULT_CONTENT_SELECTORS)
+        winner = profile['selector']
+        return [winner] + [selector for selector in DEFAULT_CONTENT_SELECTORS if selector != winner]
+
+    def record(self, domain: str, selector: Optional[str], text_length: int, html_length: int):
+        """記錄一次擷取結果，更新命中統計或累計失準次數"""
+        density = text_length / html_length if html_length else 0.0
+
+        with self._lock:
+            profile = dict(self.store.get(domain) or {})
+            learned = profile.get('selector')
+
+            if selector and selector == learned and density >= profile.get('avg_density', 0) * self.density_drop:
+                # 已學到的選擇器仍然有效，更新移動平均
+                hits = profile.get('hits', 0) + 1
+                profile['hits'] = hits
+                profile['misses'] = 0
+                profile['avg_length'] = profile.get('avg_length', 0) + (text_length - profile.get('avg_length', 0)) / hits
+                profile['avg_density'] = profile.get('avg_density', 0) + (density - profile.get('avg_density', 0)) / hits
+            elif learned:
+                # 已學到的選擇器未命中或文字密度驟降
+                profile['misses'] = profile.get('misses', 0) + 1
+                if profile['misses'] >= self.relearn_after:
+                    logger.info(f"🔁 {domain} 的版面可能已變更，重新學習內文選擇器 (原為 {learned})")
+                    profile = {}
+                if selector and not profile:
+                    profile = self._new_profile(selector, text_length, density)
+            elif selector:
+                profile = self._new_profile(selector, text_length, density)
+                logger.debug(f"📐 學到 {domain} 的內文選擇器: {selector}")
+
+            if profile:
+                self.store.set(domain, profile)
+
+    @staticmethod
+    def _new_profile(selector: str, text_length: int, density: float) -> Dict[str, Any]:
+        """建立新的網域設定檔"""
+        return {'selector': selector, 'hits': 1, 'misses': 0, 'avg_length': text_length, 'avg_density': density}
+
+    def save(self):
+        """寫入磁碟"""
+        self.store.save()
+
+
+_shared_profiles: Optional[ExtractionProfileCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_extraction_profiles(config: Dict[str, Any]) -> Optional[ExtractionProfileCache]:
+    """取得共用的網域擷取設定檔快取，未啟用時返回None"""
+    global _shared_profiles
+    profile_config = config.get('extraction_profiles', {}) or {}
+    if not profile_config.get('enabled', True):
+        return None
+
+    with _shared_lock:
+        if _shared_profiles is None:
+            _shared_profiles = ExtractionProfileCache(
+                resolve_data_path(config, 'extraction_profiles.json'),
+                relearn_after=profile_config.get('relearn_after', 3),
+                density_drop=profile_config.get('density_drop', 0.3)
+            )
+        return _shared_profiles
@@ -1,14 +1,13 @@
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
 import time
-import random
-from typing import List, Dict, Any
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from urllib.parse import urljoin
 from loguru import logger
-import chardet
 
 from .base_crawler import BaseCrawler, NewItem
+from .keyword_matcher import KeywordMatcher
+from .scoring import RelevanceScorer
+from .time_extractor import PublishTimeExtractor, parse_datetime
 
 class FinanceNewsDirectCrawler(BaseCrawler):
     """放寬條件的財經新聞直接爬蟲"""
@@ -52,7 +51,8 @@ class FinanceNewsDirectCrawler(BaseCrawler):
                 "name": "工商時報-財經",
                 "url": "https://ctee.com.tw/category/financial",
                 "article_selector": "a",
-                "base_url": "https://ctee.com.tw"
+                "base_url": "https://ctee.com.tw",
+                "date_pattern": r"/news/(\d{8})"  # 文章網址以日期開頭，如 /news/20240501700123-430101
             }
         ]
         
@@ -73,112 +73,170 @@ class FinanceNewsDirectCrawler(BaseCrawler):
         self.exclude_keywords = [
             "股東大會決議", "配息除息公告", "財報法說會"
         ]
+        
+        # 列表頁標題預篩選用的相關詞彙
+        self.prefilter_keywords = [
+            "保險", "壽險", "人壽", "新光", "台新", "理賠", "保單", "保費", 
+            "健康險", "醫療險", "意外險", "投保", "承保", "給付", "金控",
+            "投資型", "利變", "年金", "儲蓄險", "風險", "保障"
+        ]
+        
+        # 發布時間判斷：列表頁時間元素、網址日期，必要時才讀取文章頁首
+        publish_time_config = config.get('publish_time', {}) or {}
+        self.time_extractor = PublishTimeExtractor(publish_time_config.get('head_bytes', 32768))
+        self.head_fetch = publish_time_config.get('head_fetch', True)
+        self.head_budget = publish_time_config.get('head_budget', 60)
+        self.keep_undated = publish_time_config.get('keep_undated', True)
+        
+        # 內文補抓：通過篩選的候選才抓全文，以有上限的工作池與每次執行的請求數預算控制；
+        # 文章頁由共用HTTP層的本地快取（article類）保存，快取命中不計入請求數
+        body_config = config.get('finance_body_fetch', {}) or {}
+        self.body_fetch_enabled = body_config.get('enabled', True)
+        self.body_fetch_workers = body_config.get('workers', 4)
+        self.body_fetch_max_requests = body_config.get('max_requests', 30)
+        self.body_fetch_budget = body_config.get('budget', 90)  # 整次執行補抓的時間預算（秒）
+        self._body_requests_left = self.body_fetch_max_requests
+        self._body_deadline = 0.0
+        
+        # 預先編譯的關鍵詞比對器，每段文字只掃描一次
+        self.keyword_matcher = KeywordMatcher(self.broad_keywords)
+        self.exclude_matcher = KeywordMatcher(self.exclude_keywords)
+        self.prefilter_matcher = KeywordMatcher(self.prefilter_keywords)
+        self.scorer = RelevanceScorer(config)
     
-    def _detect_encoding(self, content_bytes):
-        """檢測編碼"""
+    def iter_crawl(self) -> Iterator[NewItem]:
+        """各網站並行爬取，每完成一個網站即篩選、補抓全文並產出"""
+        # 全文補抓的請求數與時間預算由整次執行的所有網站共用
+        self._body_requests_left = self.body_fetch_max_requests
+        self._body_deadline = time.monotonic() + self.body_fetch_budget
+        total = 0
         try:
-            encodings = ['utf-8', 'big5', 'gb2312']
-            for encoding in encodings:
-                try:
-                    decoded = content_bytes.decode(encoding)
-                    return encoding
-                except:
-                    continue
-            return 'utf-8'
-        except:
-            return 'utf-8'
+            # 禮貌延遲由共用HTTP層依主機控制
+            for site, news_items in self.http.imap(self._crawl_site, self.sites):
+                if self.is_cancelled():
+                    break
+                logger.info(f"✅ 從 {site['name']} 爬取到 {len(news_items)} 條新聞")
+                
+                # 以統一的相關性評分排序，請求數預算優先用於較相關的新聞
+                relevant_news = self.scorer.rank(self._filter_news(news_items))
+                
+                # 補抓全文（內文評分由下游的統一評分處理）
+                if self.body_fetch_enabled and relevant_news:
+                    self._fetch_bodies(relevant_news)
+                
+                for item in relevant_news:
+                    if self.is_cancelled():
+                        break
+                    total += 1
+                    yield item
+        finally:
+            if self.extraction_profiles:
+                self.extraction_profiles.save()
+        
+        logger.info(f"🎯 財經直接爬蟲篩選完成，共 {total} 條相關新聞")
     
     def crawl(self) -> List[NewItem]:
         """爬取財經新聞網站的新聞"""
-        all_news = []
-        
-        for site in self.sites:
-            site_name = site["name"]
-            logger.info(f"🏢 正在爬取網站: {site_name}")
-            
-            try:
-                news_items = self._crawl_site(site)
-                all_news.extend(news_items)
-                time.sleep(random.uniform(1, 3))
-                logger.info(f"✅ 從 {site_name} 爬取到 {len(news_items)} 條新聞")
-            except Exception as e:
-                logger.error(f"❌ 爬取 {site_name} 時出錯: {str(e)}")
-        
-        logger.info(f"📊 財經直接爬蟲總計獲得 {len(all_news)} 條原始新聞")
-        
-        # 放寬篩選邏輯
+        return self.scorer.rank(list(self.iter_crawl()))[:30]
+    
+    def _filter_news(self, news_items: List[NewItem]) -> List[NewItem]:
+        """放寬篩選邏輯：排除關鍵詞優先，再取清單中第一個命中的關鍵詞寫入item.keyword"""
         filtered_news = []
         
-        for item in all_news:
-            title_content = (item.title + " " + (item.content or "")).lower()
+        for item in news_items:
+            title_content = item.title + " " + (item.content or "")
             
             # 檢查排除關鍵詞（大幅減少）
-            contains_exclude = any(exclude_word in title_content for exclude_word in self.exclude_keywords)
-            if contains_exclude:
+            if self.exclude_matcher.contains_any(title_content):
                 logger.debug(f"❌ 排除新聞: {item.title[:30]}...")
                 continue
             
-            matched_keyword = None
-            priority_score = 1  # 預設分數
-            
-            # 檢查是否包含任何相關關鍵詞
-            for keyword in self.broad_keywords:
-                if keyword in item.title or (item.content and keyword in item.content):
-                    matched_keyword = keyword
-                    
-                    # 設定優先級
-                    if keyword in ["新光人壽", "台新人壽", "新光金控", "台新金控"]:
-                        priority_score = 10
-                    elif keyword in ["新光", "台新"]:
-                        priority_score = 8
-                    elif keyword in ["健康險", "醫療險", "投資型", "理賠"]:
-                        priority_score = 6
-                    elif keyword in ["保險", "壽險", "人壽"]:
-                        priority_score = 4
-                    else:
-                        priority_score = 2
-                    break
+            # 檢查是否包含任何相關關鍵詞（依清單順序取第一個命中的）
+            match = self.keyword_matcher.best_match(title_content)
             
             # 如果找到任何匹配，就加入
-            if matched_keyword:
-                item.keyword = matched_keyword
-                item.priority_score = priority_score
+            if match:
+                item.keyword = match[0]
                 filtered_news.append(item)
-                logger.info(f"✅ 符合關鍵詞 '{matched_keyword}' (優先級:{priority_score}): {item.title[:40]}...")
+                logger.info(f"✅ 符合關鍵詞 '{item.keyword}': {item.title[:40]}...")
         
-        logger.info(f"🎯 財經直接爬蟲篩選完成，剩餘 {len(filtered_news)} 條相關新聞")
+        return filtered_news
+    
+    def _fetch_bodies(self, news_items: List[NewItem]):
+        """本地快取中的文章一律取用，其餘依排序在剩餘的請求數與時間預算內並行抓取全文"""
+        pending = []
+        cache_hits = 0
+        for item in news_items:
+            if self.http.is_cached(item.url, "article"):
+                pending.append(item)
+                cache_hits += 1
+            elif self._body_requests_left > 0:
+                pending.append(item)
+                self._body_requests_left -= 1
         
-        # 按優先級排序
-        sorted_news = sorted(filtered_news, key=lambda x: (-getattr(x, 'priority_score', 0), -x.published_time.timestamp()))
-        return sorted_news[:30]  # 增加返回數量
+        budget = max(0.0, self._body_deadline - time.monotonic())
+        if pending and budget > 0 and not self.is_cancelled():
+            logger.info(f"📥 並行補抓 {len(pending)} 篇財經新聞全文 (快取命中 {cache_hits} 篇, 工作數 {self.body_fetch_workers}, 剩餘預算 {budget:.0f} 秒)")
+            results = self.http.map(
+                self._timed_article_content,
+                [item.url for item in pending],
+                budget=budget,
+                max_workers=self.body_fetch_workers
+            )
+            
+            for item, result in zip(pending, results):
+                if not result:
+                    continue
+                content, item.fetch_latency = result
+                # 擷取失敗或比標題還短時保留標題作為內容
+                if len(content) > len(item.title):
+                    item.content = content
+                    item.body_fetched = True
+    
+    def _timed_article_content(self, url: str) -> Optional[Tuple[str, float]]:
+        """抓取全文並記錄耗時"""
+        started = time.monotonic()
+        try:
+            response = self._fetch(url, kind="article")
+            content = self._extract_article(url, self._decode(response))
+        except Exception as e:
+            logger.warning(f"⚠️ 獲取文章內容時出錯: {str(e)}")
+            return None
+        
+        content = content.replace('\n', ' ').replace('\r', ' ').strip()
+        content = ''.join(char for char in content if ord(char) < 65536)
+        return content, time.monotonic() - started
     
     def _crawl_site(self, site: Dict[str, Any]) -> List[NewItem]:
         """爬取特定網站的新聞"""
         news_items = []
         
+        if self.is_cancelled():
+            return news_items
+        
+        logger.info(f"🏢 正在爬取網站: {site['name']}")
+        
         try:
-            response = requests.get(site["url"], headers=self.headers, timeout=15)
-            response.raise_for_status()
+            response = self._fetch(site["url"], kind="list")
             
-            if response.content:
-                detected_encoding = self._detect_encoding(response.content)
-                response.encoding = detected_encoding
+            # 找所有連結 (連結文字, href) 與列表頁上標示的時間
+            article_links, link_times = self.html_parser.extract_link_times(self._decode(response))
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 找所有連結
-            article_elements = soup.find_all("a", href=True)
+            now = datetime.now()
+            cutoff = now - timedelta(hours=self.hours_limit)
+            undated_items = []
             
             processed_count = 0
             related_count = 0
+            stale_count = 0
             
-            for element in article_elements:
-                if processed_count >= 200:  # 增加處理數量
+            for link_text, href in article_links:
+                if processed_count >= 200 or self.is_cancelled():  # 增加處理數量
                     break
                     
                 try:
                     # 獲取標題
-                    title = element.get_text().strip()
+                    title = link_text.strip()
                     
                     if not title or len(title) < 5:
                         continue
@@ -189,46 +247,49 @@ class FinanceNewsDirectCrawler(BaseCrawler):
                     
                     processed_count += 1
                     
-                    # 放寬預篩選條件
-                    title_lower = title.lower()
-                    
-                    # 檢查是否包含任何相關關鍵詞
-                    contains_related = any(keyword in title_lower for keyword in [
-                        "保險", "壽險", "人壽", "新光", "台新", "理賠", "保單", "保費", 
-                        "健康險", "醫療險", "意外險", "投保", "承保", "給付", "金控",
-                        "投資型", "利變", "年金", "儲蓄險", "風險", "保障"
-                    ])
-                    
-                    # 只要包含任何相關詞彙就處理
-                    if not contains_related:
+                    # 放寬預篩選條件：只要包含任何相關詞彙就處理
+                    if not self.prefilter_matcher.contains_any(title):
                         continue
                     
                     related_count += 1
                     
                     # 獲取連結
-                    url = element.get("href")
+                    url = href
                     if not url:
                         continue
                     
                     if not url.startswith(("http://", "https://")):
                         url = urljoin(site["base_url"], url)
                     
-                    # 設定發布時間
-                    pub_time = datetime.now()
+                    # 先前執行已處理過的文章直接跳過
+                    if self._is_seen(url):
+                        continue
                     
-                    # 獲取內容（簡化）
-                    content = title  # 暫時使用標題作為內容，避免過度請求
+                    # 發布時間：列表頁時間元素，其次為網址中的日期
+                    pub_time = (parse_datetime(link_times.get(href), now) or
+                                self.time_extractor.from_url(url, site.get("date_pattern"), now))
+                    
+                    # 超出時間範圍的文章不再往下處理
+                    if pub_time and pub_time < cutoff:
+                        stale_count += 1
+                        continue
+                    
+                    # 先以標題作為內容，通過篩選後再補抓全文
+                    content = title
                     
                     # 創建新聞項目
                     news_item = NewItem(
                         title=title,
                         content=content,
                         url=url,
-                        published_time=pub_time,
+                        published_time=pub_time or now,
                         source=site["name"],
                         keyword=""
                     )
                     
+                    if pub_time is None:
+                        undated_items.append(news_item)
+                    
                     news_items.append(news_item)
                     
                     # 限制每個網站的新聞數量
@@ -238,9 +299,41 @@ class FinanceNewsDirectCrawler(BaseCrawler):
                 except Exception as e:
                     logger.warning(f"⚠️ 解析文章時出錯: {str(e)}")
             
-            logger.info(f"📊 {site['name']}: 處理了{processed_count}篇文章，找到{related_count}篇相關，成功解析{len(news_items)}篇")
+            if undated_items:
+                news_items = self._resolve_undated(news_items, undated_items, cutoff)
+            
+            logger.info(f"📊 {site['name']}: 處理了{processed_count}篇文章，找到{related_count}篇相關，略過{stale_count}篇過期，成功解析{len(news_items)}篇")
             
         except Exception as e:
             logger.error(f"❌ 爬取網站 {site['name']} 時出錯: {str(e)}")
         
         return news_items
+    
+    def _resolve_undated(self, news_items: List[NewItem], undated_items: List[NewItem],
+                         cutoff: datetime) -> List[NewItem]:
+        """讀取列表頁無法判斷時間的文章頁首，排除過期文章"""
+        dropped = set()
+        
+        if self.head_fetch and not self.is_cancelled():
+            times = self.http.map(self._fetch_head_time, [item.url for item in undated_items],
+                                  budget=self.head_budget)
+        else:
+            times = [None] * len(undated_items)
+        
+        for item, pub_time in zip(undated_items, times):
+            if pub_time is None:
+                if not self.keep_undated:
+                    dropped.add(id(item))
+                continue
+            item.published_time = pub_time
+            if pub_time < cutoff:
+                dropped.add(id(item))
+        
+        if dropped:
+            logger.debug(f"⏰ 依文章頁首時間排除 {len(dropped)} 篇文章")
+        return [item for item in news_items if id(item) not in dropped]
+    
+    def _fetch_head_time(self, url: str) -> Optional[datetime]:
+        """只讀取文章頁首以判斷發布時間"""
+        response = self._fetch(url, stream=True, kind="article")
+        return self.time_extractor.from_html(self.time_extractor.read_head(response))
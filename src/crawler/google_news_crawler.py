@@ -1,623 +1,41 @@
-關於這專案，我已經執行了一段，詳細內容在我們之前的對話中，因為對話長度已達上限，所以開一個新的專案。這專案為利用GITHUB下指令每日爬蟲保險相關新聞並閱讀摘要後已LINE機器人用廣播方式傳送
-
-Edit
-我了解您的專案是一個自動化保險新聞服務系統，包含以下主要功能：
-
-GitHub Actions 自動化：每日定時執行爬蟲
-新聞爬蟲：抓取保險相關新聞
-內容摘要：對新聞進行摘要處理
-LINE Bot 廣播：將摘要透過 LINE 機器人發送給用戶
-由於之前的對話已達上限，我無法看到詳細的實作內容，但我可以協助您繼續開發或解決遇到的問題。
-
-請告訴我：
-
-目前專案進行到哪個階段？
-遇到了什麼具體問題需要解決？
-需要我協助優化或新增哪些功能？
-我可以幫您處理程式碼開發、GitHub Actions 設定、LINE Bot API 整合、或是新聞爬蟲和摘要功能的優化等各方面的需求。
-
-
-
-
-現在的狀況是已經可以正常執行，但新聞量太少且部是我所需要的新聞，你需要我給你那些資訊?
-
-Edit
-為了幫您優化新聞爬蟲，讓它能抓取更多且更符合需求的保險新聞，我需要了解以下資訊：
-
-目前狀況
-現有新聞來源：目前爬蟲從哪些網站抓取新聞？
-每日新聞數量：大概每天能抓到幾則新聞？
-新聞品質問題：抓到的新聞主要有什麼問題？（例如：不是保險相關、內容太淺、重複性高等）
-需求規格
-理想新聞類型：您希望看到哪些類型的保險新聞？
-壽險/產險/健康險等特定險種？
-保險法規政策？
-保險公司動態？
-理賠案例？
-新商品發布？
-期望數量：每天希望收到幾則新聞？
-新聞來源偏好：
-官方媒體（如經濟日報、工商時報）
-保險專業媒體
-政府機關發布
-特定不想要的來源
-技術資訊
-目前的爬蟲程式碼：可以分享現有的爬蟲邏輯嗎？
-關鍵字篩選：目前用什麼關鍵字過濾新聞？
-有了這些資訊，我就能幫您擴充新聞來源、優化關鍵字篩選，並提升新聞的相關性和數量。
-
-
-
-
-image.png
-這是GITHUB內的結售
-
-Edit
-感謝您提供GitHub專案的截圖！我可以看到這是一個「金融保險新聞爬蟲與Line推播」的專案，包含了以下結構：
-
-.github/workflows/ - GitHub Actions 自動化流程
-config/ - 設定檔
-src/ - 原始碼
-tests/ - 測試檔案
-requirements.txt - Python 依賴套件
-為了幫您優化新聞爬蟲，讓它能抓取更多且更符合需求的保險新聞，我需要查看一些關鍵檔案。可以請您分享以下檔案的內容嗎？
-
-主要爬蟲程式 - src/ 資料夾中的爬蟲程式碼
-設定檔 - config/ 資料夾中的設定檔
-GitHub Actions - .github/workflows/ 中的自動化流程檔案
-另外，也請告訴我：
-
-目前每天大概能抓到幾則新聞？
-您希望看到哪些類型的保險新聞？（例如：壽險、產險、健康險、保險法規、理賠案例等）
-有沒有特別偏好的新聞來源網站？
-這樣我就能幫您分析現有的爬蟲邏輯，並建議如何擴充新聞來源和優化篩選條件。
-
-
-
-
-import os
-import sys
-import yaml
-import schedule
-import time
-from datetime import datetime
-from typing import List, Dict, Any
-from loguru import logger
-# 添加專案根目錄到系統路徑
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(file))))
-from src.crawler.google_news_crawler import GoogleNewsCrawler
-from src.crawler.rss_crawler import RssCrawler
-from src.crawler.finance_direct_crawler import FinanceNewsDirectCrawler
-from src.summarizer.text_summarizer import TextSummarizer
-from src.notification.line_notifier import LineNotifier
-from src.crawler.utils import load_config, setup_logger
-def run_crawler():
-    """執行爬蟲、摘要和通知流程"""
-    start_time = datetime.now()
-    logger.info(f"開始執行爬蟲任務: {start_time}")
-
-    try:
-        # 載入配置
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(file))), 'config', 'config.yaml')
-        config = load_config(config_path)
-
-        all_news = []
-
-        # 優先使用財經新聞直接爬蟲，因為這更有可能找到相關新聞
-        if 'finance_direct' in config['crawler']['sources']:
-            logger.info("使用財經新聞直接爬蟲獲取新聞")
-            finance_crawler = FinanceNewsDirectCrawler(config['crawler'])
-            finance_news = finance_crawler.crawl()
-            all_news.extend(finance_news)
-            logger.info(f"從財經新聞網站直接爬取到 {len(finance_news)} 條新聞")
-
-        # 使用Google新聞爬蟲
-        if 'google_news' in config['crawler']['sources']:
-            logger.info("使用Google新聞爬蟲獲取新聞")
-            google_crawler = GoogleNewsCrawler(config['crawler'])
-            google_news = google_crawler.crawl()
-            all_news.extend(google_news)
-            logger.info(f"從Google新聞爬取到 {len(google_news)} 條新聞")
-
-        # 使用RSS爬蟲
-        if 'rss' in config['crawler']['sources']:
-            logger.info("使用RSS爬蟲獲取新聞")
-            rss_crawler = RssCrawler(config['crawler'])
-            rss_news = rss_crawler.crawl()
-            all_news.extend(rss_news)
-            logger.info(f"從RSS爬取到 {len(rss_news)} 條新聞")
-
-        # 根據關鍵詞優先排序所有新聞
-        priority_map = {term: i for i, term in enumerate(config['crawler']['search_terms'])}
-        all_news = sorted(all_news, key=lambda item: priority_map.get(item.keyword, float('inf')))
-
-        logger.info(f"總共爬取到 {len(all_news)} 條新聞")
-
-        if not all_news:
-            logger.info("沒有找到相關新聞，任務結束")
-            return
-
-        # 初始化摘要器
-        summarizer = TextSummarizer(config['summarizer'])
-
-        # 生成摘要
-        news_summaries = []
-        for item in all_news:
-            summary = summarizer.summarize(item.content)
-
-            news_summaries.append({
-                'title': item.title,
-                'summary': summary,
-                'url': item.url,
-                'source': item.source,
-                'keyword': item.keyword,
-                'published_time': item.published_time
-            })
-
-            logger.info(f"已生成摘要: {item.title[:30]}...")
-
-        # 初始化Line通知
-        notifier = LineNotifier(config['line_notify'])
-
-        # 發送摘要到Line
-        sent = notifier.send_news_summary(news_summaries)
-        if sent:
-            logger.info("成功發送Line通知")
-        else:
-            logger.error("發送Line通知失敗")
-
-    except Exception as e:
-        logger.error(f"執行爬蟲任務時出錯: {str(e)}")
-
-    end_time = datetime.now()
-    logger.info(f"爬蟲任務結束，耗時: {end_time - start_time}")
-def main():
-    """主函數"""
-    # 設置日誌
-    setup_logger()
-
-    if len(sys.argv) > 1 and sys.argv[1] == "--now":
-        # 立即執行
-        run_crawler()
-    else:
-        # 排程每天執行
-        logger.info("設置排程任務...")
-        # 每天早上 8:00 執行爬蟲任務 (台灣時間)
-        schedule.every().day.at("08:00").do(run_crawler)
-
-        logger.info("爬蟲服務已啟動，等待排程執行...")
-        while True:
-            schedule.run_pending()
-            time.sleep(60)
-if name == "main":
-    main()
-
-Edit
-看了您的主程式碼，我可以看到目前使用了三種爬蟲來源：
-
-GoogleNewsCrawler - Google新聞爬蟲
-RssCrawler - RSS爬蟲
-FinanceNewsDirectCrawler - 財經新聞直接爬蟲
-為了幫您優化新聞數量和品質，我需要查看以下關鍵檔案：
-
-需要查看的檔案：
-設定檔 (config/config.yaml) - 了解目前的搜尋關鍵字和新聞來源
-各爬蟲的具體實作：
-src/crawler/google_news_crawler.py
-src/crawler/rss_crawler.py
-src/crawler/finance_direct_crawler.py
-從程式碼推測可能的優化方向：
-擴充搜尋關鍵字 - 在 config.yaml 中增加更多保險相關關鍵字
-增加新聞來源 - 在各爬蟲中加入更多財經/保險媒體網站
-改善篩選邏輯 - 加強新聞相關性判斷
-可以先分享 config/config.yaml 檔案內容嗎？這樣我就能看到目前的搜尋關鍵字設定，並建議如何優化。
-
-另外也請告訴我：
-
-您希望關注哪些類型的保險新聞？（壽險、產險、健康險、法規政策等）
-目前每天大概能抓到幾則新聞？
-有特別偏好的台灣財經媒體嗎？
-
-
-
-
-rss_crawler.py
-208 lines
-
-py
-
-
-finance_direct_crawler.py
-315 lines
-
-py
-
-
-google_news_crawler.py
-346 lines
-
-py
-
-這是你要的檔案，目前每天最多三則新聞且與保險無關，我希望關注新光人壽、台新人壽以及台灣本的健康險、投資型、壽險、利變壽險、意外險等相關新聞
-
-Edit
-看了您的爬蟲程式碼，我發現幾個可以優化的地方來增加新聞數量和提升相關性。問題主要出在：
-
-關鍵字搜尋範圍太廣泛 - 目前包含很多財經關鍵字，但保險相關性不高
-新聞來源限制 - 缺少保險專業媒體
-篩選邏輯需要調整 - 優先保險關鍵字的邏輯可以更精確
-讓我幫您優化這些爬蟲，重點關注您提到的：新光人壽、台新人壽以及健康險、投資型、壽險、利變壽險、意外險等。
-
-
-優化後的財經新聞直接爬蟲
-Code 
-現在讓我為您創建一個優化的Google新聞爬蟲：
-
-
-優化後的Google新聞爬蟲
-Code 
-
-
-
-Continue
-
-Edit
-
-優化後的Google新聞爬蟲
-Code ∙ Version 2 
-現在讓我創建一個新的配置檔案建議：
-
-
-優化後的配置檔案 (config.yaml)
-Code 
-最後，讓我創建一個優化的RSS爬蟲：
-
-
-優化後的RSS爬蟲
-Code 
-
-
-
-Continue
-
-Edit
-
-優化後的RSS爬蟲
-Code ∙ Version 2 
-優化總結
-我已經為您優化了整個保險新聞爬蟲系統，主要改進包括：
-
-🎯 關鍵優化重點
-精確的關鍵詞策略
-重點關注：新光人壽、台新人壽
-險種聚焦：健康險、投資型、壽險、利變壽險、意外險
-三層篩選：主要關鍵詞 → 次要關鍵詞 → 排除無關內容
-擴充新聞來源
-增加保險專業媒體
-優化現有財經媒體抓取
-延長時間範圍到48小時
-智能篩選機制
-預篩選機制：只處理包含保險關鍵詞的新聞
-排除機制：自動過濾股票、基金等無關新聞
-優先級評分：確保最相關的新聞優先顯示
-📈 預期改善效果
-新聞數量：從每日3則提升到10-15則
-相關性：大幅提升保險相關新聞比例
-覆蓋範圍：更全面涵蓋您關注的保險領域
-🔧 實作建議
-立即更新：
-bash
-# 備份現有檔案
-cp src/crawler/finance_direct_crawler.py src/crawler/finance_direct_crawler.py.bak
-cp src/crawler/google_news_crawler.py src/crawler/google_news_crawler.py.bak
-cp src/crawler/rss_crawler.py src/crawler/rss_crawler.py.bak
-cp config/config.yaml config/config.yaml.bak
-
-# 更新檔案內容
-測試執行：
-bash
-python main.py --now
-監控調整：觀察一週的新聞品質，根據需要微調關鍵詞
-🎛️ 可調整參數
-hours_limit: 48小時（可調整為24或72小時）
-max_news_per_push: 5則（可根據需求調整）
-關鍵詞優先級：可以根據實際需求增減
-這樣的優化應該能顯著提升您每日收到的保險新聞數量和相關性。需要我協助您進行任何調整或解釋特定部分嗎？
-
-
-
-
-只有產出三則新聞，而且沒有詳細摘要，這三則也不算人壽保險相關新聞
-
-Edit
-我看到問題了！讓我檢查您目前的實際執行狀況，並針對問題進行診斷和修正。
-
-首先，讓我看看您目前的 config.yaml 檔案內容，以及最近的執行日誌，這樣我可以找出為什麼：
-
-只產出3則新聞
-沒有詳細摘要
-新聞不相關
-請分享以下資訊：
-
-目前的 config/config.yaml 檔案內容
-最近的執行日誌 (crawler_log.txt 或類似檔案)
-摘要器的程式碼 (src/summarizer/text_summarizer.py)
-同時，讓我先建立一個診斷和修正方案：
-
-
-診斷版主程式 - 增加詳細日誌
-Code 
-現在讓我建立一個緊急修正的簡化配置檔案，專門針對保險新聞：
-
-
-緊急修正配置檔案 - 專注保險新聞
-Code 
-現在讓我建立一個緊急修正的簡化摘要器：
-
-
-簡化版文字摘要器
-Code 
-🚨 緊急修正方案
-我分析了您遇到的問題，主要原因可能是：
-
-關鍵詞過於嚴格 - 導致大部分新聞被過濾掉
-摘要器可能有問題 - 導致沒有詳細摘要
-篩選條件太嚴格 - 把相關新聞也排除了
-📋 立即執行步驟：
-備份現有檔案：
-bash
-cp config/config.yaml config/config.yaml.backup
-cp src/summarizer/text_summarizer.py src/summarizer/text_summarizer.py.backup
-cp main.py main.py.backup
-替換成診斷版本：
-使用我提供的「診斷版主程式」替換 main.py
-使用「緊急修正配置檔案」替換 config/config.yaml
-使用「簡化版文字摘要器」替換 src/summarizer/text_summarizer.py
-執行診斷模式：
-bash
-python main.py --now
-查看詳細日誌：
-bash
-tail -f debug_crawler.log
-🔧 關鍵修正點：
-放寬篩選條件：
-時間範圍：24小時 → 72小時
-減少排除關鍵詞
-增加每個關鍵詞的搜尋頁數
-修正摘要器：
-建立不依賴外部服務的簡化摘要器
-使用句子重要性分析
-加入備用方案
-增強日誌：
-詳細記錄每個步驟
-顯示過濾前後的新聞數量
-記錄摘要生成過程
-🎯 測試執行後，請分享：
-執行結果：新聞數量和品質
-日誌內容：特別是「所有新聞詳細列表」部分
-任何錯誤訊息
-這樣我就能進一步診斷和調整。如果問題仍然存在，我們可以逐步放寬條件，直到找到平衡點。
-
-您可以先試試這個診斷版本嗎？
-
-
-
-
-篩選期間維持24小時，給我修改後的完整程式碼及和我說要更新哪幾個檔案
-
-Edit
-好的，我將篩選期間保持在24小時，並提供完整的修改版程式碼。以下是需要更新的檔案和完整內容：
-
-📁 需要更新的檔案列表：
-main.py - 主程式（診斷版）
-config/config.yaml - 配置檔案
-src/crawler/finance_direct_crawler.py - 財經直接爬蟲
-src/crawler/google_news_crawler.py - Google新聞爬蟲
-src/crawler/rss_crawler.py - RSS爬蟲
-src/summarizer/text_summarizer.py - 摘要器
-🔄 更新步驟：
-bash
-# 1. 備份現有檔案
-cp main.py main.py.backup
-cp config/config.yaml config/config.yaml.backup
-cp src/crawler/finance_direct_crawler.py src/crawler/finance_direct_crawler.py.backup
-cp src/crawler/google_news_crawler.py src/crawler/google_news_crawler.py.backup  
-cp src/crawler/rss_crawler.py src/crawler/rss_crawler.py.backup
-cp src/summarizer/text_summarizer.py src/summarizer/text_summarizer.py.backup
-
-# 2. 執行測試
-python main.py --now
-
-# 3. 查看詳細日誌
-tail -f debug_crawler.log
-📄 完整程式碼：
-
-完整主程式 main.py
-Code 
-
-完整配置檔案 config/config.yaml
-Code 
-
-完整財經直接爬蟲 src/crawler/finance_direct_crawler.py
-Code 
-
-
-
-Continue
-
-Edit
-
-完整財經直接爬蟲 src/crawler/finance_direct_crawler.py
-Code ∙ Version 2 
-
-完整Google新聞爬蟲 src/crawler/google_news_crawler.py
-Code 
-
-完整RSS爬蟲 src/crawler/rss_crawler.py
-Code 
-
-
-
-Continue
-
-Edit
-
-完整RSS爬蟲 src/crawler/rss_crawler.py
-Code ∙ Version 2 
-
-完整文字摘要器 src/summarizer/text_summarizer.py
-Code 
-📝 完整更新清單
-需要更新的檔案：
-main.py ← 使用「完整主程式 main.py」
-config/config.yaml ← 使用「完整配置檔案 config/config.yaml」
-src/crawler/finance_direct_crawler.py ← 使用「完整財經直接爬蟲」
-src/crawler/google_news_crawler.py ← 使用「完整Google新聞爬蟲」
-src/crawler/rss_crawler.py ← 使用「完整RSS爬蟲」
-src/summarizer/text_summarizer.py ← 使用「完整文字摘要器」
-🔧 執行步驟：
-bash
-# 1. 備份現有檔案
-cp main.py main.py.backup
-cp config/config.yaml config/config.yaml.backup
-cp src/crawler/finance_direct_crawler.py src/crawler/finance_direct_crawler.py.backup
-cp src/crawler/google_news_crawler.py src/crawler/google_news_crawler.py.backup  
-cp src/crawler/rss_crawler.py src/crawler/rss_crawler.py.backup
-cp src/summarizer/text_summarizer.py src/summarizer/text_summarizer.py.backup
-
-# 2. 更新檔案內容（複製上述程式碼到對應檔案）
-
-# 3. 測試執行
-python main.py --now
-
-# 4. 查看詳細日誌
-tail -f insurance_crawler.log
-🎯 主要優化特點：
-關鍵詞策略 (24小時內)
-公司焦點：新光人壽、台新人壽、新光金控、台新金控
-險種專注：健康險、醫療險、投資型保險、利變壽險、意外險
-三層篩選：主要關鍵詞(10分) → 次要關鍵詞(5分) → 排除無關內容
-摘要增強
-智能摘要器：不依賴外部API，使用句子重要性分析
-保險專業：針對保險新聞優化的關鍵詞權重
-長度控制：60-150字，確保資訊完整
-詳細日誌
-每步追蹤：從爬取到篩選到摘要的完整過程
-診斷資訊：顯示每個來源的新聞數量和品質
-錯誤處理：詳細的錯誤訊息和備用方案
-預期效果
-新聞數量：從3則提升到8-15則
-相關性：專注人壽保險，排除股票、基金等
-摘要品質：每則新聞都有60-150字的專業摘要
-請按照上述步驟更新檔案後執行測試，並分享執行結果和日誌內容，這樣我就能進一步調整優化！
-
-
-
-
-找到的是同樣的三則新聞，摘要內有一堆","
-
-Edit
-我看到問題了！讓我針對這兩個問題進行修正：
-
-只找到3則新聞 - 篩選條件可能太嚴格
-摘要有一堆逗號 - 摘要器的句子處理有問題
-讓我先修正摘要器的逗號問題，然後放寬篩選條件：
-
-
-修正版摘要器 - 解決逗號問題
-Code 
-現在讓我修正配置檔案，放寬篩選條件來增加新聞數量：
-
-
-放寬條件的配置檔案 config/config.yaml
-Code 
-現在讓我修正財經直接爬蟲，放寬篩選條件：
-
-
-放寬條件的財經直接爬蟲
-Code 
-讓我也快速修正Google新聞爬蟲，放寬條件：
-
-
-放寬條件的Google新聞爬蟲
-Code 
-
-
-
-更新這四個檔案是嗎?
-
-Edit
-對的！請更新這四個檔案：
-
-📁 需要更新的檔案列表：
-src/summarizer/text_summarizer.py ← 使用「修正版摘要器 - 解決逗號問題」
-config/config.yaml ← 使用「放寬條件的配置檔案」
-src/crawler/finance_direct_crawler.py ← 使用「放寬條件的財經直接爬蟲」
-src/crawler/google_news_crawler.py ← 保持使用之前的「完整Google新聞爬蟲」
-🔄 執行步驟：
-bash
-# 1. 備份檔案
-cp src/summarizer/text_summarizer.py src/summarizer/text_summarizer.py.backup
-cp config/config.yaml config/config.yaml.backup
-cp src/crawler/finance_direct_crawler.py src/crawler/finance_direct_crawler.py.backup
-
-# 2. 更新這四個檔案的內容
-
-# 3. 測試執行
-python main.py --now
-
-# 4. 查看結果
-tail -f insurance_crawler.log
-🎯 主要修正：
-摘要器修正
-✅ 解決逗號問題：移除句子間的多餘逗號
-✅ 簡化摘要邏輯：確保摘要乾淨易讀
-✅ 長度控制：60-120字之間
-配置放寬
-✅ 擴大關鍵詞範圍：從具體險種到廣義保險詞彙
-✅ 大幅減少排除關鍵詞：避免過度篩選
-✅ 增加搜尋頁數：提高新聞獲取量
-爬蟲優化
-✅ 放寬預篩選條件：包含任何保險相關詞彙就處理
-✅ 增加處理數量：每個網站處理更多文章
-✅ 優化優先級：確保相關新聞不被漏掉
-更新完這四個檔案後，應該能看到：
-
-新聞數量增加：從3則提升到10則以上
-摘要品質改善：沒有逗號問題，更易讀
-相關性平衡：既有高相關性又有足夠數量
-請更新後執行測試，並告訴我結果如何！
-
-
-
-
-
-
-
-import requests
-from bs4 import BeautifulSoup
+import re
+import threading
 from datetime import datetime, timedelta
-import time
-import random
-from typing import List, Dict, Any
-from urllib.parse import quote, parse_qs
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from urllib.parse import urlencode, urljoin, urlparse, parse_qs
 from loguru import logger
 
 from .base_crawler import BaseCrawler, NewItem
+from .seen_index import normalize_url
+from .time_extractor import parse_datetime
+
+# Google搜尋結果中的轉址連結：/url?q=<目標網址>&sa=U...
+_REDIRECT_PATHS = ('/url', '/interstitial')
+
+# 卡片文字中「來源 · 時間」的分隔符號
+_CARD_SEPARATOR = re.compile(r'\s*[·•]\s*')
 
 class GoogleNewsCrawler(BaseCrawler):
-    """放寬條件的Google新聞爬蟲"""
+    """放寬條件的Google新聞爬蟲 - 關鍵詞×頁數並行搜尋，逐頁串流產出新聞"""
     
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.base_url = "https://www.google.com/search"
         self.hours_limit = config.get('hours_limit', 24)
         self.max_pages = config.get('max_pages', 3)
+        self.region = config.get('region', 'tw')
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             "Accept-Language": "zh-TW,zh;q=0.9,en-US;q=0.8,en;q=0.7"
         }
         
+        # 搜尋頁的並行工作數與整體時間預算；實際請求速率仍由共用HTTP層依主機限制
+        google_config = config.get('google_news', {}) or {}
+        self.results_per_page = google_config.get('results_per_page', 10)
+        self.search_workers = google_config.get('workers', 4)
+        self.search_budget = google_config.get('budget', 240)
+        self.resolve_redirects = google_config.get('resolve_redirects', True)
+        
         # 放寬搜尋關鍵詞
         self.relaxed_search_terms = [
             "新光 保險",
@@ -632,7 +50,188 @@ class GoogleNewsCrawler(BaseCrawler):
             "保險理賠",
             "保單"
         ]
+        
+        # 已無更多結果或已達數量上限的關鍵詞，後續頁數不再請求
+        self._exhausted_terms = set()
+        self._term_counts: Dict[str, int] = {}
+        self._terms_lock = threading.Lock()
+    
+    def _queries(self) -> List[Tuple[str, int]]:
+        """所有 (關鍵詞, 頁數) 組合；先排所有關鍵詞的第一頁，較深的頁數在後"""
+        terms = list(dict.fromkeys(self.search_terms + self.relaxed_search_terms))
+        return [(term, page) for page in range(self.max_pages) for term in terms]
+    
+    def _time_filter(self) -> str:
+        """將time_period（如 d、1d、7d、12h）轉為Google的tbs參數"""
+        match = re.match(r'^(\d*)([hdwmy])$', str(self.time_period).strip())
+        if not match:
+            return "qdr:d"
+        count, unit = match.groups()
+        return f"qdr:{unit}{count if count and count != '1' else ''}"
+    
+    def _search_url(self, term: str, page: int) -> str:
+        """組成Google新聞搜尋網址"""
+        params = {
+            "q": term,
+            "tbm": "nws",
+            "hl": "zh-TW",
+            "gl": self.region.upper(),
+            "tbs": self._time_filter(),
+            "start": page * self.results_per_page,
+        }
+        return f"{self.base_url}?{urlencode(params)}"
+    
+    def iter_crawl(self) -> Iterator[NewItem]:
+        """並行搜尋，每完成一頁即產出新的新聞"""
+        queries = self._queries()
+        logger.info(f"🔍 Google新聞搜尋 {len(queries)} 個頁面 (工作數 {self.search_workers}, 預算 {self.search_budget} 秒)")
+        
+        seen_urls = set()
+        total = 0
+        for (term, page), news_items in self.http.imap(
+            self._search_page, queries, budget=self.search_budget, max_workers=self.search_workers
+        ):
+            if self.is_cancelled():
+                break
+            
+            for item in news_items:
+                if item.canonical_url in seen_urls:
+                    continue
+                seen_urls.add(item.canonical_url)
+                total += 1
+                yield item
+        
+        logger.info(f"📊 Google新聞共取得 {total} 條新聞")
     
     def crawl(self) -> List[NewItem]:
         """爬取Google新聞"""
-        all_news = []
+        return self.sort_by_priority(list(self.iter_crawl()))
+    
+    def _search_page(self, query: Tuple[str, int]) -> List[NewItem]:
+        """抓取並解析一個搜尋結果頁"""
+        term, page = query
+        with self._terms_lock:
+            if term in self._exhausted_terms or self.is_cancelled():
+                return []
+        
+        response = self._fetch(self._search_url(term, page), kind="list")
+        cards = self.html_parser.extract_headed_links(self._decode(response))
+        news_items = self.parse_results(cards, term)
+        if self.resolve_redirects:
+            news_items = self._resolve_redirects(news_items)
+        
+        # 結果不足一頁或已達每個關鍵詞的數量上限時，停止請求更深的頁數
+        with self._terms_lock:
+            count = self._term_counts.get(term, 0) + len(news_items)
+            self._term_counts[term] = count
+            if len(cards) < self.results_per_page or count >= self.max_news_per_term:
+                self._exhausted_terms.add(term)
+        
+        logger.debug(f"🔍 '{term}' 第{page + 1}頁: {len(cards)} 個結果，保留 {len(news_items)} 條")
+        return news_items
+    
+    def _resolve_redirects(self, news_items: List[NewItem]) -> List[NewItem]:
+        """將 news.google.com 轉址換成原始新聞網址，並以原始網址再次排除已處理的文章"""
+        resolved = []
+        for item in news_items:
+            if self._is_google_url(item.url):
+                item.url = self._follow_redirect(item.url)
+                item.canonical_url = normalize_url(item.url)
+                if self._is_seen(item.url):
+                    continue
+            resolved.append(item)
+        return resolved
+    
+    def parse_results(self, cards: List[Tuple[str, str, List[str]]], term: str,
+                      now: Optional[datetime] = None) -> List[NewItem]:
+        """將搜尋結果卡片轉為新聞項目，排除過期與已處理的文章"""
+        now = now or datetime.now()
+        cutoff = now - timedelta(hours=self.hours_limit)
+        news_items = []
+        
+        for href, title, texts in cards:
+            url = self._resolve_link(href)
+            if not url or not title:
+                continue
+            
+            # 清理標題
+            title = title.replace('\n', ' ').replace('\r', ' ').strip()
+            title = ''.join(char for char in title if ord(char) < 65536)
+            
+            source, pub_time, snippet = self._parse_card_texts(texts, title, now)
+            if pub_time and pub_time < cutoff:
+                continue
+            
+            if self._is_seen(url):
+                continue
+            
+            news_items.append(NewItem(
+                title=title,
+                content=snippet or title,
+                url=url,
+                published_time=pub_time or now,
+                source=source or "Google新聞",
+                keyword=term
+            ))
+        
+        return news_items
+    
+    @staticmethod
+    def _parse_card_texts(texts: List[str], title: str,
+                          now: datetime) -> Tuple[Optional[str], Optional[datetime], str]:
+        """從卡片文字判斷來源、發布時間與摘要片段"""
+        source = None
+        pub_time = None
+        snippet = ""
+        
+        for text in texts:
+            if text == title:
+                continue
+            for part in _CARD_SEPARATOR.split(text):
+                if not part:
+                    continue
+                # 時間與來源都是短文字，較長者視為摘要
+                if len(part) <= 20 and pub_time is None:
+                    parsed = parse_datetime(part, now)
+                    if parsed:
+                        pub_time = parsed
+                        continue
+                if len(part) <= 20 and source is None:
+                    source = part
+                elif len(part) > len(snippet):
+                    snippet = part
+        
+        return source, pub_time, snippet
+    
+    def _resolve_link(self, href: str) -> Optional[str]:
+        """解析搜尋結果連結：還原 /url?q= 轉址，排除Google站內連結"""
+        url = urljoin(self.base_url, href)
+        parsed = urlparse(url)
+        
+        if self._is_google_url(url) and parsed.path in _REDIRECT_PATHS:
+            params = parse_qs(parsed.query)
+            target = (params.get('q') or params.get('url') or [None])[0]
+            if not target or not target.startswith(("http://", "https://")):
+                return None
+            return target
+        
+        # 搜尋、圖片等站內連結不是新聞
+        if self._is_google_url(url) and not parsed.netloc.startswith('news.'):
+            return None
+        return url
+    
+    @staticmethod
+    def _is_google_url(url: str) -> bool:
+        """是否為Google網域的網址"""
+        host = urlparse(url).netloc.lower()
+        return host == 'google.com' or host.endswith('.google.com') or host.startswith('google.')
+    
+    def _follow_redirect(self, url: str) -> str:
+        """追蹤 news.google.com 的轉址取得原始新聞網址，失敗時保留原網址"""
+        try:
+            response = self._fetch(url, stream=True, allow_redirects=True)
+            response.close()
+            return response.url or url
+        except Exception as e:
+            logger.debug(f"轉址解析失敗: {url} ({str(e)})")
+            return url
@@ -0,0 +1,271 @@
+import re
+from typing import List, Dict, Optional, Tuple
+from loguru import logger
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:  # lxml列於requirements，缺少時退回BeautifulSoup
+    LXML_AVAILABLE = False
+
+# 文章內文的候選選擇器（依序嘗試）
+DEFAULT_CONTENT_SELECTORS = [
+    "div.article-content",
+    "div.article-body",
+    "div.story-content",
+    "div.news-content",
+    "div.cont",
+    "div.content",
+    "article",
+    "main",
+    ".news-detail",
+    ".article",
+    ".post-content",
+    ".entry-content"
+]
+
+# 擷取內文前移除的標籤
+NOISE_TAGS = ["script", "style", "iframe", "ins"]
+
+# 找不到內文時，整頁擷取前移除的版面區塊
+LAYOUT_SELECTORS = ["header", "footer", "nav", "aside", ".sidebar", ".ads", ".ad"]
+
+# 列表頁中標示時間的元素：<time>或class含time/date者
+TIME_XPATH = "//*[self::time or contains(@class, 'time') or contains(@class, 'date')]"
+
+# 搜尋結果卡片中的標題元素
+HEADING_XPATH = ".//*[self::h3 or @role='heading']"
+
+# 卡片容器往上尋找的層數：只含一個標題的最外層祖先即為卡片（基本版面的時間與摘要在連結之外）
+CARD_ANCESTOR_LEVELS = 3
+
+# 時間元素往上尋找所屬連結的層數；文字過長的元素視為區塊而非時間
+TIME_ANCESTOR_LEVELS = 3
+TIME_TEXT_MAX_LENGTH = 40
+
+_SIMPLE_SELECTOR = re.compile(r'^([a-zA-Z][a-zA-Z0-9]*)?(?:([.#])([\w-]+))?$')
+
+
+def _css_to_xpath(selector: str) -> str:
+    """將簡單CSS選擇器（tag、.class、tag.class、tag#id）轉為XPath"""
+    match = _SIMPLE_SELECTOR.match(selector.strip())
+    if not match or not (match.group(1) or match.group(3)):
+        raise ValueError(f"不支援的選擇器: {selector}")
+
+    tag, kind, name = match.groups()
+    xpath = f"//{(tag or '*').lower()}"
+    if kind == '.':
+        xpath += f"[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]"
+    elif kind == '#':
+        xpath += f"[@id='{name}']"
+    return xpath
+
+
+def _is_heading(tag) -> bool:
+    """BeautifulSoup中與HEADING_XPATH相同的標題判斷"""
+    return tag.name == 'h3' or tag.get('role') == 'heading'
+
+
+class _LxmlBackend:
+    """lxml後端：C實作的解析器，適合整頁入口網站"""
+
+    name = 'lxml'
+
+    def __init__(self):
+        self._parser = lxml.html.HTMLParser(encoding='utf-8', remove_comments=True)
+        self._xpaths = {}
+
+    def _xpath(self, selector: str):
+        compiled = self._xpaths.get(selector)
+        if compiled is None:
+            compiled = etree.XPath(_css_to_xpath(selector))
+            self._xpaths[selector] = compiled
+        return compiled
+
+    def parse(self, html: str):
+        return lxml.html.document_fromstring(html.encode('utf-8'), parser=self._parser)
+
+    def links(self, doc) -> List[Tuple[str, str]]:
+        return [(element.text_content(), element.get('href')) for element in doc.iter('a') if element.get('href')]
+
+    def headed_links(self, doc) -> List[Tuple[str, str, List[str]]]:
+        results = []
+        for link in doc.iter('a'):
+            href = link.get('href')
+            heading = link.xpath(HEADING_XPATH) if href else None
+            if not heading:
+                continue
+            card = link
+            for _ in range(CARD_ANCESTOR_LEVELS):
+                parent = card.getparent()
+                if parent is None or len(parent.xpath(HEADING_XPATH)) != 1:
+                    break
+                card = parent
+            texts = [text.strip() for text in card.itertext() if text.strip()]
+            results.append((href, heading[0].text_content().strip(), texts))
+        return results
+
+    def link_times(self, doc) -> Dict[str, str]:
+        times = {}
+        for element in doc.xpath(TIME_XPATH):
+            value = element.get('datetime') or element.text_content()
+            if not value or not value.strip() or len(value.strip()) > TIME_TEXT_MAX_LENGTH:
+                continue
+            container = element
+            for _ in range(TIME_ANCESTOR_LEVELS):
+                hrefs = [link.get('href') for link in container.iter('a') if link.get('href')]
+                if hrefs or container.getparent() is None:
+                    break
+                container = container.getparent()
+            for href in hrefs:
+                times.setdefault(href, value.strip())
+        return times
+
+    def remove(self, doc, tags: List[str] = None, selectors: List[str] = None):
+        if tags:
+            etree.strip_elements(doc, *tags, with_tail=False)
+        for selector in selectors or []:
+            for element in self._xpath(selector)(doc):
+                if element.getparent() is not None:
+                    element.drop_tree()  # 保留元素後方的文字
+
+    def select_one(self, doc, selector: str):
+        found = self._xpath(selector)(doc)
+        return found[0] if found else None
+
+    def text(self, element, separator: str = "") -> str:
+        return separator.join(element.itertext())
+
+
+class _SoupBackend:
+    """BeautifulSoup後端（原有的純Python解析，作為備用）"""
+
+    name = 'bs4'
+
+    def parse(self, html: str):
+        return BeautifulSoup(html, 'html.parser')
+
+    def links(self, doc) -> List[Tuple[str, str]]:
+        return [(element.get_text(), element.get("href")) for element in doc.find_all("a", href=True)]
+
+    def headed_links(self, doc) -> List[Tuple[str, str, List[str]]]:
+        results = []
+        for link in doc.find_all("a", href=True):
+            heading = link.find(_is_heading)
+            if heading is None:
+                continue
+            card = link
+            for _ in range(CARD_ANCESTOR_LEVELS):
+                parent = card.parent
+                if parent is None or len(parent.find_all(_is_heading)) != 1:
+                    break
+                card = parent
+            results.append((link.get("href"), heading.get_text().strip(), list(card.stripped_strings)))
+        return results
+
+    def link_times(self, doc) -> Dict[str, str]:
+        times = {}
+        matches = doc.find_all(lambda tag: tag.name == 'time' or any(
+            'time' in name or 'date' in name for name in tag.get('class', [])))
+        for element in matches:
+            value = element.get('datetime') or element.get_text()
+            if not value or not value.strip() or len(value.strip()) > TIME_TEXT_MAX_LENGTH:
+                continue
+            container = element
+            for _ in range(TIME_ANCESTOR_LEVELS):
+                links = ([container] if container.name == 'a' else []) + container.find_all('a', href=True)
+                hrefs = [link.get('href') for link in links if link.get('href')]
+                if hrefs or container.parent is None:
+                    break
+                container = container.parent
+            for href in hrefs:
+                times.setdefault(href, value.strip())
+        return times
+
+    def remove(self, doc, tags: List[str] = None, selectors: List[str] = None):
+        for element in doc(tags or []):
+            element.extract()
+        if selectors:
+            for element in doc.select(", ".join(selectors)):
+                element.extract()
+
+    def select_one(self, doc, selector: str):
+        return doc.select_one(selector)
+
+    def text(self, element, separator: str = "") -> str:
+        return element.get_text(separator=separator)
+
+
+class HtmlParser:
+    """可切換的HTML解析後端 - 預設lxml，無法使用時退回BeautifulSoup"""
+
+    def __init__(self, backend: str = 'lxml'):
+        if backend == 'lxml' and not LXML_AVAILABLE:
+            logger.warning("⚠️ 無法載入lxml，改用BeautifulSoup解析")
+            backend = 'bs4'
+        self.backend = _LxmlBackend() if backend == 'lxml' else _SoupBackend()
+
+    def _parse(self, html: str):
+        """解析HTML；lxml失敗時以BeautifulSoup重試"""
+        try:
+            return self.backend, self.backend.parse(html)
+        except Exception as e:
+            if self.backend.name == 'bs4':
+                raise
+            logger.debug(f"lxml解析失敗，改用BeautifulSoup: {str(e)}")
+            fallback = _SoupBackend()
+            return fallback, fallback.parse(html)
+
+    def extract_links(self, html: str) -> List[Tuple[str, str]]:
+        """擷取頁面中所有 (連結文字, href)"""
+        if not html:
+            return []
+        backend, doc = self._parse(html)
+        return backend.links(doc)
+
+    def extract_link_times(self, html: str) -> Tuple[List[Tuple[str, str]], Dict[str, str]]:
+        """擷取列表頁的連結，以及鄰近時間元素對應的 {href: 時間文字}"""
+        if not html:
+            return [], {}
+        backend, doc = self._parse(html)
+        return backend.links(doc), backend.link_times(doc)
+
+    def extract_headed_links(self, html: str) -> List[Tuple[str, str, List[str]]]:
+        """擷取含標題元素的連結（搜尋結果卡片），返回 (href, 標題, 卡片內各段文字)"""
+        if not html:
+            return []
+        backend, doc = self._parse(html)
+        return backend.headed_links(doc)
+
+    def extract_text(self, html: str) -> str:
+        """將HTML片段轉為純文字"""
+        if not html:
+            return ""
+        backend, doc = self._parse(html)
+        return backend.text(doc)
+
+    def extract_article(self, html: str, selectors: Optional[List[str]] = None,
+                        min_length: int = 100) -> Tuple[str, Optional[str]]:
+        """擷取文章內文，返回 (內文, 命中的選擇器)；找不到時整頁擷取，選擇器為None"""
+        if not html:
+            return "", None
+
+        backend, doc = self._parse(html)
+        backend.remove(doc, tags=NOISE_TAGS)
+
+        # 嘗試多種內容選擇器
+        for selector in selectors or DEFAULT_CONTENT_SELECTORS:
+            content_element = backend.select_one(doc, selector)
+            if content_element is not None:
+                content_text = backend.text(content_element, separator="\n").strip()
+                if len(content_text) > min_length:
+                    return content_text, selector
+
+        # 如果找不到內容，移除頭部、底部等無關元素後整頁擷取
+        backend.remove(doc, selectors=LAYOUT_SELECTORS)
+        content_text = backend.text(doc, separator="\n").strip()
+        lines = [line.strip() for line in content_text.splitlines() if line.strip()]
+        return "\n".join(lines), None
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from loguru import logger
+
+from .seen_index import normalize_url
+
+# 各類頁面的新鮮期限（秒）：列表頁數分鐘，文章頁數天
+DEFAULT_TTLS = {
+    'list': 600,
+    'article': 3 * 86400,
+}
+
+# 保存下來供重建回應與重新驗證的標頭
+_STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class CachedEntry:
+    """快取中的一筆回應"""
+
+    __slots__ = ('url_key', 'body', 'headers', 'stored_at', 'kind')
+
+    def __init__(self, url_key: str, body: bytes, headers: Dict[str, str], stored_at: float, kind: str):
+        self.url_key = url_key
+        self.body = body
+        self.headers = headers
+        self.stored_at = stored_at
+        self.kind = kind
+
+    def to_response(self, url: str) -> requests.Response:
+        """重建為requests回應，呼叫端不需區分是否來自快取"""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response._content_consumed = True
+        response.from_cache = True
+        return response
+
+
+class HttpCache:
+    """本地HTTP回應快取 - 以內容雜湊保存壓縮後的內文，依頁面類型設定新鮮期限，超出容量時淘汰最久未使用者"""
+
+    def __init__(self, path: str, max_bytes: int = 200 * 1024 * 1024, ttls: Optional[Dict[str, float]] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url_key TEXT PRIMARY KEY, body_hash TEXT, headers TEXT, kind TEXT, "
+            "stored_at REAL, last_access REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bodies (body_hash TEXT PRIMARY KEY, data BLOB, size INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_body ON responses(body_hash)")
+        self._conn.commit()
+
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+        logger.info(f"💾 HTTP快取載入 {self._total_bytes / 1024 / 1024:.1f} MB")
+
+    def lookup(self, url: str) -> Optional[CachedEntry]:
+        """取得快取的回應（不論是否過期）"""
+        url_key = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT r.headers, r.kind, r.stored_at, b.data FROM responses r "
+                "JOIN bodies b ON b.body_hash = r.body_hash WHERE r.url_key = ?",
+                (url_key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE url_key = ?", (time.time(), url_key))
+            self._conn.commit()
+
+        headers, kind, stored_at, data = row
+        return CachedEntry(url_key, zlib.decompress(data), json.loads(headers), stored_at, kind)
+
+    def is_fresh(self, entry: CachedEntry, kind: str) -> bool:
+        """是否仍在該類頁面的新鮮期限內"""
+        return time.time() - entry.stored_at < self.ttls.get(kind, 0)
+
+    @staticmethod
+    def validators(entry: CachedEntry) -> Dict[str, str]:
+        """重新驗證用的條件式請求標頭"""
+        headers = {}
+        if entry.headers.get('ETag'):
+            headers['If-None-Match'] = entry.headers['ETag']
+        if entry.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = entry.headers['Last-Modified']
+        return headers
+
+    def refresh(self, entry: CachedEntry):
+        """伺服器回應304後延長新鮮期限"""
+        with self._lock:
+            self._conn.execute("UPDATE responses SET stored_at = ? WHERE url_key = ?", (time.time(), entry.url_key))
+            self._conn.commit()
+
+    def store(self, url: str, response: requests.Response, kind: str):
+        """保存200回應；標示no-store者不保存"""
+        if response.status_code != 200 or 'no-store' in response.headers.get('Cache-Control', ''):
+            return
+
+        body = response.content or b''
+        body_hash = hashlib.sha1(body).hexdigest()
+        headers = {name: response.headers[name] for name in _STORED_HEADERS if response.headers.get(name)}
+        now = time.time()
+
+        with self._lock:
+            url_key = normalize_url(url)
+            previous = self._conn.execute("SELECT body_hash FROM responses WHERE url_key = ?", (url_key,)).fetchone()
+
+            exists = self._conn.execute("SELECT 1 FROM bodies WHERE body_hash = ?", (body_hash,)).fetchone()
+            if not exists:
+                data = zlib.compress(body, 6)
+                self._conn.execute("INSERT INTO bodies (body_hash, data, size) VALUES (?, ?, ?)",
+                                   (body_hash, data, len(data)))
+                self._total_bytes += len(data)
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url_key, body_hash, headers, kind, stored_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url_key, body_hash, json.dumps(headers), kind, now, now)
+            )
+            if previous and previous[0] != body_hash:
+                self._release_body(previous[0])
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _release_body(self, body_hash: str):
+        """內文已無任何網址引用時刪除（呼叫端需持有鎖）"""
+        if self._conn.execute("SELECT 1 FROM responses WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone():
+            return
+        row = self._conn.execute("SELECT size FROM bodies WHERE body_hash = ?", (body_hash,)).fetchone()
+        if row:
+            self._conn.execute("DELETE FROM bodies WHERE body_hash = ?", (body_hash,))
+            self._total_bytes -= row[0]
+
+    def _evict(self):
+        """依最久未使用的順序淘汰，直到低於容量的九成（呼叫端需持有鎖）"""
+        target = self.max_bytes * 0.9
+        evicted = 0
+        rows = self._conn.execute("SELECT url_key, body_hash FROM responses ORDER BY last_access").fetchall()
+        for url_key, body_hash in rows:
+            if self._total_bytes <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE url_key = ?", (url_key,))
+            self._release_body(body_hash)
+            evicted += 1
+        logger.debug(f"🧹 HTTP快取淘汰 {evicted} 筆最久未使用的回應")
@@ -0,0 +1,230 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from loguru import logger
+
+from .http_cache import HttpCache
+from .utils import resolve_data_path
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept-Language": "zh-TW,zh;q=0.9,en-US;q=0.8,en;q=0.7"
+}
+
+
+class FetchCancelled(Exception):
+    """請求在等待期間被取消"""
+
+
+class TokenBucket:
+    """單一主機的令牌桶限速器"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cancel_event: Optional[threading.Event] = None):
+        """取得一個令牌，必要時等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait_time = (1 - self.tokens) / self.rate
+
+            # 在鎖外等待，不阻擋其他主機
+            if cancel_event is not None:
+                if cancel_event.wait(wait_time):
+                    raise FetchCancelled("等待令牌時被取消")
+            else:
+                time.sleep(wait_time)
+
+
+class _HostState:
+    """每個主機的連線池、並行上限與限速器"""
+
+    def __init__(self, concurrency: int, rate: float, burst: float):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.semaphore = threading.BoundedSemaphore(concurrency)
+        self.bucket = TokenBucket(rate, burst)
+
+
+class HttpClient:
+    """所有爬蟲共用的HTTP抓取層 - 每個主機獨立的連線池與禮貌限速"""
+
+    def __init__(self, config: Dict[str, Any]):
+        http_config = config.get('http', {}) or {}
+        self.timeout = http_config.get('timeout', 15)
+        self.per_host_concurrency = http_config.get('per_host_concurrency', 2)
+        self.per_host_rate = http_config.get('per_host_rate', 1.0)  # 每秒請求數
+        self.per_host_burst = http_config.get('per_host_burst', 2)
+        self.max_workers = http_config.get('max_workers', 16)
+
+        self._hosts: Dict[str, _HostState] = {}
+        self._hosts_lock = threading.Lock()
+
+        # 本地回應快取：只用於指定頁面類型（kind）的請求
+        cache_config = config.get('http_cache', {}) or {}
+        self.cache = HttpCache(
+            resolve_data_path(config, 'http_cache.sqlite3'),
+            max_bytes=int(cache_config.get('max_mb', 200) * 1024 * 1024),
+            ttls=cache_config.get('ttl_seconds')
+        ) if cache_config.get('enabled', True) else None
+
+    def _host_state(self, url: str) -> _HostState:
+        """取得（或建立）主機狀態"""
+        host = urlparse(url).netloc.lower()
+        with self._hosts_lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = _HostState(self.per_host_concurrency, self.per_host_rate, self.per_host_burst)
+                self._hosts[host] = state
+            return state
+
+    def is_cached(self, url: str, kind: str) -> bool:
+        """該類頁面在本地快取中是否有新鮮的回應（取得時不需發出請求）"""
+        if self.cache is None:
+            return False
+        entry = self.cache.lookup(url)
+        return entry is not None and self.cache.is_fresh(entry, kind)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+            cancel_event: Optional[threading.Event] = None, kind: Optional[str] = None,
+            **kwargs) -> requests.Response:
+        """以主機限速與並行上限發出GET請求；指定kind（list、article）時先查本地快取"""
+        if kind is None or self.cache is None:
+            return self._request(url, headers, timeout, cancel_event, **kwargs)
+
+        # 新鮮的快取直接返回，不佔用主機限速
+        entry = self.cache.lookup(url)
+        if entry is not None and self.cache.is_fresh(entry, kind):
+            return entry.to_response(url)
+
+        request_headers = dict(headers or DEFAULT_HEADERS)
+        if entry is not None:
+            request_headers.update(self.cache.validators(entry))
+
+        response = self._request(url, request_headers, timeout, cancel_event, **kwargs)
+        if entry is not None and response.status_code == 304:
+            response.close()
+            self.cache.refresh(entry)
+            return entry.to_response(url)
+
+        # 串流讀取（如只讀頁首）的回應不完整，不寫入快取
+        if not kwargs.get('stream'):
+            self.cache.store(url, response, kind)
+        return response
+
+    def _request(self, url: str, headers: Optional[Dict[str, str]], timeout: Optional[float],
+                 cancel_event: Optional[threading.Event], **kwargs) -> requests.Response:
+        """實際發出請求"""
+        state = self._host_state(url)
+        state.bucket.acquire(cancel_event)
+
+        with state.semaphore:
+            if cancel_event is not None and cancel_event.is_set():
+                raise FetchCancelled(f"請求已取消: {url}")
+
+            return state.session.get(
+                url,
+                headers=headers or DEFAULT_HEADERS,
+                timeout=timeout or self.timeout,
+                **kwargs
+            )
+
+    def map(self, func: Callable[[T], R], items: Iterable[T], budget: Optional[float] = None,
+            max_workers: Optional[int] = None) -> List[Optional[R]]:
+        """並行執行抓取工作，結果依輸入順序返回；逾時或失敗的項目為None
+        
+        每次呼叫使用獨立的執行緒池，巢狀呼叫不會互相佔用工作執行緒；
+        對同一主機的實際並行數仍由主機的信號量限制。
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        executor = ThreadPoolExecutor(max_workers=min(len(items), max_workers or self.max_workers),
+                                      thread_name_prefix="fetch")
+        try:
+            futures = [executor.submit(func, item) for item in items]
+            done, not_done = wait(futures, timeout=budget)
+
+            if not_done:
+                logger.warning(f"⏰ 並行抓取超出時間預算，{len(not_done)}/{len(futures)} 項未完成")
+
+            results: List[Optional[R]] = []
+            for future in futures:
+                if future not in done:
+                    results.append(None)
+                    continue
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.warning(f"⚠️ 並行抓取項目出錯: {str(e)}")
+                    results.append(None)
+
+            return results
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+    def imap(self, func: Callable[[T], R], items: Iterable[T], budget: Optional[float] = None,
+             max_workers: Optional[int] = None) -> Iterator[Tuple[T, R]]:
+        """並行執行抓取工作，依完成順序逐一產出 (項目, 結果)；失敗的項目略過
+        
+        呼叫端停止迭代時，尚未開始的工作即取消。
+        """
+        items = list(items)
+        if not items:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=min(len(items), max_workers or self.max_workers),
+                                      thread_name_prefix="fetch")
+        try:
+            futures = {executor.submit(func, item): item for item in items}
+            try:
+                for future in as_completed(futures, timeout=budget):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.warning(f"⚠️ 並行抓取項目出錯: {str(e)}")
+                        continue
+                    yield futures[future], result
+            except FuturesTimeoutError:
+                pending = sum(1 for future in futures if not future.done())
+                logger.warning(f"⏰ 並行抓取超出時間預算，{pending}/{len(futures)} 項未完成")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_shared_client: Optional[HttpClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client(config: Dict[str, Any]) -> HttpClient:
+    """取得所有爬蟲共用的HttpClient"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient(config)
+        return _shared_client
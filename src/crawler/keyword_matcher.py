@@ -0,0 +1,86 @@
+import re
+from typing import List, Dict, Optional, Set, Tuple, Union
+
+Tiers = Union[Dict[str, List[str]], List[str]]
+
+
+class KeywordMatcher:
+    """預先編譯的多關鍵詞比對器 - 單次掃描找出所有命中的關鍵詞與其層級
+
+    所有關鍵詞編譯成一個前瞻式交替正規表示式（長詞優先），每個位置只取最長的命中；
+    較短且包含在其中的關鍵詞（如「新光」之於「新光人壽」）由預先計算的子字串閉包補回，
+    因此結果與逐一 `keyword in text` 相同，但文字只需掃描一次。
+    """
+
+    def __init__(self, tiers: Tiers, ignore_case: bool = True):
+        if not isinstance(tiers, dict):
+            tiers = {'default': list(tiers)}
+
+        self.ignore_case = ignore_case
+
+        # 關鍵詞 -> (層級, 排序)，同一關鍵詞出現在多個層級時以先出現者為準
+        self._rank: Dict[str, Tuple[int, int]] = {}
+        self._tier: Dict[str, str] = {}
+        self._original: Dict[str, str] = {}
+        for tier_index, (tier, keywords) in enumerate(tiers.items()):
+            for keyword_index, keyword in enumerate(keywords or []):
+                key = self._normalize(keyword)
+                if not key or key in self._rank:
+                    continue
+                self._rank[key] = (tier_index, keyword_index)
+                self._tier[key] = tier
+                self._original[key] = keyword
+
+        keys = sorted(self._rank, key=len, reverse=True)
+
+        # 每個關鍵詞所包含的其他關鍵詞（含自身）
+        self._closure: Dict[str, Tuple[str, ...]] = {
+            key: tuple(other for other in keys if other in key) for key in keys
+        }
+
+        if keys:
+            alternation = '|'.join(re.escape(key) for key in keys)
+            self._pattern = re.compile(f'(?=({alternation}))')
+            self._search_pattern = re.compile(alternation)
+        else:
+            self._pattern = None
+            self._search_pattern = None
+
+    def _normalize(self, text: str) -> str:
+        """依設定轉為小寫"""
+        text = text or ''
+        return text.lower() if self.ignore_case else text
+
+    def _matched_keys(self, text: str) -> Set[str]:
+        """掃描一次文字，返回所有命中的關鍵詞（正規化後）"""
+        if not self._pattern or not text:
+            return set()
+
+        longest = {match.group(1) for match in self._pattern.finditer(self._normalize(text))}
+        matched = set()
+        for key in longest:
+            matched.update(self._closure[key])
+        return matched
+
+    def find(self, text: str) -> Dict[str, str]:
+        """返回所有命中的關鍵詞與層級，依優先順序排列"""
+        keys = sorted(self._matched_keys(text), key=self._rank.__getitem__)
+        return {self._original[key]: self._tier[key] for key in keys}
+
+    def best_match(self, text: str) -> Optional[Tuple[str, str]]:
+        """返回優先順序最高的 (關鍵詞, 層級)，沒有命中時返回None"""
+        keys = self._matched_keys(text)
+        if not keys:
+            return None
+        key = min(keys, key=self._rank.__getitem__)
+        return self._original[key], self._tier[key]
+
+    def tiers_in(self, text: str) -> Set[str]:
+        """返回命中的層級集合"""
+        return {self._tier[key] for key in self._matched_keys(text)}
+
+    def contains_any(self, text: str) -> bool:
+        """是否命中任一關鍵詞（找到第一個即返回）"""
+        if not self._search_pattern or not text:
+            return False
+        return self._search_pattern.search(self._normalize(text)) is not None
@@ -0,0 +1,137 @@
+import queue
+import threading
+import time
+from typing import Dict, Any, Iterator, Optional, Tuple, Type
+from loguru import logger
+
+from .base_crawler import BaseCrawler, NewItem
+
+# 佇列中表示某來源已結束的標記
+_SOURCE_DONE = object()
+
+
+class SourceOrchestrator:
+    """並行執行所有啟用的爬蟲來源，以有界佇列依產出順序串流合併結果"""
+
+    def __init__(self, config: Dict[str, Any], crawler_classes: Dict[str, Type[BaseCrawler]],
+                 source_overrides: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.config = config
+        self.crawler_classes = crawler_classes
+        self.sources = [source for source in config.get('sources', []) if source in crawler_classes]
+        self.source_overrides = source_overrides or {}  # 來源 -> 覆寫的設定（如時間範圍）
+        self.completed_sources = set()  # 最近一次執行中於期限內正常完成（未出錯）的來源
+
+        # 每個來源的執行期限（秒）
+        self.default_timeout = config.get('source_timeout', 300)
+        self.source_timeouts = config.get('source_timeouts', {}) or {}
+
+        # 佇列容量：消費端處理不及時，爬蟲端會暫停產出（背壓）
+        self.queue_size = config.get('stream_queue_size', 100)
+
+        for source in config.get('sources', []):
+            if source not in crawler_classes:
+                logger.warning(f"⚠️ 未知的爬蟲來源: {source}")
+
+    def _timeout_for(self, source: str) -> float:
+        """取得來源的執行期限"""
+        return float(self.source_timeouts.get(source, self.default_timeout))
+
+    def _produce(self, source: str, crawler: BaseCrawler, output: queue.Queue):
+        """在工作執行緒中執行爬蟲，逐則放入佇列"""
+        count = 0
+        succeeded = False
+        try:
+            for item in crawler.iter_crawl():
+                # 佇列已滿時等待，期間若被取消則停止
+                while not crawler.is_cancelled():
+                    try:
+                        output.put((source, item), timeout=0.5)
+                        count += 1
+                        break
+                    except queue.Full:
+                        continue
+                if crawler.is_cancelled():
+                    break
+            else:
+                succeeded = True
+        except Exception as e:
+            logger.error(f"❌ 來源 {source} 執行錯誤: {str(e)}")
+        finally:
+            # 結束標記（含是否正常完成）：消費端仍在等待時確實送達，已取消則盡力而為
+            while True:
+                try:
+                    output.put((source, _SOURCE_DONE, count, succeeded), timeout=0.5)
+                    break
+                except queue.Full:
+                    if crawler.is_cancelled():
+                        break
+
+    def iter_items(self) -> Iterator[NewItem]:
+        """並行爬取，任一來源產出新聞即往下游傳遞"""
+        for _, item in self.iter_sourced_items():
+            yield item
+
+    def iter_sourced_items(self) -> Iterator[Tuple[str, NewItem]]:
+        """並行爬取，產出 (來源, 新聞)"""
+        self.completed_sources = set()
+        crawlers: Dict[str, BaseCrawler] = {}
+        for source in self.sources:
+            try:
+                source_config = self.config
+                if source in self.source_overrides:
+                    source_config = dict(self.config, **self.source_overrides[source])
+                crawlers[source] = self.crawler_classes[source](source_config)
+            except Exception as e:
+                logger.error(f"❌ 初始化爬蟲 {source} 時出錯: {str(e)}")
+
+        if not crawlers:
+            return
+
+        output: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        started = time.monotonic()
+        deadlines = {source: started + self._timeout_for(source) for source in crawlers}
+        running = set(crawlers)
+
+        for source, crawler in crawlers.items():
+            threading.Thread(
+                target=self._produce, args=(source, crawler, output),
+                name=f"source-{source}", daemon=True
+            ).start()
+
+        try:
+            while running:
+                now = time.monotonic()
+
+                # 取消已超過期限的來源，已產出的結果保留
+                for source in list(running):
+                    if now >= deadlines[source]:
+                        logger.warning(f"⏰ 來源 {source} 超過執行期限 {self._timeout_for(source):.0f} 秒，已取消")
+                        crawlers[source].cancel()
+                        running.discard(source)
+
+                if not running:
+                    break
+
+                next_deadline = min(deadlines[source] for source in running)
+                try:
+                    message = output.get(timeout=max(0.0, next_deadline - now))
+                except queue.Empty:
+                    continue
+
+                source = message[0]
+                if message[1] is _SOURCE_DONE:
+                    if source in running:
+                        running.discard(source)
+                        if message[3]:
+                            self.completed_sources.add(source)
+                            logger.info(f"✅ 來源 {source} 完成，取得 {message[2]} 條新聞 (耗時 {time.monotonic() - started:.1f} 秒)")
+                        else:
+                            logger.warning(f"⚠️ 來源 {source} 執行失敗，已取得 {message[2]} 條新聞")
+                    continue
+
+                if source in running:
+                    yield source, message[1]
+        finally:
+            # 通知仍在執行的爬蟲盡快停止，不等待其結束
+            for source in running:
+                crawlers[source].cancel()
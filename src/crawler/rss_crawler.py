@@ -1,12 +1,15 @@
 import feedparser
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Tuple
 from loguru import logger
 
 from .base_crawler import BaseCrawler, NewItem
+from .keyword_matcher import KeywordMatcher
+from .scoring import RelevanceScorer
+from .seen_index import UNAVAILABLE_CONTENT
+from .state_store import StateStore
+from .utils import resolve_data_path
 
 class RssCrawler(BaseCrawler):
     """優化後的RSS訂閱源爬蟲 - 專注保險新聞"""
@@ -15,6 +18,18 @@ class RssCrawler(BaseCrawler):
         super().__init__(config)
         self.hours_limit = config.get('hours_limit', 24)
         
+        # 內文補抓：先收集需要全文的條目，再以有上限的工作池並行抓取
+        body_config = config.get('rss_body_fetch', {}) or {}
+        self.parallel_body_fetch = body_config.get('parallel', True)
+        self.body_fetch_workers = body_config.get('workers', 4)
+        self.feed_body_budget = body_config.get('feed_budget', 60)  # 每個訂閱源的總時間預算（秒）
+        
+        # 條件式請求：保存每個訂閱源的ETag、Last-Modified與已處理的條目ID
+        feed_cache_config = config.get('feed_cache', {}) or {}
+        self.feed_cache_enabled = feed_cache_config.get('enabled', True)
+        self.max_seen_entry_ids = feed_cache_config.get('max_seen_ids', 500)
+        self.feed_state = StateStore(resolve_data_path(config, 'feed_state.json')) if self.feed_cache_enabled else None
+        
         # RSS訂閱源
         self.rss_feeds = config.get('rss_feeds', [
             # 主流財經媒體
@@ -56,83 +71,100 @@ class RssCrawler(BaseCrawler):
             "股價", "股票", "配息", "除權", "除息", "股東會",
             "ETF", "基金", "債券", "匯率", "央行", "升息", "降息"
         ]
-    
-    def crawl(self) -> List[NewItem]:
-        """爬取RSS訂閱源的新聞"""
-        all_news = []
         
-        for feed_url in self.rss_feeds:
-            logger.info(f"📡 正在爬取RSS: {feed_url}")
-            try:
-                news_items = self._parse_feed(feed_url)
-                all_news.extend(news_items)
+        # 訂閱源標題預篩選用的保險相關詞彙
+        self.prefilter_keywords = [
+            "保險", "壽險", "新光", "台新", "理賠", "保單", "保費", 
+            "健康險", "意外險", "醫療險", "投保", "承保", "給付",
+            "投資型", "利變", "年金", "儲蓄險", "重大疾病", "癌症險"
+        ]
+        
+        # 預先編譯的關鍵詞比對器，每段文字只掃描一次即可得到命中的關鍵詞與層級
+        self.keyword_matcher = KeywordMatcher({
+            'primary': self.primary_keywords,
+            'secondary': self.secondary_keywords,
+            'search': self.search_terms
+        })
+        self.exclude_matcher = KeywordMatcher(self.exclude_keywords)
+        self.prefilter_matcher = KeywordMatcher(self.prefilter_keywords)
+        self.scorer = RelevanceScorer(config)
+    
+    def iter_crawl(self) -> Iterator[NewItem]:
+        """各訂閱源並行抓取，每解析完一個訂閱源即產出其相關新聞"""
+        total = 0
+        try:
+            # 禮貌延遲由共用HTTP層依主機控制
+            for feed_url, news_items in self.http.imap(self._parse_feed, self.rss_feeds):
+                if self.is_cancelled():
+                    break
                 
-                # 避免過度請求
-                time.sleep(2)
-            except Exception as e:
-                logger.error(f"❌ 爬取RSS '{feed_url}' 時出錯: {str(e)}")
+                for item in news_items:
+                    total += 1
+                    yield item
+        finally:
+            # 取消或下游停止迭代時仍保存已完成訂閱源的狀態
+            if self.feed_state:
+                self.feed_state.save()
+            if self.extraction_profiles:
+                self.extraction_profiles.save()
         
-        # 進階篩選邏輯
-        filtered_news = []
-        logger.info(f"🔍 開始篩選 {len(all_news)} 條新聞...")
+        logger.info(f"🎯 篩選完成，共 {total} 條相關新聞")
+    
+    def crawl(self) -> List[NewItem]:
+        """爬取RSS訂閱源的新聞"""
+        # 以統一的相關性評分排序
+        sorted_news = self.scorer.rank(list(self.iter_crawl()))
+        return sorted_news[:15]  # 返回前15條最相關的新聞
+    
+    def _match_keywords(self, item: NewItem) -> bool:
+        """進階篩選：排除關鍵詞優先，再依層級取最優先的命中並寫入item.keyword"""
+        title_content = item.title + " " + (item.content or "")
         
-        for item in all_news:
-            title_content = (item.title + " " + (item.content or "")).lower()
-            
-            # 檢查排除關鍵詞
-            contains_exclude = any(exclude_word in title_content for exclude_word in self.exclude_keywords)
-            if contains_exclude:
-                logger.debug(f"❌ 排除新聞（包含排除關鍵詞）: {item.title[:30]}...")
-                continue
-            
-            matched_keyword = None
-            priority_score = 0
-            
-            # 檢查主要關鍵詞（最高優先級）
-            for keyword in self.primary_keywords:
-                if keyword in item.title or (item.content and keyword in item.content):
-                    matched_keyword = keyword
-                    priority_score = 10
-                    break
-            
-            # 檢查次要關鍵詞
-            if not matched_keyword:
-                for keyword in self.secondary_keywords:
-                    if keyword in item.title or (item.content and keyword in item.content):
-                        matched_keyword = keyword
-                        priority_score = 5
-                        break
-            
-            # 檢查原始搜尋關鍵詞
-            if not matched_keyword:
-                for term in self.search_terms:
-                    if term in item.title or (item.content and term in item.content):
-                        matched_keyword = term
-                        priority_score = 1
-                        break
-            
-            if matched_keyword:
-                item.keyword = matched_keyword
-                item.priority_score = priority_score
-                filtered_news.append(item)
-                logger.info(f"✅ 符合關鍵詞 '{matched_keyword}' (優先級:{priority_score}): {item.title[:40]}...")
+        # 檢查排除關鍵詞
+        if self.exclude_matcher.contains_any(title_content):
+            logger.debug(f"❌ 排除新聞（包含排除關鍵詞）: {item.title[:30]}...")
+            return False
         
-        logger.info(f"🎯 篩選完成，剩餘 {len(filtered_news)} 條相關新聞")
+        # 依層級取最優先的命中：主要關鍵詞 > 次要關鍵詞 > 原始搜尋關鍵詞
+        match = self.keyword_matcher.best_match(title_content)
+        if not match:
+            return False
         
-        # 按優先級和時間排序
-        sorted_news = sorted(filtered_news, key=lambda x: (-getattr(x, 'priority_score', 0), -x.published_time.timestamp()))
-        return sorted_news[:15]  # 返回前15條最相關的新聞
+        item.keyword = match[0]
+        logger.info(f"✅ 符合關鍵詞 '{item.keyword}': {item.title[:40]}...")
+        return True
     
     def _parse_feed(self, feed_url: str) -> List[NewItem]:
         """解析RSS訂閱源"""
         news_items = []
         
+        if self.is_cancelled():
+            return news_items
+        
+        logger.info(f"📡 正在爬取RSS: {feed_url}")
+        
         try:
-            # 設置User-Agent
-            feedparser.USER_AGENT = self.headers["User-Agent"]
+            feed_state = (self.feed_state.get(feed_url) if self.feed_state else None) or {}
+            seen_entry_ids = set(feed_state.get('seen_ids', []))
+            
+            # 帶上驗證資訊，訂閱源未變更時伺服器回傳304；
+            # 仍有上次未摘要的候選條目時完整下載，讓這些條目能再次進入排名
+            headers = dict(self.headers)
+            if feed_state.get('pending_ids'):
+                logger.debug(f"🔁 {len(feed_state['pending_ids'])} 條候選尚未處理，完整下載: {feed_url}")
+            elif feed_state.get('etag'):
+                headers['If-None-Match'] = feed_state['etag']
+            if feed_state.get('last_modified') and not feed_state.get('pending_ids'):
+                headers['If-Modified-Since'] = feed_state['last_modified']
+            
+            # 透過共用HTTP層下載，再交給feedparser解析
+            response = self._fetch(feed_url, headers=headers)
             
-            # 解析RSS訂閱源
-            feed = feedparser.parse(feed_url)
+            if response.status_code == 304:
+                logger.info(f"💤 RSS訂閱源未變更，略過解析: {feed_url}")
+                return news_items
+            
+            feed = feedparser.parse(response.content, response_headers=response.headers)
             
             if feed.bozo:
                 logger.warning(f"⚠️ RSS訂閱源可能有格式問題: {feed_url}")
@@ -143,32 +175,49 @@ class RssCrawler(BaseCrawler):
             processed_count = 0
             insurance_related_count = 0
             
+            # 需要補抓全文的條目（news_items中的索引, 網址）
+            pending_bodies = []
+            # 已確定不需再處理的條目ID（不相關、過舊或已處理）；成為候選的條目交由已處理索引在摘要後記錄
+            settled_entry_ids = []
+            candidate_entry_ids = []  # 與news_items對應
+            skipped_seen_count = 0
+            
             for entry in feed.entries:
+                if self.is_cancelled():
+                    break
+                
+                # 上次已處理過的條目不再解析或抓取全文
+                entry_id = entry.get('id') or entry.get('link')
+                if entry_id and entry_id in seen_entry_ids:
+                    settled_entry_ids.append(entry_id)
+                    skipped_seen_count += 1
+                    continue
+                
                 try:
                     # 獲取標題和連結
                     title = entry.title if hasattr(entry, 'title') else ""
                     url = entry.link if hasattr(entry, 'link') else ""
                     
                     if not title or not url:
+                        settled_entry_ids.append(entry_id)
                         continue
                     
                     processed_count += 1
                     
-                    # 預篩選：只處理包含保險相關詞彙的標題
-                    title_lower = title.lower()
-                    contains_insurance_keyword = any(keyword in title_lower for keyword in [
-                        "保險", "壽險", "新光", "台新", "理賠", "保單", "保費", 
-                        "健康險", "意外險", "醫療險", "投保", "承保", "給付",
-                        "投資型", "利變", "年金", "儲蓄險", "重大疾病", "癌症險"
-                    ])
-                    
-                    # 如果標題不包含保險相關詞彙，跳過
-                    if not contains_insurance_keyword:
+                    # 預篩選：只處理包含保險相關詞彙的標題，否則跳過
+                    if not self.prefilter_matcher.contains_any(title):
+                        settled_entry_ids.append(entry_id)
                         continue
                     
                     insurance_related_count += 1
                     logger.debug(f"🎯 發現保險相關新聞: {title[:50]}...")
                     
+                    # 先前執行已處理過的文章不再抓取全文
+                    if self._is_seen(url):
+                        logger.debug(f"🗂️ 跳過已處理文章: {title[:30]}...")
+                        settled_entry_ids.append(entry_id)
+                        continue
+                    
                     # 獲取發布時間
                     pub_time = datetime.now()
                     if hasattr(entry, 'published_parsed') and entry.published_parsed:
@@ -188,6 +237,7 @@ class RssCrawler(BaseCrawler):
                     
                     if hours_diff > self.hours_limit:
                         logger.debug(f"⏰ 跳過，超出時間限制: {self.hours_limit} 小時")
+                        settled_entry_ids.append(entry_id)
                         continue
                     
                     # 獲取內容
@@ -201,11 +251,11 @@ class RssCrawler(BaseCrawler):
                     
                     # 如果內容是HTML，清理為純文本
                     if content and "<" in content:
-                        soup = BeautifulSoup(content, 'html.parser')
-                        content = soup.get_text()
+                        content = self.html_parser.extract_text(content)
                     
                     # 如果內容為空或太短，嘗試從原始頁面獲取
-                    if not content or len(content) < 50:
+                    needs_body = not content or len(content) < 50
+                    if needs_body and not self.parallel_body_fetch:
                         content = self._get_article_content(url)
                     
                     # 清理標題
@@ -219,74 +269,93 @@ class RssCrawler(BaseCrawler):
                         url=url,
                         published_time=pub_time,
                         source=feed_title,
-                        keyword=""
+                        keyword="",
+                        body_fetched=needs_body and not self.parallel_body_fetch
                     )
                     
+                    if needs_body and self.parallel_body_fetch:
+                        pending_bodies.append((len(news_items), url))
+                    
                     news_items.append(news_item)
+                    candidate_entry_ids.append(entry_id)
                     logger.debug(f"✅ 成功解析RSS條目: {title[:30]}...")
                     
                 except Exception as e:
                     logger.warning(f"⚠️ 解析RSS條目時出錯: {str(e)}")
             
-            logger.info(f"📊 {feed_title}: 處理了{processed_count}條新聞，找到{insurance_related_count}條保險相關，成功解析{len(news_items)}條")
+            if pending_bodies:
+                self._fetch_bodies(news_items, pending_bodies)
+            
+            # 取得全文後進行關鍵詞篩選，未通過者同樣不需再處理
+            relevant_items = []
+            pending_entry_ids = []
+            for news_item, entry_id in zip(news_items, candidate_entry_ids):
+                if self._match_keywords(news_item):
+                    relevant_items.append(news_item)
+                    pending_entry_ids.append(entry_id)
+                else:
+                    settled_entry_ids.append(entry_id)
+            news_items = relevant_items
+            
+            if self.feed_state and not self.is_cancelled():
+                self._update_feed_state(feed_url, response, settled_entry_ids, pending_entry_ids, feed_state)
+            
+            logger.info(f"📊 {feed_title}: 處理了{processed_count}條新聞，略過{skipped_seen_count}條已處理，找到{insurance_related_count}條保險相關，成功解析{len(news_items)}條")
             
         except Exception as e:
             logger.error(f"❌ 解析RSS訂閱源 '{feed_url}' 時出錯: {str(e)}")
         
         return news_items
     
+    def _update_feed_state(self, feed_url: str, response, entry_ids: List[str], pending_ids: List[str],
+                           previous: Dict[str, Any]):
+        """保存訂閱源的驗證資訊、已確定不需再處理的條目ID與尚未摘要的候選條目ID
+        
+        候選條目在摘要後由已處理索引記錄，下次解析時即歸入已處理；
+        在此之前（全文失敗、未進前K名或執行中斷）下次仍完整下載以便重試。
+        """
+        # 保留最新的條目ID，並補上先前記錄的ID直到上限
+        seen_ids = list(dict.fromkeys([entry_id for entry_id in entry_ids if entry_id] + previous.get('seen_ids', [])))
+        
+        self.feed_state.set(feed_url, {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'pending_ids': [entry_id for entry_id in pending_ids if entry_id],
+            'seen_ids': seen_ids[:self.max_seen_entry_ids],
+            'checked_at': datetime.now().isoformat()
+        })
+    
+    def _fetch_bodies(self, news_items: List[NewItem], pending_bodies: List[tuple]):
+        """以有上限的工作池並行補抓全文，結果依索引寫回原新聞項目"""
+        logger.info(f"📥 並行補抓 {len(pending_bodies)} 篇文章全文 (工作數 {self.body_fetch_workers}, 預算 {self.feed_body_budget} 秒)")
+        
+        urls = [url for _, url in pending_bodies]
+        contents = self.http.map(
+            self._timed_article_content,
+            urls,
+            budget=self.feed_body_budget,
+            max_workers=self.body_fetch_workers
+        )
+        
+        for (index, _), result in zip(pending_bodies, contents):
+            item = news_items[index]
+            if result is None:
+                item.content = UNAVAILABLE_CONTENT
+                continue
+            item.content, item.fetch_latency = result
+            item.body_fetched = True
+    
+    def _timed_article_content(self, url: str) -> Tuple[str, float]:
+        """抓取全文並記錄耗時"""
+        started = time.monotonic()
+        content = self._get_article_content(url)
+        return content, time.monotonic() - started
+    
     def _get_article_content(self, url: str) -> str:
         """獲取文章內容"""
         try:
-            # 設置延遲，避免被封鎖
-            time.sleep(1)
-            
-            response = requests.get(url, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            
-            # 自動檢測編碼
-            if response.apparent_encoding:
-                response.encoding = response.apparent_encoding
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 移除腳本和樣式標籤
-            for script in soup(["script", "style", "iframe", "ins", ".ad", ".ads"]):
-                script.extract()
-            
-            # 嘗試多種內容選擇器
-            content_selectors = [
-                "div.article-content", 
-                "div.article-body",
-                "div.story-content",
-                "div.news-content",
-                "div.cont",
-                "div.content",
-                "article",
-                "main",
-                ".news-detail",
-                ".article",
-                ".post-content",
-                ".entry-content"
-            ]
-            
-            content_text = ""
-            for selector in content_selectors:
-                content_element = soup.select_one(selector)
-                if content_element:
-                    content_text = content_element.get_text(separator="\n").strip()
-                    if len(content_text) > 100:
-                        break
-            
-            # 如果找不到內容，使用更通用的方法
-            if not content_text or len(content_text) < 100:
-                # 移除頭部、底部等無關元素
-                for element in soup.select("header, footer, nav, aside, .sidebar, .ads, .ad"):
-                    element.extract()
-                
-                content_text = soup.get_text(separator="\n").strip()
-                lines = [line.strip() for line in content_text.splitlines() if line.strip()]
-                content_text = "\n".join(lines)
+            response = self._fetch(url, kind="article")
+            content_text = self._extract_article(url, self._decode(response))
             
             # 清理文本
             if content_text:
@@ -297,4 +366,4 @@ class RssCrawler(BaseCrawler):
             
         except Exception as e:
             logger.warning(f"⚠️ 獲取文章內容時出錯: {str(e)}")
-            return "無法獲取文章內容"
+            return UNAVAILABLE_CONTENT
@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from loguru import logger
+
+from .base_crawler import NewItem
+from .keyword_matcher import KeywordMatcher
+
+# 預設關鍵詞層級（由高至低）
+DEFAULT_KEYWORD_TIERS = {
+    'company': ["新光人壽", "台新人壽", "新光金控", "台新金控", "新光金", "台新金"],
+    'brand': ["新光", "台新"],
+    'product': [
+        "健康險", "醫療險", "癌症險", "重大疾病險", "實支實付",
+        "投資型保險", "投資型", "變額保險", "利變壽險", "利率變動型",
+        "意外險", "傷害險", "年金險", "儲蓄險", "終身壽險"
+    ],
+    'insurance': [
+        "保險", "壽險", "人壽", "理賠", "給付", "保單", "保費", "承保", "核保",
+        "要保人", "被保險人", "受益人", "保障額度", "保險業", "保險公司"
+    ],
+}
+
+DEFAULT_TIER_WEIGHTS = {'company': 10, 'brand': 8, 'product': 6, 'insurance': 4, 'search': 2}
+
+
+class RelevanceScorer:
+    """統一的相關性評分 - 關鍵詞層級、標題/內文命中、時效性與來源權重"""
+
+    def __init__(self, config: Dict[str, Any]):
+        scoring_config = config.get('scoring', {}) or {}
+
+        tiers = dict(scoring_config.get('keyword_tiers') or DEFAULT_KEYWORD_TIERS)
+        tiers['search'] = config.get('search_terms', [])
+        self.matcher = KeywordMatcher(tiers)
+
+        self.tier_weights = dict(DEFAULT_TIER_WEIGHTS)
+        self.tier_weights.update(scoring_config.get('tier_weights', {}) or {})
+        self.title_multiplier = scoring_config.get('title_multiplier', 2.0)
+        self.recency_weight = scoring_config.get('recency_weight', 5.0)
+        self.recency_half_life = scoring_config.get('recency_half_life_hours', 12)
+        self.source_weights = scoring_config.get('source_weights', {}) or {}
+
+        self._source_weight_cache: Dict[str, float] = {}
+
+    def _source_weight(self, source: str) -> float:
+        """依來源名稱（包含設定的字串即套用）取得權重"""
+        weight = self._source_weight_cache.get(source)
+        if weight is None:
+            weight = 1.0
+            for name, value in self.source_weights.items():
+                if name in (source or ''):
+                    weight = float(value)
+                    break
+            self._source_weight_cache[source] = weight
+        return weight
+
+    def score(self, item: NewItem, now: Optional[datetime] = None) -> float:
+        """計算單則新聞的相關性分數"""
+        now = now or datetime.now()
+
+        # 標題命中的層級加權，內文只計標題未命中的層級
+        title_tiers = self.matcher.tiers_in(item.title)
+        body_tiers = self.matcher.tiers_in(item.content) - title_tiers
+        keyword_score = (
+            sum(self.tier_weights.get(tier, 0) for tier in title_tiers) * self.title_multiplier +
+            sum(self.tier_weights.get(tier, 0) for tier in body_tiers)
+        )
+
+        # 時效性以半衰期遞減
+        age_hours = max(0.0, (now - item.published_time).total_seconds() / 3600)
+        recency_score = self.recency_weight * 0.5 ** (age_hours / self.recency_half_life)
+
+        return round((keyword_score + recency_score) * self._source_weight(item.source), 3)
+
+    def score_batch(self, news_items: List[NewItem], now: Optional[datetime] = None) -> List[float]:
+        """以同一時間基準為整批新聞評分，並寫回priority_score"""
+        now = now or datetime.now()
+        scores = []
+        for item in news_items:
+            item.priority_score = self.score(item, now)
+            scores.append(item.priority_score)
+        return scores
+
+    def rank(self, news_items: List[NewItem], now: Optional[datetime] = None) -> List[NewItem]:
+        """評分並依分數（同分時較新者優先）排序"""
+        self.score_batch(news_items, now)
+        ranked = sorted(news_items, key=lambda item: (-item.priority_score, -item.published_time.timestamp()))
+        logger.debug(f"🏅 完成 {len(ranked)} 則新聞的相關性排序")
+        return ranked
@@ -0,0 +1,148 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from loguru import logger
+
+from .utils import resolve_data_path
+
+# 追蹤用的查詢參數，不影響文章內容
+TRACKING_PARAMS = {'fbclid', 'gclid', 'yclid', 'mc_cid', 'mc_eid', 'from', 'ref', 'ch'}
+
+# 全文抓取失敗時填入的佔位文字，許多文章共用，不能代表內容
+UNAVAILABLE_CONTENT = "無法獲取文章內容"
+
+# 未抓取全文時，內容至少需達此長度才以雜湊辨識文章
+MIN_HASHED_CONTENT_LENGTH = 50
+
+
+def normalize_url(url: str) -> str:
+    """正規化網址：小寫主機、移除錨點與追蹤參數、排序查詢參數"""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    path = parts.path.rstrip('/') or '/'
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ]
+    return urlunsplit((parts.scheme.lower() or 'https', host, path, urlencode(sorted(query)), ''))
+
+
+def content_hash(text: str) -> str:
+    """以去除空白後的內容計算雜湊"""
+    normalized = re.sub(r'\s+', '', text or '')
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def is_identifying_content(text: Optional[str], body_fetched: bool = False) -> bool:
+    """內容是否足以辨識文章：排除空內容與佔位文字，未抓全文時另需達最小長度"""
+    stripped = (text or '').strip()
+    if not stripped or stripped == UNAVAILABLE_CONTENT:
+        return False
+    return body_fetched or len(stripped) >= MIN_HASHED_CONTENT_LENGTH
+
+
+class SeenIndex:
+    """跨執行保存已處理文章的索引（SQLite + 記憶體雜湊集合），依TTL淘汰"""
+
+    def __init__(self, path: str, ttl_hours: float = 72, purge_every: int = 500):
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600
+        self.purge_every = purge_every  # 每記錄此數量後淘汰一次，常駐服務中索引不會無限成長
+        self._marks_since_purge = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            "url_key TEXT PRIMARY KEY, content_hash TEXT, stage TEXT, "
+            "first_seen REAL, last_seen REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_seen_last ON seen(last_seen)")
+        self._conn.commit()
+
+        self._urls = set()
+        self._hashes = set()
+        self.purge()
+
+        logger.info(f"🗂️ 已處理文章索引載入 {len(self._urls)} 筆記錄")
+
+    def contains(self, url: Optional[str] = None, content: Optional[str] = None) -> bool:
+        """網址或內容雜湊任一已出現過即視為已處理（內容不足以辨識時只比對網址）"""
+        return self.contains_keys(
+            normalize_url(url) if url else None,
+            content_hash(content) if is_identifying_content(content) else None
+        )
+
+    def contains_keys(self, url_key: Optional[str], hash_value: Optional[str]) -> bool:
+        """以已正規化的網址與已計算的雜湊查詢"""
+        with self._lock:
+            return bool(url_key and url_key in self._urls) or bool(hash_value and hash_value in self._hashes)
+
+    def mark(self, url: str, content: Optional[str] = None, stage: str = 'summarized'):
+        """記錄文章已處理（內容不足以辨識時只記錄網址）"""
+        self.mark_keys(normalize_url(url), content_hash(content) if is_identifying_content(content) else None, stage)
+
+    def mark_keys(self, url_key: str, hash_value: Optional[str], stage: str = 'summarized'):
+        """以已正規化的網址與已計算的雜湊記錄"""
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO seen (url_key, content_hash, stage, first_seen, last_seen) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(url_key) DO UPDATE SET content_hash = COALESCE(excluded.content_hash, content_hash), "
+                "stage = excluded.stage, last_seen = excluded.last_seen",
+                (url_key, hash_value, stage, now, now)
+            )
+            self._conn.commit()
+            self._urls.add(url_key)
+            if hash_value:
+                self._hashes.add(hash_value)
+            self._marks_since_purge += 1
+            should_purge = self._marks_since_purge >= self.purge_every
+        if should_purge:
+            self.purge()
+
+    def purge(self) -> int:
+        """淘汰超過TTL的記錄，並以剩餘記錄重建記憶體中的網址與雜湊集合"""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM seen WHERE last_seen < ?", (cutoff,))
+            self._conn.commit()
+            self._marks_since_purge = 0
+            urls = set()
+            hashes = set()
+            for url_key, hash_value in self._conn.execute("SELECT url_key, content_hash FROM seen"):
+                urls.add(url_key)
+                if hash_value:
+                    hashes.add(hash_value)
+            self._urls = urls
+            self._hashes = hashes
+        if cursor.rowcount:
+            logger.info(f"🧹 已處理文章索引淘汰 {cursor.rowcount} 筆過期記錄")
+        return cursor.rowcount
+
+
+_shared_index: Optional[SeenIndex] = None
+_shared_lock = threading.Lock()
+
+
+def get_seen_index(config: Dict[str, Any]) -> Optional[SeenIndex]:
+    """取得共用的已處理文章索引，未啟用時返回None"""
+    global _shared_index
+    index_config = config.get('seen_index', {}) or {}
+    if not index_config.get('enabled', True):
+        return None
+
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = SeenIndex(
+                resolve_data_path(config, 'seen_index.sqlite3'),
+                ttl_hours=index_config.get('ttl_hours', 72),
+                purge_every=index_config.get('purge_every', 500)
+            )
+        return _shared_index
@@ -0,0 +1,61 @@
+import json
+import os
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from loguru import logger
+
+
+class StateStore:
+    """以JSON檔案保存的本地狀態（跨執行保留）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: Dict[str, Any] = self._load()
+        self._dirty = False
+
+    def _load(self) -> Dict[str, Any]:
+        """載入狀態檔，檔案不存在或損毀時從空白開始"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            return data if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.warning(f"⚠️ 讀取狀態檔 {self.path} 時出錯，將重新建立: {str(e)}")
+            return {}
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        """讀取狀態"""
+        with self._lock:
+            return self._data.get(key, default)
+
+    def set(self, key: str, value: Any):
+        """更新狀態（呼叫save後才寫入磁碟）"""
+        with self._lock:
+            self._data[key] = value
+            self._dirty = True
+
+    def delete(self, key: str):
+        """刪除狀態"""
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self._dirty = True
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """目前所有狀態的快照"""
+        with self._lock:
+            return list(self._data.items())
+
+    def save(self):
+        """原子寫入狀態檔"""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self._data, file, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
@@ -0,0 +1,135 @@
+import re
+from datetime import datetime, timedelta
+from typing import Optional
+
+# ISO 8601與常見中文日期格式：2024-05-01T08:30:00+08:00、2024/05/01 08:30、2024年5月1日
+_DATETIME_PATTERN = re.compile(
+    r'(20\d{2})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})\s*日?'
+    r'(?:[T\s]*(\d{1,2}):(\d{2})(?::(\d{2}))?(?:\.\d+)?)?'
+    r'\s*(Z|[+-]\d{2}:?\d{2})?'
+)
+_TIME_ONLY_PATTERN = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*$')
+_RELATIVE_PATTERN = re.compile(r'(\d+)\s*(分鐘|分钟|小時|小时|天)前')
+_RELATIVE_UNITS = {'分鐘': 'minutes', '分钟': 'minutes', '小時': 'hours', '小时': 'hours', '天': 'days'}
+
+# 網址中的日期：/2024/05/01/、/2024-05-01、/20240501/
+_URL_DATE_PATTERNS = [
+    re.compile(r'/(20\d{2})[/-](\d{1,2})[/-](\d{1,2})(?:[/._-]|$)'),
+    re.compile(r'/(20\d{2})(\d{2})(\d{2})(?:[/._-]|$)'),
+]
+
+# 文章頁首的發布時間標記（依可信度排序）
+_META_TAG = re.compile(r'<meta\s[^>]*>', re.IGNORECASE)
+_META_ATTR = re.compile(r'(property|name|itemprop|content)\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+_PUBLISHED_META_NAMES = [
+    'article:published_time', 'og:published_time', 'datepublished',
+    'pubdate', 'publishdate', 'parsely-pub-date', 'date'
+]
+_JSON_LD_PUBLISHED = re.compile(r'"datePublished"\s*:\s*"([^"]+)"')
+_TIME_ELEMENT = re.compile(r'<time\s[^>]*datetime\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+_HEAD_END = re.compile(rb'</head\s*>', re.IGNORECASE)
+
+
+def _to_local(value: datetime) -> datetime:
+    """帶時區的時間轉為本地時間（不含時區，與其他來源一致）"""
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def parse_datetime(text: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """解析頁面上的時間文字，包含「12:30」「3小時前」等列表頁常見寫法；無法解析時返回None"""
+    if not text:
+        return None
+    now = now or datetime.now()
+
+    match = _DATETIME_PATTERN.search(text)
+    if match:
+        year, month, day, hour, minute, second, zone = match.groups()
+        try:
+            value = datetime(int(year), int(month), int(day),
+                             int(hour or 0), int(minute or 0), int(second or 0))
+        except ValueError:
+            return None
+        if zone:
+            zone = '+00:00' if zone == 'Z' else zone
+            try:
+                value = _to_local(datetime.fromisoformat(value.isoformat() + zone[:3] + ':' + zone[-2:]))
+            except ValueError:
+                pass
+        elif hour is None:
+            # 只有日期時取當天最晚時刻，避免誤刪仍在時間範圍內的新聞
+            value = min(value + timedelta(days=1, seconds=-1), now)
+        return value
+
+    match = _TIME_ONLY_PATTERN.match(text)
+    if match:
+        hour, minute = int(match.group(1)), int(match.group(2))
+        if hour > 23 or minute > 59:
+            return None
+        value = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        # 列表頁只顯示時刻且晚於現在者，視為昨天
+        return value - timedelta(days=1) if value > now else value
+
+    match = _RELATIVE_PATTERN.search(text)
+    if match:
+        return now - timedelta(**{_RELATIVE_UNITS[match.group(2)]: int(match.group(1))})
+
+    return None
+
+
+class PublishTimeExtractor:
+    """從網址與文章頁首判斷新聞發布時間"""
+
+    def __init__(self, head_bytes: int = 32768):
+        self.head_bytes = head_bytes
+
+    def from_url(self, url: str, pattern: Optional[str] = None, now: Optional[datetime] = None) -> Optional[datetime]:
+        """從網址中的日期判斷；pattern為網站專用的正規表示式（第一組為yyyymmdd或yyyy-mm-dd）"""
+        if pattern:
+            match = re.search(pattern, url)
+            if match:
+                digits = re.sub(r'\D', '', match.group(1))
+                if len(digits) >= 8:
+                    return parse_datetime(f"{digits[:4]}-{digits[4:6]}-{digits[6:8]}", now)
+
+        for url_pattern in _URL_DATE_PATTERNS:
+            match = url_pattern.search(url)
+            if match:
+                return parse_datetime('-'.join(match.groups()), now)
+        return None
+
+    def from_html(self, html: str, now: Optional[datetime] = None) -> Optional[datetime]:
+        """從文章頁首的meta、JSON-LD或<time>元素判斷"""
+        if not html:
+            return None
+
+        meta_values = {}
+        for tag in _META_TAG.findall(html):
+            attrs = {key.lower(): value for key, value in _META_ATTR.findall(tag)}
+            name = (attrs.get('property') or attrs.get('name') or attrs.get('itemprop') or '').lower()
+            if name in _PUBLISHED_META_NAMES and attrs.get('content'):
+                meta_values.setdefault(name, attrs['content'])
+
+        candidates = [meta_values[name] for name in _PUBLISHED_META_NAMES if name in meta_values]
+        candidates += _JSON_LD_PUBLISHED.findall(html)
+        candidates += _TIME_ELEMENT.findall(html)
+
+        for candidate in candidates:
+            value = parse_datetime(candidate, now)
+            if value:
+                return value
+        return None
+
+    def read_head(self, response) -> str:
+        """以串流讀取回應，讀到</head>或達到上限即停止"""
+        buffer = b''
+        try:
+            for chunk in response.iter_content(chunk_size=4096):
+                buffer += chunk
+                if _HEAD_END.search(buffer) or len(buffer) >= self.head_bytes:
+                    break
+        finally:
+            response.close()
+        # 時間標記皆為ASCII，不需判斷整頁編碼
+        return buffer.decode('utf-8', errors='ignore')
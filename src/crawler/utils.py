@@ -14,6 +14,15 @@ def load_config(config_path: str) -> Dict[str, Any]:
         logger.error(f"載入配置文件時出錯: {str(e)}")
         raise
 
+def resolve_data_path(config: Dict[str, Any], filename: str) -> str:
+    """取得本地狀態檔的路徑（預設為專案根目錄下的data資料夾）"""
+    data_dir = config.get('state_dir', 'data')
+    if not os.path.isabs(data_dir):
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        data_dir = os.path.join(project_root, data_dir)
+    os.makedirs(data_dir, exist_ok=True)
+    return os.path.join(data_dir, filename)
+
 def setup_logger():
     """設置日誌"""
     log_path = os.path.join(os.getcwd(), "logs")
@@ -12,9 +12,26 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.crawler.google_news_crawler import GoogleNewsCrawler
 from src.crawler.rss_crawler import RssCrawler
 from src.crawler.finance_direct_crawler import FinanceNewsDirectCrawler
+from src.crawler.orchestrator import SourceOrchestrator
+from src.crawler.seen_index import get_seen_index
+from src.crawler.dedup import NearDuplicateDetector
+from src.crawler.scoring import RelevanceScorer
+from src.pipeline import filter_seen, score_items, assign_clusters, select_top_k, summarize_items
 from src.summarizer.text_summarizer import TextSummarizer
 from src.notification.line_notifier import LineNotifier
-from src.crawler.utils import load_config, setup_logger
+from src.crawler.utils import load_config, setup_logger, resolve_data_path
+from src.run_lock import RunLock
+from src.service import NewsService
+
+# 來源名稱與爬蟲類別的對應
+CRAWLER_CLASSES = {
+    'finance_direct': FinanceNewsDirectCrawler,
+    'google_news': GoogleNewsCrawler,
+    'rss': RssCrawler,
+}
+
+# 配置檔路徑
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'config.yaml')
 
 def run_crawler():
     """執行爬蟲、摘要和通知流程 - 優化版本"""
@@ -23,8 +40,7 @@ def run_crawler():
     
     try:
         # 載入配置
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'config.yaml')
-        config = load_config(config_path)
+        config = load_config(CONFIG_PATH)
         
         # 輸出配置資訊用於診斷
         logger.info(f"✅ 配置檔案載入成功")
@@ -32,81 +48,23 @@ def run_crawler():
         logger.info(f"🔍 搜尋關鍵詞: {config['crawler'].get('search_terms', [])}")
         logger.info(f"⏰ 時間限制: {config['crawler'].get('hours_limit', 24)} 小時")
         
-        all_news = []
+        # 串流管線：爬取 → 排除已處理 → 評分 → 近似重複分群 → 有界Top-K
+        # 任一來源產出新聞即往下游處理，不需等待所有來源完成，也不保存完整候選列表
+        logger.info("=== 🚦 開始並行執行所有爬蟲來源 ===")
+        crawler_config = config['crawler']
+        orchestrator = SourceOrchestrator(crawler_config, CRAWLER_CLASSES)
+        seen_index = get_seen_index(crawler_config)
+        detector = NearDuplicateDetector(crawler_config) if (crawler_config.get('dedup', {}) or {}).get('enabled', True) else None
+        max_selected = crawler_config.get('max_selected', 15)
         
-        # 優先使用財經新聞直接爬蟲，因為這更有可能找到相關新聞
-        if 'finance_direct' in config['crawler']['sources']:
-            logger.info("=== 🏢 開始使用財經新聞直接爬蟲 ===")
-            try:
-                finance_crawler = FinanceNewsDirectCrawler(config['crawler'])
-                finance_news = finance_crawler.crawl()
-                all_news.extend(finance_news)
-                logger.info(f"🏢 財經直接爬蟲結果: {len(finance_news)} 條新聞")
-                
-                # 輸出詳細資訊
-                for i, news in enumerate(finance_news[:5]):
-                    logger.info(f"  📰 財經新聞 {i+1}: {news.title[:50]}... (🏷️ {news.keyword})")
-                    
-            except Exception as e:
-                logger.error(f"❌ 財經直接爬蟲執行錯誤: {str(e)}")
-        
-        # 使用Google新聞爬蟲
-        if 'google_news' in config['crawler']['sources']:
-            logger.info("=== 🔍 開始使用Google新聞爬蟲 ===")
-            try:
-                google_crawler = GoogleNewsCrawler(config['crawler'])
-                google_news = google_crawler.crawl()
-                all_news.extend(google_news)
-                logger.info(f"🔍 Google新聞爬蟲結果: {len(google_news)} 條新聞")
-                
-                # 輸出詳細資訊
-                for i, news in enumerate(google_news[:5]):
-                    logger.info(f"  📰 Google新聞 {i+1}: {news.title[:50]}... (🏷️ {news.keyword})")
-                    
-            except Exception as e:
-                logger.error(f"❌ Google新聞爬蟲執行錯誤: {str(e)}")
-        
-        # 使用RSS爬蟲
-        if 'rss' in config['crawler']['sources']:
-            logger.info("=== 📡 開始使用RSS爬蟲 ===")
-            try:
-                rss_crawler = RssCrawler(config['crawler'])
-                rss_news = rss_crawler.crawl()
-                all_news.extend(rss_news)
-                logger.info(f"📡 RSS爬蟲結果: {len(rss_news)} 條新聞")
-                
-                # 輸出詳細資訊
-                for i, news in enumerate(rss_news[:5]):
-                    logger.info(f"  📰 RSS新聞 {i+1}: {news.title[:50]}... (🏷️ {news.keyword})")
-                    
-            except Exception as e:
-                logger.error(f"❌ RSS爬蟲執行錯誤: {str(e)}")
-        
-        logger.info(f"📊 === 所有爬蟲完成，總共獲得 {len(all_news)} 條新聞 ===")
-        
-        # 詳細輸出前10條新聞供診斷
-        if all_news:
-            logger.info("📋 === 前10條新聞詳細列表 ===")
-            for i, news in enumerate(all_news[:10]):
-                logger.info(f"📰 新聞 {i+1}:")
-                logger.info(f"  📋 標題: {news.title}")
-                logger.info(f"  🏢 來源: {news.source}")
-                logger.info(f"  🏷️ 關鍵詞: {news.keyword}")
-                logger.info(f"  📅 時間: {news.published_time}")
-                logger.info(f"  📄 內容長度: {len(news.content or '')} 字元")
-                logger.info(f"  👀 內容預覽: {(news.content or '')[:100]}...")
-                logger.info("  ────────────")
-        
-        # 根據關鍵詞優先排序所有新聞
-        if all_news:
-            priority_map = {term: i for i, term in enumerate(config['crawler']['search_terms'])}
-            all_news = sorted(all_news, key=lambda item: (
-                priority_map.get(item.keyword, float('inf')),
-                -item.published_time.timestamp()
-            ))
-            logger.info(f"🔄 新聞按優先級和時間排序完成")
-        
-        if not all_news:
+        stream = orchestrator.iter_items()
+        stream = filter_seen(stream, seen_index)
+        stream = score_items(stream, RelevanceScorer(crawler_config))
+        selected_news = select_top_k(assign_clusters(stream, detector), max_selected)
+        
+        logger.info(f"📊 === 所有爬蟲完成 ===")
+        
+        if not selected_news:
             logger.warning("⚠️ 沒有找到任何相關新聞！")
             logger.info("🔍 可能的原因：")
             logger.info("  1. 關鍵詞設定過於嚴格")
@@ -116,9 +74,17 @@ def run_crawler():
             logger.info("💡 建議：檢查關鍵詞設定或增加時間範圍")
             return
         
-        # 取前15條最相關的新聞
-        selected_news = all_news[:15]
-        logger.info(f"🎯 選擇前 {len(selected_news)} 條最相關新聞進行摘要")
+        # 詳細輸出入選新聞供診斷
+        logger.info(f"📋 === 入選的 {len(selected_news)} 條新聞詳細列表 ===")
+        for i, news in enumerate(selected_news[:10]):
+            logger.info(f"📰 新聞 {i+1}:")
+            logger.info(f"  📋 標題: {news.title}")
+            logger.info(f"  🏢 來源: {news.source}")
+            logger.info(f"  🏷️ 關鍵詞: {news.keyword} (分數: {news.priority_score})")
+            logger.info(f"  📅 時間: {news.published_time}")
+            logger.info(f"  📄 內容長度: {len(news.content or '')} 字元")
+            logger.info(f"  👀 內容預覽: {(news.content or '')[:100]}...")
+            logger.info("  ────────────")
         
         # 初始化摘要器
         logger.info("📝 === 開始生成摘要 ===")
@@ -131,43 +97,8 @@ def run_crawler():
             summarizer = None
         
         # 生成摘要
-        news_summaries = []
-        for i, item in enumerate(selected_news):
-            logger.info(f"📝 正在處理第 {i+1}/{len(selected_news)} 條新聞: {item.title[:40]}...")
-            
-            try:
-                if summarizer:
-                    summary = summarizer.summarize(item.content)
-                else:
-                    # 備用方案：使用內容的前120字作為摘要
-                    content_preview = (item.content or "無內容")
-                    if len(content_preview) > 120:
-                        summary = content_preview[:120] + "..."
-                    else:
-                        summary = content_preview
-                
-                news_summaries.append({
-                    'title': item.title,
-                    'summary': summary,
-                    'url': item.url,
-                    'source': item.source,
-                    'keyword': item.keyword,
-                    'published_time': item.published_time.strftime("%Y-%m-%d %H:%M")
-                })
-                
-                logger.info(f"  ✅ 摘要: {summary[:60]}...")
-                
-            except Exception as e:
-                logger.error(f"❌ 生成摘要時出錯: {str(e)}")
-                # 使用標題作為摘要
-                news_summaries.append({
-                    'title': item.title,
-                    'summary': f"無法生成摘要，請查看原文。",
-                    'url': item.url,
-                    'source': item.source,
-                    'keyword': item.keyword,
-                    'published_time': item.published_time.strftime("%Y-%m-%d %H:%M")
-                })
+        summarized = list(summarize_items(selected_news, summarizer))
+        news_summaries = [summary_item for _, summary_item in summarized]
         
         logger.info(f"📝 === 摘要生成完成，共 {len(news_summaries)} 條 ===")
         
@@ -189,9 +120,17 @@ def run_crawler():
             notifier = LineNotifier(config['line_notify'])
             
             # 發送摘要到Line
-            sent = notifier.send_news_summary(news_summaries)
-            if sent:
+            result = notifier.send_news_summary(news_summaries)
+            
+            # 已送出或已寫入發送佇列才記為已處理，否則下次執行仍會重新處理
+            if result.accepted and seen_index:
+                for item, _ in summarized:
+                    seen_index.mark_keys(item.canonical_url, item.identity_hash(), stage='summarized')
+            
+            if result.sent:
                 logger.info(f"✅ 成功發送 {len(news_summaries)} 條新聞到Line")
+            elif result.queued:
+                logger.error("❌ 發送Line通知失敗，訊息已保留在發送佇列，請稍後執行：python main.py --deliver")
             else:
                 logger.error("❌ 發送Line通知失敗")
                 
@@ -207,6 +146,43 @@ def run_crawler():
     end_time = datetime.now()
     logger.info(f"🏁 === 爬蟲任務結束，總耗時: {end_time - start_time} ===")
 
+def deliver_pending():
+    """只重送發送佇列中待發送的LINE訊息，不重新爬取與摘要"""
+    logger.info("📮 === 重送發送佇列中的Line通知 ===")
+    try:
+        config = load_config(CONFIG_PATH)
+        notifier = LineNotifier(config['line_notify'])
+        if not notifier.outbox:
+            logger.warning("⚠️ 發送佇列未啟用 (line_notify.outbox.enabled)")
+            return
+        
+        if notifier.deliver_pending():
+            logger.info("✅ 發送佇列已清空")
+        else:
+            logger.error("❌ 仍有訊息未送出，請稍後再試")
+        logger.info(f"📊 發送佇列狀態: {notifier.outbox.counts()}")
+        
+    except Exception as e:
+        logger.error(f"❌ 重送Line通知時出錯: {str(e)}")
+
+def run_exclusive(task):
+    """取得執行鎖後才執行，避免與其他爬蟲程序（排程、手動或常駐服務）重疊"""
+    config = load_config(CONFIG_PATH)
+    lock = RunLock(resolve_data_path(config['crawler'], 'crawler.lock'))
+    if not lock.acquire():
+        logger.warning(f"⚠️ 另一個爬蟲程序 (PID {lock.holder()}) 正在執行，略過本次執行")
+        return
+    
+    try:
+        task()
+    finally:
+        lock.release()
+
+def serve():
+    """常駐服務模式：各來源依各自間隔輪詢，依設定頻率發送摘要"""
+    config = load_config(CONFIG_PATH)
+    NewsService(config, CRAWLER_CLASSES).run_forever()
+
 def main():
     """主函數"""
     # 設置詳細的日誌
@@ -230,16 +206,25 @@ def main():
     if len(sys.argv) > 1 and sys.argv[1] == "--now":
         # 立即執行
         logger.info("🚀 === 立即執行保險新聞爬蟲 ===")
-        run_crawler()
+        run_exclusive(run_crawler)
+    elif len(sys.argv) > 1 and sys.argv[1] == "--deliver":
+        # 只重送先前未送出的通知
+        run_exclusive(deliver_pending)
+    elif len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        # 常駐服務：增量輪詢，突發新聞數分鐘內送達
+        logger.info("🤖 === 啟動常駐服務模式 ===")
+        run_exclusive(serve)
     else:
         # 排程每天執行
         logger.info("⏰ 設置排程任務...")
         # 每天早上 8:00 執行爬蟲任務 (台灣時間)
-        schedule.every().day.at("08:00").do(run_crawler)
+        schedule.every().day.at("08:00").do(run_exclusive, run_crawler)
         
         logger.info("🤖 爬蟲服務已啟動，等待排程執行...")
         logger.info("📅 執行時間：每天早上 8:00")
         logger.info("💡 手動執行請使用：python main.py --now")
+        logger.info("💡 重送未送出的通知請使用：python main.py --deliver")
+        logger.info("💡 常駐輪詢模式請使用：python main.py --serve")
         
         while True:
             schedule.run_pending()
@@ -0,0 +1,99 @@
+import random
+import time
+import uuid
+from typing import List, Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from loguru import logger
+
+DEFAULT_API_BASE_URL = "https://api.line.me"
+
+
+class LineApiError(Exception):
+    """LINE API 回應錯誤（重試後仍失敗或不可重試）"""
+
+    def __init__(self, status_code: Optional[int], message: str):
+        super().__init__(f"[{status_code}] {message}")
+        self.status_code = status_code
+
+
+class LineClient:
+    """LINE Messaging API 發送層 - 連線重用、逾時控制、抖動指數退避重試與冪等重試鍵"""
+
+    def __init__(self, channel_access_token: str, config: Dict[str, Any]):
+        self.channel_access_token = channel_access_token
+        self.api_base_url = (config.get('api_base_url') or DEFAULT_API_BASE_URL).rstrip('/')
+        self.timeout = config.get('timeout', 10)
+        self.max_retries = config.get('max_retries', 5)
+        self.backoff_base = config.get('backoff_base', 1.0)
+        self.backoff_max = config.get('backoff_max', 60.0)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def broadcast(self, messages: List[Dict[str, Any]], retry_key: Optional[str] = None):
+        """廣播給所有好友"""
+        self._post("/v2/bot/message/broadcast", {'messages': messages}, retry_key)
+
+    def multicast(self, to: List[str], messages: List[Dict[str, Any]], retry_key: Optional[str] = None):
+        """發送給指定的多位使用者（每次最多500位）"""
+        self._post("/v2/bot/message/multicast", {'to': to, 'messages': messages}, retry_key)
+
+    def push(self, to: str, messages: List[Dict[str, Any]], retry_key: Optional[str] = None):
+        """發送給單一使用者或群組"""
+        self._post("/v2/bot/message/push", {'to': to, 'messages': messages}, retry_key)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """等待時間：優先採用Retry-After，否則為全抖動的指數退避"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.strip().isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _post(self, path: str, payload: Dict[str, Any], retry_key: Optional[str] = None):
+        """發送請求；同一批訊息的所有重試使用相同的X-Line-Retry-Key，LINE不會重複發送"""
+        retry_key = retry_key or str(uuid.uuid4())
+        headers = {
+            'Authorization': f"Bearer {self.channel_access_token}",
+            'Content-Type': 'application/json',
+            'X-Line-Retry-Key': retry_key
+        }
+        url = f"{self.api_base_url}{path}"
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.session.post(url, json=payload, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = LineApiError(None, f"連線失敗: {str(e)}")
+            else:
+                if response.status_code == 200:
+                    return
+                if response.status_code == 409:
+                    # 此重試鍵的請求先前已被接受，視為成功
+                    logger.info(f"🔁 LINE已接受過此批訊息 (重試鍵 {retry_key})，不再重複發送")
+                    return
+
+                error = LineApiError(response.status_code, self._error_message(response))
+                # 每月訊息額度用盡的429無法靠重試解決
+                if (response.status_code != 429 and response.status_code < 500) or 'monthly limit' in str(error):
+                    raise error
+
+            if attempt >= self.max_retries:
+                raise error
+
+            delay = self._backoff(attempt, response)
+            logger.warning(f"⚠️ LINE API 請求失敗 {error}，{delay:.1f} 秒後重試 ({attempt + 1}/{self.max_retries})")
+            time.sleep(delay)
+
+    @staticmethod
+    def _error_message(response: requests.Response) -> str:
+        """取得錯誤訊息"""
+        try:
+            return response.json().get('message', response.text)
+        except ValueError:
+            return response.text
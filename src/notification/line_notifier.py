@@ -1,80 +1,135 @@
-from typing import Dict, Any, List
-from linebot import LineBotApi
-from linebot.models import TextSendMessage
-from linebot.exceptions import LineBotApiError
+import os
+import uuid
+from typing import Dict, Any, List, NamedTuple
 from loguru import logger
 
+from .line_client import LineApiError, LineClient
+from .message_packer import MessagePacker
+from .outbox import get_outbox
+from .subscribers import SubscriberRegistry, chunk_recipients
+
+class SendResult(NamedTuple):
+    """發送結果：sent為全部送出，queued為已寫入發送佇列（未送出的批次稍後重送）"""
+    sent: bool
+    queued: bool
+
+    @property
+    def accepted(self) -> bool:
+        """已送出或已安全保存，呼叫端可視為已交付"""
+        return self.sent or self.queued
+
+
 class LineNotifier:
     """Line通知類"""
     
     def __init__(self, config: Dict[str, Any]):
         self.channel_access_token = config.get('channel_access_token')
         self.max_message_length = config.get('max_message_length', 2000)
+        self.packer = MessagePacker(config)
+        
+        # 廣播給所有好友，或只發送給訂閱者（依關鍵詞分組multicast）
+        self.broadcast_enabled = config.get('broadcast_enabled', True)
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.subscribers = None if self.broadcast_enabled else SubscriberRegistry.from_config(config, project_root)
         
         if not self.channel_access_token or self.channel_access_token == "YOUR_LINE_CHANNEL_ACCESS_TOKEN":
             logger.warning("未設置Line Channel Access Token")
         
-        self.line_bot_api = LineBotApi(self.channel_access_token) if self.channel_access_token and self.channel_access_token != "YOUR_LINE_CHANNEL_ACCESS_TOKEN" else None
+        self.line_client = LineClient(self.channel_access_token, config) if self.channel_access_token and self.channel_access_token != "YOUR_LINE_CHANNEL_ACCESS_TOKEN" else None
+        
+        # 持久發送佇列：發送失敗的批次保留下來，之後以 --deliver 重送
+        self.outbox = get_outbox(config)
     
-    def send_news_summary(self, news_items: List[Dict[str, Any]]) -> bool:
-        """使用廣播發送新聞摘要到所有好友"""
-        if not self.line_bot_api:
+    def send_news_summary(self, news_items: List[Dict[str, Any]]) -> SendResult:
+        """發送新聞摘要：廣播給所有好友，或依訂閱關鍵詞分組multicast（以最少的API呼叫送出所有新聞）
+        
+        啟用發送佇列時先寫入佇列再發送，返回值標示是否全部送出與是否已寫入佇列。
+        """
+        if not self.line_client:
             logger.error("Line配置不完整，無法發送消息")
-            return False
+            return SendResult(sent=False, queued=False)
         
         if not news_items:
             logger.info("沒有新聞項目可發送")
+            return SendResult(sent=True, queued=False)
+        
+        deliveries = self.build_deliveries(news_items)
+        if self.outbox:
+            self.outbox.enqueue(deliveries)
+            return SendResult(sent=self.deliver_pending(), queued=True)
+        
+        for number, delivery in enumerate(deliveries, 1):
+            try:
+                self.deliver(delivery)
+                logger.info(f"成功發送Line通知 ({number}/{len(deliveries)})")
+                
+            except LineApiError as e:
+                logger.error(f"發送Line消息時出錯 ({number}/{len(deliveries)}): {str(e)}")
+                return SendResult(sent=False, queued=False)
+        
+        return SendResult(sent=True, queued=False)
+    
+    def deliver_pending(self) -> bool:
+        """依序發送佇列中待發送的批次（含先前執行未送出者）；全部送出時返回True"""
+        if not self.outbox:
             return True
         
-        try:
-            # 按照優先順序拼接消息
-            message = self._build_message(news_items)
-            
-            # 確保消息不超過Line的最大長度限制
-            if len(message) > self.max_message_length:
-                message = message[:self.max_message_length - 3] + "..."
-                logger.warning(f"消息內容超過Line限制，已截斷至{self.max_message_length}字符")
-            
-            # 使用廣播發送消息給所有好友
-            self.line_bot_api.broadcast(TextSendMessage(text=message))
-            
-            logger.info("成功發送Line廣播通知")
+        if not self.line_client:
+            logger.error("Line配置不完整，無法發送消息")
+            return False
+        
+        batches = self.outbox.pending()
+        if not batches:
+            logger.info("📮 發送佇列沒有待發送的訊息")
             return True
+        
+        all_sent = True
+        for number, batch in enumerate(batches, 1):
+            try:
+                self.deliver(batch)
+                
+            except LineApiError as e:
+                # 4xx（429除外）為請求本身的問題，重送也不會成功
+                permanent = e.status_code is not None and e.status_code < 500 and e.status_code != 429
+                self.outbox.mark_failed(batch['id'], str(e), permanent)
+                logger.error(f"發送Line消息時出錯 ({number}/{len(batches)}): {str(e)}")
+                all_sent = False
+                if permanent:
+                    continue
+                
+                # 暫時性錯誤時停止發送，保持訊息順序
+                logger.warning(f"📮 剩餘 {len(batches) - number + 1} 批訊息留在發送佇列，稍後以 --deliver 重送")
+                return False
             
-        except LineBotApiError as e:
-            logger.error(f"發送Line廣播消息時出錯: {str(e)}")
-            return False
+            self.outbox.mark_sent(batch['id'])
+            logger.info(f"成功發送Line通知 ({number}/{len(batches)})")
+        
+        return all_sent
     
-    def _build_message(self, news_items: List[Dict[str, Any]]) -> str:
-        """構建Line消息內容"""
-        message_parts = [f"📰 今日金融保險新聞摘要 ({len(news_items)}則)\n\n"]
-        
-        for i, item in enumerate(news_items, 1):
-            # 清理標題，移除亂碼
-            title = item['title']
-            if title:
-                title = ''.join(char for char in title if ord(char) < 65536)
-                title = title.replace('\n', ' ').replace('\r', ' ').strip()
-            
-            # 添加新聞項目，格式：編號 + 關鍵詞 + 標題 + 摘要 + 來源
-            news_part = (
-                f"{i}. 【{item['keyword']}】\n"
-                f"{title}\n"
-                f"💬 {item['summary']}\n"
-                f"📰 {item['source']}\n"
-                f"🔗 {item['url'][:60]}{'...' if len(item['url']) > 60 else ''}\n\n"
-            )
-            
-            # 檢查是否會超過Line的最大長度限制
-            if len(''.join(message_parts) + news_part) > self.max_message_length:
-                message_parts.append(f"⚠️ 還有 {len(news_items) - i + 1} 則新聞因長度限制未顯示...")
-                break
-            
-            message_parts.append(news_part)
+    def build_deliveries(self, news_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """將新聞摘要轉為待發送的API呼叫：{'mode', 'to', 'messages', 'retry_key'}"""
+        deliveries = []
+        
+        if self.broadcast_enabled:
+            calls = self.packer.pack(news_items)
+            logger.info(f"📦 {len(news_items)} 則新聞打包為 {sum(len(call) for call in calls)} 則訊息，共 {len(calls)} 次廣播")
+            for messages in calls:
+                deliveries.append({'mode': 'broadcast', 'to': None, 'messages': messages, 'retry_key': str(uuid.uuid4())})
+            return deliveries
         
-        # 添加時間戳
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        message_parts.append(f"\n⏰ 更新時間：{timestamp}")
+        # 摘要內容相同的訂閱者共用同一份訊息，每次multicast最多500位
+        for user_ids, items in self.subscribers.plan(news_items):
+            calls = self.packer.pack(items)
+            for recipients in chunk_recipients(user_ids):
+                for messages in calls:
+                    deliveries.append({'mode': 'multicast', 'to': recipients, 'messages': messages, 'retry_key': str(uuid.uuid4())})
         
-        return ''.join(message_parts)
+        logger.info(f"📦 {len(news_items)} 則新聞依訂閱分組，共 {len(deliveries)} 次multicast")
+        return deliveries
+    
+    def deliver(self, delivery: Dict[str, Any]):
+        """發送一次API呼叫；重試沿用同一重試鍵，不會重複發送"""
+        if delivery['mode'] == 'broadcast':
+            self.line_client.broadcast(delivery['messages'], retry_key=delivery['retry_key'])
+        else:
+            self.line_client.multicast(delivery['to'], delivery['messages'], retry_key=delivery['retry_key'])
@@ -0,0 +1,141 @@
+import json
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+# LINE Messaging API 的限制
+MAX_MESSAGES_PER_CALL = 5        # 每次廣播最多5則訊息
+MAX_CAROUSEL_BUBBLES = 12        # 每個輪播最多12個泡泡
+MAX_FLEX_BYTES = 30 * 1024       # 輪播JSON的保守大小上限（官方上限50KB）
+MAX_ALT_TEXT_LENGTH = 400
+MAX_URI_LENGTH = 1000
+
+
+class MessagePacker:
+    """將排序後的新聞摘要打包成最少次數的LINE API呼叫（每次最多5則文字或Flex輪播訊息）"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.message_format = config.get('message_format', 'text')  # text 或 flex
+        self.max_message_length = config.get('max_message_length', 2000)
+        self.messages_per_call = min(config.get('max_messages_per_call', MAX_MESSAGES_PER_CALL), MAX_MESSAGES_PER_CALL)
+        self.carousel_size = min(config.get('carousel_size', MAX_CAROUSEL_BUBBLES), MAX_CAROUSEL_BUBBLES)
+
+    def pack(self, news_items: List[Dict[str, Any]], now: Optional[datetime] = None) -> List[List[Dict[str, Any]]]:
+        """返回每次API呼叫要送出的訊息清單（LINE訊息JSON格式）"""
+        if not news_items:
+            return []
+        now = now or datetime.now()
+
+        if self.message_format == 'flex':
+            messages = self._flex_messages(news_items, now)
+        else:
+            messages = self._text_messages(news_items, now)
+
+        return [messages[start:start + self.messages_per_call]
+                for start in range(0, len(messages), self.messages_per_call)]
+
+    @staticmethod
+    def _clean_title(title: str) -> str:
+        """清理標題，移除亂碼"""
+        if not title:
+            return ""
+        title = ''.join(char for char in title if ord(char) < 65536)
+        return title.replace('\n', ' ').replace('\r', ' ').strip()
+
+    def _format_item(self, index: int, item: Dict[str, Any]) -> str:
+        """單則新聞的文字，格式：編號 + 關鍵詞 + 標題 + 摘要 + 來源"""
+        url = item['url']
+        part = (
+            f"{index}. 【{item['keyword']}】\n"
+            f"{self._clean_title(item['title'])}\n"
+            f"💬 {item['summary']}\n"
+            f"📰 {item['source']}\n"
+            f"🔗 {url[:60]}{'...' if len(url) > 60 else ''}\n\n"
+        )
+        # 單則超過上限時截斷，確保每則新聞都能送出
+        return self._truncate(part, self.max_message_length)
+
+    @staticmethod
+    def _truncate(part: str, limit: int) -> str:
+        """截斷至長度上限內"""
+        if len(part) > limit:
+            part = part[:limit - 5] + "...\n\n"
+        return part
+
+    def _text_messages(self, news_items: List[Dict[str, Any]], now: datetime) -> List[Dict[str, Any]]:
+        """依序填滿每則文字訊息，超過長度上限才開新訊息"""
+        header = f"📰 今日金融保險新聞摘要 ({len(news_items)}則)\n\n"
+        footer = f"\n⏰ 更新時間：{now.strftime('%Y-%m-%d %H:%M')}"
+
+        texts = []
+        current = header
+        for index, item in enumerate(news_items, 1):
+            part = self._format_item(index, item)
+            if index == 1:
+                # 標題列與第一則新聞同一則訊息，不單獨佔用一則
+                part = self._truncate(part, self.max_message_length - len(header))
+            elif len(current) + len(part) > self.max_message_length:
+                texts.append(current)
+                current = ""
+            current += part
+
+        if len(current) + len(footer) > self.max_message_length:
+            texts.append(current)
+            current = ""
+        texts.append(current + footer)
+
+        return [{'type': 'text', 'text': text.strip()} for text in texts]
+
+    def _bubble(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """單則新聞的Flex泡泡"""
+        bubble = {
+            'type': 'bubble',
+            'size': 'kilo',
+            'header': {
+                'type': 'box', 'layout': 'vertical',
+                'contents': [{'type': 'text', 'text': f"【{item['keyword'] or '新聞'}】", 'size': 'xs', 'color': '#1E6FD9'}]
+            },
+            'body': {
+                'type': 'box', 'layout': 'vertical', 'spacing': 'sm',
+                'contents': [
+                    {'type': 'text', 'text': self._clean_title(item['title']) or '（無標題）',
+                     'weight': 'bold', 'wrap': True, 'maxLines': 3},
+                    {'type': 'text', 'text': item['summary'] or '（無摘要）',
+                     'size': 'sm', 'wrap': True, 'maxLines': 8, 'color': '#555555'},
+                    {'type': 'text', 'text': f"📰 {item['source']} | 📅 {item['published_time']}",
+                     'size': 'xxs', 'wrap': True, 'color': '#999999'}
+                ]
+            }
+        }
+        if item['url'] and len(item['url']) <= MAX_URI_LENGTH:
+            bubble['footer'] = {
+                'type': 'box', 'layout': 'vertical',
+                'contents': [{'type': 'button', 'style': 'link', 'height': 'sm',
+                              'action': {'type': 'uri', 'label': '閱讀全文', 'uri': item['url']}}]
+            }
+        return bubble
+
+    def _flex_messages(self, news_items: List[Dict[str, Any]], now: datetime) -> List[Dict[str, Any]]:
+        """每個輪播最多放滿泡泡數量與大小上限"""
+        carousels: List[List[Dict[str, Any]]] = []
+        current: List[Dict[str, Any]] = []
+        current_bytes = 0
+        for item in news_items:
+            bubble = self._bubble(item)
+            size = len(json.dumps(bubble, ensure_ascii=False).encode('utf-8'))
+            if current and (len(current) >= self.carousel_size or current_bytes + size > MAX_FLEX_BYTES):
+                carousels.append(current)
+                current, current_bytes = [], 0
+            current.append(bubble)
+            current_bytes += size
+        if current:
+            carousels.append(current)
+
+        messages = []
+        for number, bubbles in enumerate(carousels, 1):
+            alt_text = f"📰 今日金融保險新聞摘要 ({len(news_items)}則) {number}/{len(carousels)} - {now.strftime('%Y-%m-%d %H:%M')}"
+            messages.append({
+                'type': 'flex',
+                'altText': alt_text[:MAX_ALT_TEXT_LENGTH],
+                'contents': {'type': 'carousel', 'contents': bubbles}
+            })
+        return messages
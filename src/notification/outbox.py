@@ -0,0 +1,132 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Optional
+from loguru import logger
+
+from src.crawler.utils import resolve_data_path
+
+# LINE的X-Line-Retry-Key有效期為24小時，超過後以同一重試鍵重送可能造成重複發送
+RETRY_KEY_TTL_HOURS = 24
+
+PENDING = 'pending'
+SENT = 'sent'
+FAILED = 'failed'
+EXPIRED = 'expired'
+
+
+class Outbox:
+    """LINE通知的持久發送佇列 - 保存打包好的API呼叫與發送狀態，發送失敗時只需重送，不必重新爬取與摘要"""
+
+    def __init__(self, path: str, max_attempts: int = 5, max_age_hours: float = RETRY_KEY_TTL_HOURS,
+                 retention_days: float = 7):
+        self.path = path
+        self.max_attempts = max_attempts
+        # 超過重試鍵有效期的批次無法保證不重複發送，且新聞已過時，不再發送
+        self.max_age_seconds = min(max_age_hours, RETRY_KEY_TTL_HOURS) * 3600
+        self.retention_seconds = retention_days * 86400
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS batches ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, mode TEXT, recipients TEXT, messages TEXT, "
+            "retry_key TEXT, status TEXT, attempts INTEGER DEFAULT 0, last_error TEXT, "
+            "created_at REAL, updated_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_batches_status ON batches(status, id)")
+        self._conn.commit()
+        self.purge()
+
+    def enqueue(self, deliveries: List[Dict[str, Any]]) -> int:
+        """保存一次執行要發送的所有API呼叫（同一交易寫入）"""
+        now = time.time()
+        rows = [
+            (delivery['mode'], json.dumps(delivery.get('to'), ensure_ascii=False),
+             json.dumps(delivery['messages'], ensure_ascii=False), delivery['retry_key'], PENDING, now, now)
+            for delivery in deliveries
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO batches (mode, recipients, messages, retry_key, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+        logger.info(f"📮 {len(rows)} 批LINE訊息已寫入發送佇列")
+        return len(rows)
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """依寫入順序取得待發送的批次；過期的批次標記為expired"""
+        now = time.time()
+        with self._lock:
+            expired = self._conn.execute(
+                "UPDATE batches SET status = ?, updated_at = ? WHERE status = ? AND created_at < ?",
+                (EXPIRED, now, PENDING, now - self.max_age_seconds)
+            ).rowcount
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT id, mode, recipients, messages, retry_key, attempts FROM batches "
+                "WHERE status = ? ORDER BY id",
+                (PENDING,)
+            ).fetchall()
+
+        if expired:
+            logger.warning(f"⌛ {expired} 批LINE訊息超過 {self.max_age_seconds / 3600:.0f} 小時未送出，已放棄發送")
+
+        return [
+            {'id': row[0], 'mode': row[1], 'to': json.loads(row[2]), 'messages': json.loads(row[3]),
+             'retry_key': row[4], 'attempts': row[5]}
+            for row in rows
+        ]
+
+    def mark_sent(self, batch_id: int):
+        """標記批次已送出"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE batches SET status = ?, attempts = attempts + 1, last_error = NULL, updated_at = ? WHERE id = ?",
+                (SENT, time.time(), batch_id)
+            )
+            self._conn.commit()
+
+    def mark_failed(self, batch_id: int, error: str, permanent: bool = False):
+        """記錄一次發送失敗；不可重試或超過嘗試次數時標記為failed，否則留待下次重送"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE batches SET attempts = attempts + 1, last_error = ?, updated_at = ?, "
+                "status = CASE WHEN ? OR attempts + 1 >= ? THEN ? ELSE status END WHERE id = ?",
+                (error, time.time(), int(permanent), self.max_attempts, FAILED, batch_id)
+            )
+            self._conn.commit()
+
+    def counts(self) -> Dict[str, int]:
+        """各狀態的批次數量"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM batches GROUP BY status").fetchall()
+        return dict(rows)
+
+    def purge(self) -> int:
+        """刪除保留期限外已結束的批次"""
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM batches WHERE status != ? AND updated_at < ?",
+                (PENDING, time.time() - self.retention_seconds)
+            ).rowcount
+            self._conn.commit()
+        if removed:
+            logger.info(f"🧹 發送佇列清除 {removed} 筆舊批次")
+        return removed
+
+
+def get_outbox(config: Dict[str, Any]) -> Optional[Outbox]:
+    """依LINE通知設定建立發送佇列，未啟用時返回None"""
+    outbox_config = config.get('outbox', {}) or {}
+    if not outbox_config.get('enabled', True):
+        return None
+
+    return Outbox(
+        resolve_data_path(config, 'outbox.sqlite3'),
+        max_attempts=outbox_config.get('max_attempts', 5),
+        max_age_hours=outbox_config.get('max_age_hours', RETRY_KEY_TTL_HOURS),
+        retention_days=outbox_config.get('retention_days', 7)
+    )
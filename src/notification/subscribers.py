@@ -0,0 +1,90 @@
+import os
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from loguru import logger
+import yaml
+
+from src.crawler.keyword_matcher import KeywordMatcher
+
+MULTICAST_LIMIT = 500  # 每次multicast最多500位收件者
+
+
+class SubscriberRegistry:
+    """訂閱者名單 - 每位使用者訂閱關鍵詞；摘要內容相同的使用者合併為同一組發送"""
+
+    def __init__(self, subscriptions: Dict[str, Iterable[str]]):
+        # 使用者ID -> 訂閱的關鍵詞（空集合表示接收全部新聞）；比對不分大小寫，
+        # 關鍵詞先轉為小寫，只差在大小寫的關鍵詞（ETF與etf）共用同一個位元遮罩
+        self.subscriptions = {
+            user_id: frozenset(keyword.lower() for keyword in keywords or [] if keyword)
+            for user_id, keywords in subscriptions.items()
+        }
+
+        keywords = sorted({keyword for subscribed in self.subscriptions.values() for keyword in subscribed})
+        self.matcher = KeywordMatcher(keywords) if keywords else None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], base_dir: Optional[str] = None) -> 'SubscriberRegistry':
+        """由設定建立：訂閱檔案、設定中的名單，以及LINE_USER_ID（預設訂閱者）"""
+        entries = list(config.get('subscribers', []) or [])
+
+        subscribers_file = config.get('subscribers_file')
+        if subscribers_file:
+            if base_dir and not os.path.isabs(subscribers_file):
+                subscribers_file = os.path.join(base_dir, subscribers_file)
+            if os.path.exists(subscribers_file):
+                with open(subscribers_file, 'r', encoding='utf-8') as file:
+                    entries.extend((yaml.safe_load(file) or {}).get('subscribers', []) or [])
+
+        subscriptions: Dict[str, set] = {}
+        default_user = config.get('user_id')
+        if default_user and not str(default_user).startswith('${'):
+            subscriptions[default_user] = set(config.get('default_keywords', []) or [])
+
+        for entry in entries:
+            user_id = entry.get('user_id') if isinstance(entry, dict) else None
+            if not user_id:
+                continue
+            subscriptions.setdefault(user_id, set()).update(entry.get('keywords', []) or [])
+
+        logger.info(f"👥 載入 {len(subscriptions)} 位訂閱者")
+        return cls(subscriptions)
+
+    def plan(self, news_items: List[Dict[str, Any]]) -> List[Tuple[List[str], List[Dict[str, Any]]]]:
+        """依各使用者的訂閱計算摘要內容，返回 [(使用者ID清單, 該組的新聞)]，新聞維持原排序"""
+        all_items = (1 << len(news_items)) - 1
+
+        # 每個關鍵詞命中的新聞集合（位元遮罩），每則新聞只掃描一次
+        keyword_masks: Dict[str, int] = {}
+        if self.matcher:
+            for index, item in enumerate(news_items):
+                text = f"{item.get('title', '')} {item.get('summary', '')} {item.get('keyword', '')}"
+                for keyword in self.matcher.find(text):
+                    keyword_masks[keyword] = keyword_masks.get(keyword, 0) | (1 << index)
+
+        # 相同訂閱只計算一次；摘要內容相同的使用者合併
+        digest_cache: Dict[frozenset, int] = {}
+        groups: Dict[int, List[str]] = {}
+        for user_id, keywords in self.subscriptions.items():
+            digest = digest_cache.get(keywords)
+            if digest is None:
+                digest = all_items
+                if keywords:
+                    digest = 0
+                    for keyword in keywords:
+                        digest |= keyword_masks.get(keyword, 0)
+                digest_cache[keywords] = digest
+            if digest:
+                groups.setdefault(digest, []).append(user_id)
+
+        plan = []
+        for digest, user_ids in groups.items():
+            items = [item for index, item in enumerate(news_items) if digest >> index & 1]
+            plan.append((user_ids, items))
+
+        logger.info(f"👥 {len(self.subscriptions)} 位訂閱者分為 {len(plan)} 組摘要")
+        return plan
+
+
+def chunk_recipients(user_ids: List[str], size: int = MULTICAST_LIMIT) -> List[List[str]]:
+    """將收件者切成每組最多size位"""
+    return [user_ids[start:start + size] for start in range(0, len(user_ids), size)]
@@ -0,0 +1,138 @@
+import heapq
+import itertools
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from loguru import logger
+
+from src.crawler.base_crawler import NewItem
+from src.crawler.dedup import NearDuplicateDetector
+from src.crawler.scoring import RelevanceScorer
+from src.crawler.seen_index import SeenIndex
+
+
+def filter_seen(news_items: Iterable[NewItem], seen_index: Optional[SeenIndex]) -> Iterator[NewItem]:
+    """排除先前執行已處理過的文章（網址或內容相同）"""
+    skipped = 0
+    for item in news_items:
+        if seen_index and seen_index.contains_keys(item.canonical_url, item.identity_hash()):
+            skipped += 1
+            continue
+        yield item
+
+    if skipped:
+        logger.info(f"🗂️ 排除 {skipped} 條已處理過的新聞")
+
+
+def score_items(news_items: Iterable[NewItem], scorer: RelevanceScorer,
+                now: Optional[datetime] = None) -> Iterator[NewItem]:
+    """以同一時間基準逐則評分"""
+    now = now or datetime.now()
+    for item in news_items:
+        item.priority_score = scorer.score(item, now)
+        yield item
+
+
+def assign_clusters(news_items: Iterable[NewItem],
+                    detector: Optional[NearDuplicateDetector]) -> Iterator[Tuple[int, NewItem]]:
+    """為每則新聞標上近似重複群組編號；未啟用偵測時每則各自成群"""
+    for index, item in enumerate(news_items):
+        yield (detector.assign(item) if detector else index), item
+
+
+class TopKSelector:
+    """有界堆積：每個近似重複群組只保留分數最高的一則，並只保留前K個群組"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[tuple] = []
+        self._live: Dict[int, tuple] = {}  # 群組編號 -> 堆積中的有效項目
+        self._sequence = itertools.count()
+        self.seen_count = 0
+
+    @staticmethod
+    def _rank_key(item: NewItem) -> tuple:
+        """排序鍵：分數、內容長度、發布時間"""
+        return (item.priority_score, len(item.content or ''), item.published_time.timestamp())
+
+    def _pop_min(self) -> tuple:
+        """取出最小的有效項目（略過已被取代的舊項目）"""
+        while True:
+            entry = heapq.heappop(self._heap)
+            if self._live.get(entry[2]) is entry:
+                del self._live[entry[2]]
+                return entry
+
+    def _peek_min(self) -> tuple:
+        """查看最小的有效項目"""
+        while self._live.get(self._heap[0][2]) is not self._heap[0]:
+            heapq.heappop(self._heap)
+        return self._heap[0]
+
+    def push(self, cluster_id: int, item: NewItem):
+        """加入一則候選新聞"""
+        self.seen_count += 1
+        if self.k <= 0:
+            return
+        entry = (self._rank_key(item), next(self._sequence), cluster_id, item)
+
+        current = self._live.get(cluster_id)
+        if current is not None:
+            # 同群組已有代表：較佳者取代之，舊項目延後清除
+            if entry[0] > current[0]:
+                self._live[cluster_id] = entry
+                heapq.heappush(self._heap, entry)
+                logger.debug(f"🧬 以較佳版本取代近似重複新聞: {item.title[:40]}... ({item.source})")
+        elif len(self._live) < self.k:
+            self._live[cluster_id] = entry
+            heapq.heappush(self._heap, entry)
+        elif entry[0] > self._peek_min()[0]:
+            self._pop_min()
+            self._live[cluster_id] = entry
+            heapq.heappush(self._heap, entry)
+
+        # 被取代的舊項目過多時重建堆積，維持容量上限
+        if len(self._heap) > 2 * self.k:
+            self._heap = list(self._live.values())
+            heapq.heapify(self._heap)
+
+    def results(self) -> List[NewItem]:
+        """依分數由高至低返回保留的新聞"""
+        return [entry[3] for entry in sorted(self._live.values(), reverse=True)]
+
+
+def select_top_k(clustered_items: Iterable[Tuple[int, NewItem]], k: int) -> List[NewItem]:
+    """串流選出前K則最相關的新聞"""
+    selector = TopKSelector(k)
+    for cluster_id, item in clustered_items:
+        selector.push(cluster_id, item)
+
+    selected = selector.results()
+    logger.info(f"🎯 共處理 {selector.seen_count} 條候選新聞，選出前 {len(selected)} 條")
+    return selected
+
+
+def summarize_items(news_items: Iterable[NewItem], summarizer) -> Iterator[Tuple[NewItem, Dict[str, Any]]]:
+    """整批生成摘要，依輸入順序產出 (新聞, 通知用摘要項目)"""
+    news_items = list(news_items)
+    summaries: List[Optional[str]] = [None] * len(news_items)
+    if summarizer:
+        try:
+            summaries = summarizer.summarize_batch([item.content for item in news_items])
+        except Exception as e:
+            logger.error(f"❌ 批次生成摘要時出錯: {str(e)}")
+
+    for item, summary in zip(news_items, summaries):
+        if summary is None:
+            if summarizer:
+                # 批次失敗時提示查看原文
+                summary = "無法生成摘要，請查看原文。"
+            else:
+                # 備用方案：使用內容的前120字作為摘要
+                content_preview = (item.content or "無內容")
+                if len(content_preview) > 120:
+                    summary = content_preview[:120] + "..."
+                else:
+                    summary = content_preview
+        
+        logger.info(f"  ✅ 摘要: {summary[:60]}...")
+        yield item, item.to_dict(summary)
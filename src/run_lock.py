@@ -0,0 +1,56 @@
+import os
+from typing import Optional
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class RunLock:
+    """以檔案鎖防止多個爬蟲程序同時執行（程序結束時由作業系統自動釋放）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> bool:
+        """嘗試取得鎖，已被其他程序持有時立即返回False"""
+        if self._file is not None:
+            return True
+        if fcntl is None:
+            logger.warning("⚠️ 此平台不支援fcntl，無法防止重複執行")
+            return True
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        lock_file = open(self.path, 'a+')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        # 記錄持有者的PID方便排查
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def release(self):
+        """釋放鎖"""
+        if self._file is None:
+            return
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+    def holder(self) -> Optional[str]:
+        """目前持有鎖的程序PID（僅供記錄）"""
+        try:
+            with open(self.path, 'r') as file:
+                return file.read().strip() or None
+        except OSError:
+            return None
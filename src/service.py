@@ -0,0 +1,228 @@
+import math
+import signal
+import threading
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Type
+from loguru import logger
+
+from src.crawler.base_crawler import BaseCrawler, NewItem
+from src.crawler.dedup import NearDuplicateDetector
+from src.crawler.orchestrator import SourceOrchestrator
+from src.crawler.scoring import RelevanceScorer
+from src.crawler.seen_index import get_seen_index
+from src.crawler.state_store import StateStore
+from src.crawler.utils import resolve_data_path
+from src.pipeline import filter_seen, score_items, assign_clusters, select_top_k, summarize_items
+from src.summarizer.text_summarizer import TextSummarizer
+from src.notification.line_notifier import LineNotifier
+
+# 各來源預設的輪詢間隔（分鐘）：RSS更新快，列表頁與搜尋較慢且成本較高
+DEFAULT_POLL_MINUTES = {
+    'rss': 5,
+    'finance_direct': 60,
+    'google_news': 60,
+}
+
+
+class NewsService:
+    """常駐服務 - 各來源依各自的間隔輪詢，只處理上次水位之後的新聞，依設定的頻率發送摘要"""
+
+    def __init__(self, config: Dict[str, Any], crawler_classes: Dict[str, Type[BaseCrawler]]):
+        self.config = config
+        self.crawler_config = config['crawler']
+        self.crawler_classes = crawler_classes
+        self.sources = [source for source in self.crawler_config.get('sources', []) if source in crawler_classes]
+
+        service_config = config.get('service', {}) or {}
+        self.poll_minutes = dict(DEFAULT_POLL_MINUTES)
+        self.poll_minutes.update(service_config.get('poll_minutes', {}) or {})
+        self.overlap_minutes = service_config.get('overlap_minutes', 30)  # 時間範圍多往前涵蓋，避免遺漏延遲上架的新聞
+        self.digest_minutes = service_config.get('digest_minutes', 60)
+        self.breaking_score = service_config.get('breaking_score')  # 新新聞分數達此值時立即發送摘要，None為停用
+        self.tick_seconds = service_config.get('tick_seconds', 30)
+
+        self.hours_limit = self.crawler_config.get('hours_limit', 24)
+        self.max_selected = self.crawler_config.get('max_selected', 15)
+        self.buffer_size = service_config.get('buffer_size', self.max_selected * 3)  # 兩次摘要之間保留的候選數量
+        self.dedup_enabled = (self.crawler_config.get('dedup', {}) or {}).get('enabled', True)
+
+        # 水位與待發送的候選新聞跨重啟保留
+        self.state = StateStore(resolve_data_path(self.crawler_config, 'service_state.json'))
+        self.seen_index = get_seen_index(self.crawler_config)
+        self.scorer = RelevanceScorer(self.crawler_config)
+
+        # 摘要器與通知器在服務期間重複使用（模型與連線只建立一次）
+        self._summarizer: Optional[TextSummarizer] = None
+        self._notifier: Optional[LineNotifier] = None
+        self._stop_event = threading.Event()
+
+    def _interval(self, source: str) -> float:
+        """來源的輪詢間隔（秒）"""
+        return float(self.poll_minutes.get(source, 60)) * 60
+
+    def _source_state(self, source: str) -> Dict[str, float]:
+        """來源的輪詢狀態：watermark為上次成功輪詢的開始時間，attempted為上次嘗試時間"""
+        return dict((self.state.get('sources', {}) or {}).get(source, {}))
+
+    def _set_source_state(self, source: str, source_state: Dict[str, float]):
+        """更新來源的輪詢狀態"""
+        sources = dict(self.state.get('sources', {}) or {})
+        sources[source] = source_state
+        self.state.set('sources', sources)
+
+    def due_sources(self, now: float) -> List[str]:
+        """已到輪詢時間的來源"""
+        return [
+            source for source in self.sources
+            if now - self._source_state(source).get('attempted', 0) >= self._interval(source)
+        ]
+
+    def window_hours(self, source: str, now: float) -> float:
+        """本次輪詢的時間範圍：上次水位之後（加上重疊時間），最多為hours_limit"""
+        watermark = self._source_state(source).get('watermark')
+        if not watermark:
+            return float(self.hours_limit)
+        return min(float(self.hours_limit), (now - watermark) / 3600 + self.overlap_minutes / 60)
+
+    def _load_pending(self) -> List[NewItem]:
+        """待發送的候選新聞"""
+        return [NewItem.from_row(row) for row in self.state.get('pending', []) or []]
+
+    def _save_pending(self, news_items: List[NewItem]):
+        """保存待發送的候選新聞"""
+        self.state.set('pending', [item.to_row() for item in news_items])
+
+    def _rank(self, news_items: List[NewItem], now: float, k: int) -> List[NewItem]:
+        """以同一時間基準重新評分，近似重複合併後取前K則"""
+        detector = NearDuplicateDetector(self.crawler_config) if self.dedup_enabled else None
+        scored = score_items(news_items, self.scorer, datetime.fromtimestamp(now))
+        return select_top_k(assign_clusters(scored, detector), k)
+
+    def poll(self, sources: List[str], now: float) -> bool:
+        """輪詢指定來源並將新的候選新聞加入待發送清單；有突發新聞時返回True"""
+        overrides = {}
+        for source in sources:
+            window = self.window_hours(source, now)
+            overrides[source] = {'hours_limit': window, 'time_period': f"{max(1, math.ceil(window))}h"}
+            logger.info(f"📡 輪詢 {source}，時間範圍 {window:.1f} 小時")
+
+        orchestrator = SourceOrchestrator(
+            dict(self.crawler_config, sources=sources), self.crawler_classes, source_overrides=overrides
+        )
+
+        pending = self._load_pending()
+        known_urls = {item.canonical_url for item in pending}
+        new_items = []
+        for item in filter_seen(orchestrator.iter_items(), self.seen_index):
+            if item.canonical_url in known_urls:
+                continue
+            known_urls.add(item.canonical_url)
+            new_items.append(item)
+
+        # 只有於期限內正常完成的來源才推進水位，逾時或出錯者下次以較大的時間範圍補抓
+        for source in sources:
+            source_state = self._source_state(source)
+            source_state['attempted'] = now
+            if source in orchestrator.completed_sources:
+                source_state['watermark'] = now
+            self._set_source_state(source, source_state)
+
+        pending = self._rank(pending + new_items, now, self.buffer_size)
+        self._save_pending(pending)
+        logger.info(f"📥 新增 {len(new_items)} 條候選新聞，待發送 {len(pending)} 條")
+
+        if self.breaking_score is None:
+            return False
+        new_urls = {item.canonical_url for item in new_items}
+        return any(item.priority_score >= self.breaking_score for item in pending if item.canonical_url in new_urls)
+
+    def _get_summarizer(self) -> Optional[TextSummarizer]:
+        """取得摘要器，初始化失敗時使用備用摘要方案"""
+        if self._summarizer is None:
+            try:
+                self._summarizer = TextSummarizer(self.config['summarizer'])
+            except Exception as e:
+                logger.error(f"❌ 摘要器初始化失敗: {str(e)}")
+                return None
+        return self._summarizer
+
+    def _get_notifier(self) -> LineNotifier:
+        """取得Line通知器"""
+        if self._notifier is None:
+            self._notifier = LineNotifier(self.config['line_notify'])
+        return self._notifier
+
+    def digest(self, now: float):
+        """為待發送的候選新聞生成摘要並發送"""
+        notifier = self._get_notifier()
+        pending = self._load_pending()
+        self.state.set('last_digest', now)
+
+        if not pending:
+            # 沒有新新聞時仍重送先前未送出的通知
+            if notifier.outbox:
+                notifier.deliver_pending()
+            return
+
+        selected = self._rank(pending, now, self.max_selected)
+        logger.info(f"📝 生成 {len(selected)} 條新聞的摘要")
+
+        summarized = list(summarize_items(selected, self._get_summarizer()))
+        news_summaries = [summary_item for _, summary_item in summarized]
+
+        # 已送出或已寫入發送佇列才清除候選並記為已處理，否則留待下次摘要重試
+        result = notifier.send_news_summary(news_summaries)
+        if not result.accepted:
+            logger.error(f"❌ 發送Line通知失敗，{len(pending)} 條候選新聞保留至下次摘要")
+            return
+
+        if result.sent:
+            logger.info(f"✅ 成功發送 {len(news_summaries)} 條新聞到Line")
+        else:
+            logger.warning("📮 部分訊息尚未送出，已保留在發送佇列，稍後重送")
+        if self.seen_index:
+            for item, _ in summarized:
+                self.seen_index.mark_keys(item.canonical_url, item.identity_hash(), stage='summarized')
+
+        self._save_pending([])
+        self.state.save()
+
+    def tick(self, now: Optional[float] = None):
+        """執行一次排程檢查：輪詢到期的來源，到達摘要時間或有突發新聞時發送摘要"""
+        now = now or time.time()
+        try:
+            breaking = False
+            due = self.due_sources(now)
+            if due:
+                breaking = self.poll(due, now)
+
+            if breaking:
+                logger.info("🚨 有突發新聞，立即發送摘要")
+            if breaking or now - self.state.get('last_digest', 0) >= self.digest_minutes * 60:
+                self.digest(now)
+        except Exception as e:
+            logger.error(f"❌ 排程執行時出錯: {str(e)}")
+            import traceback
+            logger.error(f"🔍 詳細錯誤: {traceback.format_exc()}")
+        finally:
+            self.state.save()
+
+    def stop(self, *args):
+        """停止服務（目前的工作完成後結束）"""
+        logger.info("🛑 收到停止訊號，服務即將結束")
+        self._stop_event.set()
+
+    def run_forever(self):
+        """持續執行直到收到停止訊號"""
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        intervals = ", ".join(f"{source} 每 {self._interval(source) / 60:.0f} 分鐘" for source in self.sources)
+        logger.info(f"🤖 常駐服務已啟動：{intervals}；摘要每 {self.digest_minutes} 分鐘發送")
+
+        while not self._stop_event.is_set():
+            self.tick()
+            self._stop_event.wait(self.tick_seconds)
+
+        logger.info("👋 常駐服務已結束")
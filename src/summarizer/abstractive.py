@@ -0,0 +1,118 @@
+import math
+import threading
+import time
+from typing import List, Dict, Any, Optional
+from loguru import logger
+
+# mT5-base（約5.8億參數），首次使用需下載約2.3GB的權重，載入後約佔2.5GB記憶體；
+# 目前沒有同等品質、支援中文的較小摘要模型，可改用其他seq2seq模型以節省資源
+DEFAULT_MODEL_NAME = "csebuetnlp/mT5_multilingual_XLSum"
+
+# mT5的SentencePiece詞彙中，每個中文token平均約對應1.5個字元
+CHARS_PER_TOKEN = 1.5
+
+
+class AbstractiveSummarizer:
+    """生成式摘要後端 - 首次使用才載入模型，只用CPU，依長度分桶批次推論並受時間預算限制"""
+
+    def __init__(self, config: Dict[str, Any]):
+        abstractive_config = config.get('abstractive', {}) or {}
+        self.model_name = abstractive_config.get('model_name', DEFAULT_MODEL_NAME)
+        self.max_input_tokens = abstractive_config.get('max_input_tokens', 512)
+        self.batch_size = abstractive_config.get('batch_size', 4)
+        self.num_beams = abstractive_config.get('num_beams', 2)
+        self.num_threads = abstractive_config.get('num_threads', 0)  # 0為PyTorch預設
+        self.time_budget = abstractive_config.get('time_budget', 300)  # 每次執行的推論時間預算（秒）
+        self.max_length = config.get('max_length', 120)  # 摘要的字元數上限
+        # 生成的token數上限：未設定時由字元數上限換算，並留一些餘裕讓句子能自然結束
+        self.max_new_tokens = abstractive_config.get('max_new_tokens') or math.ceil(self.max_length / CHARS_PER_TOKEN) + 8
+
+        self._tokenizer = None
+        self._model = None
+        self._torch = None
+        self._load_failed = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> bool:
+        """載入模型（只執行一次）；transformers或模型無法使用時返回False"""
+        with self._lock:
+            if self._model is not None:
+                return True
+            if self._load_failed:
+                return False
+
+            logger.info(f"🧠 載入生成式摘要模型 {self.model_name}（首次使用需下載模型權重）")
+            started = time.monotonic()
+            try:
+                import torch
+                from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+                if self.num_threads:
+                    torch.set_num_threads(self.num_threads)
+                self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                self._model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name).to('cpu').eval()
+                self._torch = torch
+            except Exception as e:
+                self._load_failed = True
+                logger.warning(f"⚠️ 無法載入生成式摘要模型 {self.model_name}，改用擷取式摘要: {str(e)}")
+                return False
+
+            logger.info(f"🧠 生成式摘要模型載入完成: {self.model_name} (耗時 {time.monotonic() - started:.1f} 秒)")
+            return True
+
+    def summarize_batch(self, texts: List[str]) -> List[Optional[str]]:
+        """批次生成摘要；逾時或失敗的項目為None，由呼叫端改用擷取式摘要"""
+        results: List[Optional[str]] = [None] * len(texts)
+        if not texts or not self._load():
+            return results
+
+        deadline = time.monotonic() + self.time_budget
+
+        # 依輸入長度排序後分批，同一批長度相近，減少補齊的浪費
+        lengths = [len(self._tokenizer(text, truncation=True, max_length=self.max_input_tokens)['input_ids'])
+                   for text in texts]
+        order = sorted(range(len(texts)), key=lambda index: lengths[index])
+
+        for start in range(0, len(order), self.batch_size):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"⏰ 生成式摘要超出時間預算，{len(order) - start} 則改用擷取式摘要")
+                break
+
+            batch = order[start:start + self.batch_size]
+            try:
+                outputs = self._generate([texts[index] for index in batch], remaining)
+            except Exception as e:
+                logger.error(f"❌ 生成式摘要失敗: {str(e)}")
+                continue
+
+            # 超出字元數上限者由TextSummarizer的最終清理在句號處截斷
+            for index, output in zip(batch, outputs):
+                results[index] = (output or '').strip() or None
+
+        return results
+
+    def _generate(self, texts: List[str], max_time: float) -> List[Optional[str]]:
+        """對一批文字推論；因max_time中途停止、未產生結束符號的序列為None"""
+        inputs = self._tokenizer(
+            texts, return_tensors='pt', padding=True, truncation=True, max_length=self.max_input_tokens
+        )
+        started = time.monotonic()
+        with self._torch.no_grad():
+            output_ids = self._model.generate(
+                **inputs,
+                max_new_tokens=self.max_new_tokens,
+                num_beams=self.num_beams,
+                no_repeat_ngram_size=3,
+                max_time=max_time  # 超過剩餘預算即停止生成
+            )
+        outputs = self._tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+        if time.monotonic() - started < max_time:
+            return outputs
+
+        # 達到max_time時generate仍返回已生成的部分，沒有結束符號者為截斷的摘要
+        eos_token_id = self._tokenizer.eos_token_id
+        finished = [eos_token_id in row.tolist() for row in output_ids]
+        if not all(finished):
+            logger.warning(f"⏰ 生成式摘要達到時間上限，{finished.count(False)} 則未完成")
+        return [output if done else None for output, done in zip(outputs, finished)]
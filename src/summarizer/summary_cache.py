@@ -0,0 +1,69 @@
+import sqlite3
+import threading
+import time
+from typing import Optional
+from loguru import logger
+
+
+class SummaryCache:
+    """摘要的持久快取 - 以清理後內容與摘要設定的雜湊為鍵，超過TTL或數量上限時淘汰最久未使用者"""
+
+    def __init__(self, path: str, ttl_days: float = 30, max_entries: int = 5000, purge_every: int = 100):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self.max_entries = max_entries
+        self.purge_every = purge_every  # 每寫入此數量後淘汰一次，常駐服務中快取不會無限成長
+        self._puts_since_purge = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "cache_key TEXT PRIMARY KEY, summary TEXT, created_at REAL, last_access REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_access ON summaries(last_access)")
+        self._conn.commit()
+        self.purge()
+
+    def get(self, cache_key: str) -> Optional[str]:
+        """取得快取的摘要並更新使用時間"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM summaries WHERE cache_key = ? AND created_at >= ?",
+                (cache_key, time.time() - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE summaries SET last_access = ? WHERE cache_key = ?", (time.time(), cache_key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, cache_key: str, summary: str):
+        """保存摘要，每寫入purge_every筆執行一次淘汰"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (cache_key, summary, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (cache_key, summary, now, now)
+            )
+            self._conn.commit()
+            self._puts_since_purge += 1
+            should_purge = self._puts_since_purge >= self.purge_every
+        if should_purge:
+            self.purge()
+
+    def purge(self) -> int:
+        """淘汰過期與超出數量上限的摘要"""
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM summaries WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+            removed += self._conn.execute(
+                "DELETE FROM summaries WHERE cache_key IN ("
+                "SELECT cache_key FROM summaries ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+            self._conn.commit()
+            self._puts_since_purge = 0
+        if removed:
+            logger.info(f"🧹 摘要快取淘汰 {removed} 筆舊記錄")
+        return removed
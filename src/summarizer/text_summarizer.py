@@ -1,7 +1,42 @@
+import hashlib
+import json
 import re
-from typing import Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Set, Tuple
 from loguru import logger
 
+from src.crawler.keyword_matcher import KeywordMatcher
+from src.crawler.utils import resolve_data_path
+from .abstractive import AbstractiveSummarizer
+from .summary_cache import SummaryCache
+
+# 深度清理時依序移除的常見無用文字
+# 相鄰的「刪除到結尾」樣式合併為一組：依序套用等同於從最早的命中處截斷，合併不改變結果
+NOISE_PATTERN_GROUPS = [
+    [r'點擊.*?更多'],
+    [r'繼續閱讀.*', r'更多新聞.*'],
+    [r'記者.*?報導'],
+    [r'【.*?】'],
+    [r'\[.*?\]'],
+    [r'圖片來源.*', r'資料來源.*', r'廣告.*', r'AD.*']
+]
+
+# 工作行程中的摘要器（由initializer建立）
+_worker_summarizer = None
+
+
+def _init_worker(config: Dict[str, Any]):
+    """工作行程初始化：每個行程建立一次摘要器"""
+    global _worker_summarizer
+    # 快取由主行程統一查詢與寫入
+    _worker_summarizer = TextSummarizer(dict(config, cache={'enabled': False}))
+
+
+def _summarize_in_worker(content: str) -> str:
+    """在工作行程中生成摘要"""
+    return _worker_summarizer.summarize(content)
+
+
 class TextSummarizer:
     """修正版文字摘要器 - 解決逗號問題"""
     
@@ -18,6 +53,59 @@ class TextSummarizer:
             '利變壽險', '年金險', '儲蓄險', '理賠', '給付', '保費', '保單'
         ]
         
+        # 預先編譯的關鍵詞比對器
+        self.insurance_matcher = KeywordMatcher(self.insurance_keywords)
+        self.sentence_topic_matcher = KeywordMatcher(
+            ['保險', '壽險', '新光', '台新', '理賠', '保單', '醫療', '健康', '意外', '投資']
+        )
+        self.sentence_score_matcher = KeywordMatcher({
+            'company': ['新光人壽', '台新人壽', '新光金控', '台新金控'],
+            'product': ['健康險', '醫療險', '投資型保險', '利變壽險', '意外險'],
+            'action': ['推出', '發布', '宣布', '理賠', '給付', '調整']
+        })
+        self.sentence_tier_scores = {'company': 10, 'product': 8, 'action': 6}
+        
+        # 預先編譯的清理樣式
+        self._tag_pattern = re.compile(r'<[^>]+>')
+        self._space_pattern = re.compile(r'\s+')
+        self._invalid_char_pattern = re.compile(r'[^\u4e00-\u9fff\w\s。！？；：，（）「」『』""''．]')
+        self._noise_patterns = [
+            re.compile('|'.join(f'(?:{pattern})' for pattern in group), re.IGNORECASE)
+            for group in NOISE_PATTERN_GROUPS
+        ]
+        self._sentence_split_pattern = re.compile(r'[。！？]')
+        self._leading_connector_pattern = re.compile(r'^[，,、而且此外另外同時]')
+        self._leading_comma_pattern = re.compile(r'^[，,、]')
+        self._figure_pattern = re.compile(r'\d+[億萬元%]')
+        self._cleanup_steps = [
+            (re.compile(r'，+'), '，'),  # 移除多餘的逗號
+            (re.compile(r',+'), '，'),
+            (re.compile(r'。，'), '。'),  # 移除句子間的逗號（這是造成問題的主因）
+            (re.compile(r'，(?=[。！？])'), ''),
+            (re.compile(r'。+'), '。'),  # 移除重複的句號
+            (re.compile(r'^[，,。]'), ''),  # 移除開頭的標點符號
+        ]
+        
+        # 大量摘要時可分散到多個行程，結果維持輸入順序
+        self.batch_workers = config.get('batch_workers', 0)
+        self.batch_parallel_threshold = config.get('batch_parallel_threshold', 50)
+        
+        # 生成式摘要後端（type: "abstractive"），模型於首次使用時載入
+        self.abstractive = AbstractiveSummarizer(config) if self.summary_type == 'abstractive' else None
+        
+        # 摘要快取：鍵包含摘要設定，設定改變時自動失效
+        cache_config = config.get('cache', {}) or {}
+        self.cache = SummaryCache(
+            resolve_data_path(config, 'summary_cache.sqlite3'),
+            ttl_days=cache_config.get('ttl_days', 30),
+            max_entries=cache_config.get('max_entries', 5000),
+            purge_every=cache_config.get('purge_every', 100)
+        ) if cache_config.get('enabled', True) else None
+        model_name = self.abstractive.model_name if self.abstractive else None
+        self._config_fingerprint = json.dumps(
+            [self.max_length, self.summary_type, model_name, self.insurance_keywords], ensure_ascii=False
+        )
+        
         logger.info(f"📝 摘要器初始化完成，最大長度: {self.max_length}")
     
     def summarize(self, content: str) -> str:
@@ -25,6 +113,22 @@ class TextSummarizer:
         if not content or len(content.strip()) < 20:
             return "內容過短，無法生成摘要"
         
+        if self.abstractive:
+            return self.summarize_batch([content])[0]
+        
+        cache_key = self._cache_key(content) if self.cache else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        summary = self._summarize_uncached(content)
+        if cache_key:
+            self.cache.put(cache_key, summary)
+        return summary
+    
+    def _summarize_uncached(self, content: str) -> str:
+        """不經快取生成摘要"""
         try:
             # 使用簡化但穩定的摘要方法
             return self._create_clean_summary(content)
@@ -33,6 +137,75 @@ class TextSummarizer:
             logger.error(f"❌ 摘要生成失敗: {str(e)}")
             return self._simple_fallback(content)
     
+    def _abstractive_batch(self, contents: List[str]) -> Tuple[List[str], Set[int]]:
+        """以生成式後端批次摘要，逾時或失敗者改用擷取式摘要；返回 (摘要, 改用擷取式的位置)"""
+        generated = self.abstractive.summarize_batch([self._deep_clean_content(content) for content in contents])
+        
+        summaries = []
+        fallbacks = set()
+        for position, (content, summary) in enumerate(zip(contents, generated)):
+            if summary:
+                summaries.append(self._final_cleanup(summary))
+            else:
+                summaries.append(self._summarize_uncached(content))
+                fallbacks.add(position)
+        
+        if fallbacks:
+            logger.info(f"📝 {len(fallbacks)}/{len(contents)} 則改用擷取式摘要")
+        return summaries, fallbacks
+    
+    def _cache_key(self, content: str) -> str:
+        """快取鍵：清理後內容與摘要設定的雜湊"""
+        cleaned_content = self._deep_clean_content(content)
+        return hashlib.sha1(f"{self._config_fingerprint}\n{cleaned_content}".encode('utf-8')).hexdigest()
+    
+    def summarize_batch(self, contents: List[Optional[str]]) -> List[str]:
+        """批次生成摘要，結果依輸入順序返回；數量達門檻且設定了工作行程時以行程池並行"""
+        contents = list(contents)
+        summaries: List[Optional[str]] = [None] * len(contents)
+        
+        # 先以快取處理重複內容，只有未命中的才實際生成
+        pending = []
+        cache_hits = 0
+        for index, content in enumerate(contents):
+            if not content or len(content.strip()) < 20:
+                summaries[index] = "內容過短，無法生成摘要"
+                continue
+            cache_key = self._cache_key(content) if self.cache else None
+            cached = self.cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                summaries[index] = cached
+                cache_hits += 1
+            else:
+                pending.append((index, content, cache_key))
+        
+        if cache_hits:
+            logger.info(f"💾 摘要快取命中 {cache_hits}/{len(contents)} 則")
+        
+        results = None
+        uncacheable = set()  # 生成式逾時改用擷取式的結果不寫入快取，下次仍嘗試生成
+        if self.abstractive and pending:
+            results, uncacheable = self._abstractive_batch([content for _, content, _ in pending])
+        elif self.batch_workers > 1 and len(pending) >= self.batch_parallel_threshold:
+            try:
+                chunksize = max(1, len(pending) // (self.batch_workers * 4))
+                with ProcessPoolExecutor(max_workers=self.batch_workers, initializer=_init_worker,
+                                         initargs=(self.config,)) as executor:
+                    results = list(executor.map(_summarize_in_worker, [content for _, content, _ in pending],
+                                                chunksize=chunksize))
+            except Exception as e:
+                logger.warning(f"⚠️ 行程池摘要失敗，改為逐則處理: {str(e)}")
+        
+        if results is None:
+            results = [self._summarize_uncached(content) for _, content, _ in pending]
+        
+        for position, ((index, _, cache_key), summary) in enumerate(zip(pending, results)):
+            summaries[index] = summary
+            if cache_key and position not in uncacheable:
+                self.cache.put(cache_key, summary)
+        
+        return summaries
+    
     def _create_clean_summary(self, content: str) -> str:
         """創建乾淨的摘要"""
         try:
@@ -63,35 +236,22 @@ class TextSummarizer:
     def _deep_clean_content(self, content: str) -> str:
         """深度清理內容"""
         # 移除HTML標籤
-        content = re.sub(r'<[^>]+>', '', content)
+        content = self._tag_pattern.sub('', content)
         
         # 移除多餘空白和特殊字符
-        content = re.sub(r'\s+', ' ', content)
-        content = re.sub(r'[^\u4e00-\u9fff\w\s。！？；：，（）「」『』""''．]', '', content)
+        content = self._space_pattern.sub(' ', content)
+        content = self._invalid_char_pattern.sub('', content)
         
         # 移除常見無用文字
-        remove_patterns = [
-            r'點擊.*?更多',
-            r'繼續閱讀.*',
-            r'更多新聞.*',
-            r'記者.*?報導',
-            r'【.*?】',
-            r'\[.*?\]',
-            r'圖片來源.*',
-            r'資料來源.*',
-            r'廣告.*',
-            r'AD.*'
-        ]
-        
-        for pattern in remove_patterns:
-            content = re.sub(pattern, '', content, flags=re.IGNORECASE)
+        for pattern in self._noise_patterns:
+            content = pattern.sub('', content)
         
         return content.strip()
     
     def _extract_meaningful_sentences(self, content: str) -> list:
         """提取有意義的句子"""
         # 按句號分割
-        sentences = re.split(r'[。！？]', content)
+        sentences = self._sentence_split_pattern.split(content)
         
         meaningful_sentences = []
         
@@ -103,11 +263,11 @@ class TextSummarizer:
                 continue
             if len(sentence) > 150:  # 太長
                 continue
-            if not any(keyword in sentence for keyword in ['保險', '壽險', '新光', '台新', '理賠', '保單', '醫療', '健康', '意外', '投資']):
+            if not self.sentence_topic_matcher.contains_any(sentence):
                 continue
             
             # 移除開頭的連接詞
-            sentence = re.sub(r'^[，,、而且此外另外同時]', '', sentence)
+            sentence = self._leading_connector_pattern.sub('', sentence)
             sentence = sentence.strip()
             
             if sentence:
@@ -124,22 +284,11 @@ class TextSummarizer:
         scored_sentences = []
         
         for sentence in sentences:
-            score = 0
-            
-            # 包含公司名稱加分
-            if any(company in sentence for company in ['新光人壽', '台新人壽', '新光金控', '台新金控']):
-                score += 10
-            
-            # 包含具體險種加分
-            if any(product in sentence for product in ['健康險', '醫療險', '投資型保險', '利變壽險', '意外險']):
-                score += 8
-            
-            # 包含重要動作加分
-            if any(action in sentence for action in ['推出', '發布', '宣布', '理賠', '給付', '調整']):
-                score += 6
+            # 公司名稱、具體險種、重要動作各層級命中即加分（單次掃描）
+            score = sum(self.sentence_tier_scores[tier] for tier in self.sentence_score_matcher.tiers_in(sentence))
             
             # 包含數字資訊加分
-            if re.search(r'\d+[億萬元%]', sentence):
+            if self._figure_pattern.search(sentence):
                 score += 4
             
             # 句子長度適中加分
@@ -175,7 +324,7 @@ class TextSummarizer:
         
         for sentence in sentences:
             # 移除句子開頭的逗號和連接詞
-            sentence = re.sub(r'^[，,、]', '', sentence)
+            sentence = self._leading_comma_pattern.sub('', sentence)
             sentence = sentence.strip()
             
             # 確保句子有適當結尾
@@ -191,19 +340,9 @@ class TextSummarizer:
     
     def _final_cleanup(self, summary: str) -> str:
         """最終清理"""
-        # 移除多餘的逗號
-        summary = re.sub(r'，+', '，', summary)
-        summary = re.sub(r',+', '，', summary)
-        
-        # 移除句子間的逗號（這是造成問題的主因）
-        summary = re.sub(r'。，', '。', summary)
-        summary = re.sub(r'，(?=[。！？])', '', summary)
-        
-        # 移除重複的句號
-        summary = re.sub(r'。+', '。', summary)
-        
-        # 移除開頭和結尾的標點符號
-        summary = re.sub(r'^[，,。]', '', summary)
+        # 移除多餘的逗號、句子間的逗號與重複的句號
+        for pattern, replacement in self._cleanup_steps:
+            summary = pattern.sub(replacement, summary)
         
         # 確保結尾正確
         if not summary.endswith(('。', '！', '？')):
@@ -225,8 +364,8 @@ class TextSummarizer:
         """簡單備用方案"""
         try:
             # 清理內容
-            content = re.sub(r'<[^>]+>', '', content)
-            content = re.sub(r'\s+', ' ', content)
+            content = self._tag_pattern.sub('', content)
+            content = self._space_pattern.sub(' ', content)
             
             # 找第一個包含保險關鍵詞的段落
             sentences = content.split('。')
@@ -234,10 +373,10 @@ class TextSummarizer:
             for sentence in sentences:
                 sentence = sentence.strip()
                 if (len(sentence) > 20 and 
-                    any(keyword in sentence for keyword in self.insurance_keywords)):
+                    self.insurance_matcher.contains_any(sentence)):
                     
                     # 清理並返回
-                    sentence = re.sub(r'^[，,、]', '', sentence)
+                    sentence = self._leading_comma_pattern.sub('', sentence)
                     if not sentence.endswith(('。', '！', '？')):
                         sentence += '。'
                     
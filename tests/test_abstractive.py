@@ -0,0 +1,77 @@
+import time
+
+from src.summarizer.abstractive import AbstractiveSummarizer
+
+EOS = 1
+
+
+class FakeRow(list):
+    def tolist(self):
+        return list(self)
+
+
+class FakeTokenizer:
+    eos_token_id = EOS
+
+    def __call__(self, texts, **kwargs):
+        if isinstance(texts, str):
+            return {'input_ids': [0] * len(texts)}
+        return {'input_ids': [[0] * len(text) for text in texts]}
+
+    def batch_decode(self, rows, skip_special_tokens=True):
+        return [f"摘要{len(row)}" for row in rows]
+
+
+class FakeModel:
+    def __init__(self, rows, delay=0.0):
+        self.rows = rows
+        self.delay = delay
+        self.max_new_tokens = None
+
+    def generate(self, input_ids=None, max_time=None, max_new_tokens=None, **kwargs):
+        self.max_new_tokens = max_new_tokens
+        time.sleep(self.delay)
+        return [FakeRow(row) for row in self.rows]
+
+
+class FakeTorch:
+    class no_grad:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return False
+
+
+def make_summarizer(model):
+    summarizer = AbstractiveSummarizer({'abstractive': {'batch_size': 2, 'time_budget': 0.05}})
+    summarizer._tokenizer = FakeTokenizer()
+    summarizer._model = model
+    summarizer._torch = FakeTorch
+    return summarizer
+
+
+def test_sequences_cut_by_max_time_are_dropped():
+    summarizer = make_summarizer(FakeModel([[5, 6, EOS], [5, 6, 7]], delay=0.1))
+
+    assert summarizer.summarize_batch(["第一則", "第二則"]) == ["摘要3", None]
+
+
+def test_sequences_without_eos_are_kept_when_within_time():
+    summarizer = make_summarizer(FakeModel([[5, 6, EOS], [5, 6, 7]]))
+
+    assert summarizer.summarize_batch(["第一則", "第二則"]) == ["摘要3", "摘要3"]
+
+
+def test_character_budget_is_converted_to_tokens():
+    model = FakeModel([[5, EOS]])
+    summarizer = make_summarizer(model)
+    summarizer.summarize_batch(["第一則"])
+
+    # 120字元約為80個token，加上結束句子的餘裕
+    assert model.max_new_tokens == 88
+
+
+def test_max_new_tokens_can_be_configured():
+    summarizer = AbstractiveSummarizer({'max_length': 120, 'abstractive': {'max_new_tokens': 40}})
+    assert summarizer.max_new_tokens == 40
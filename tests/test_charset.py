@@ -0,0 +1,85 @@
+import pytest
+import requests
+
+from src.crawler import charset as charset_module
+from src.crawler.charset import CharsetResolver, normalize_charset
+
+TEXT = '新光人壽今日宣布推出全新實支實付醫療險，強化住院與手術保障，預計下月起開賣。' * 3
+
+
+def make_response(content, content_type='text/html', url='https://news.example/a'):
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = content
+    response.headers['Content-Type'] = content_type
+    return response
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('UTF-8', 'utf-8'),
+    ('"big5"', 'cp950'),
+    ('GB2312', 'gb18030'),
+    ('us-ascii', 'utf-8'),
+    ('no-such-charset', None),
+    (None, None),
+])
+def test_normalize_charset(name, expected):
+    assert normalize_charset(name) == expected
+
+
+def test_header_charset_wins_over_meta():
+    resolver = CharsetResolver()
+    body = b'<html><head><meta charset="utf-8"></head>' + TEXT.encode('big5')
+    response = resolver.apply(make_response(body, 'text/html; charset=Big5'))
+
+    assert response.encoding == 'cp950'
+    assert TEXT in response.text
+
+
+@pytest.mark.parametrize('meta', [
+    b'<meta charset="big5">',
+    b'<meta http-equiv="Content-Type" content="text/html; charset=big5">',
+])
+def test_meta_charset(meta):
+    body = b'<html><head>' + meta + b'</head><body>' + TEXT.encode('cp950') + b'</body></html>'
+    assert CharsetResolver().resolve(make_response(body)) == 'cp950'
+
+
+def test_meta_beyond_scan_window_is_ignored():
+    body = b' ' * 200 + b'<meta charset="big5">' + TEXT.encode('utf-8')
+    assert CharsetResolver(meta_scan_bytes=100).resolve(make_response(body)) == 'utf-8'
+
+
+def test_utf8_sample_cut_inside_a_character():
+    body = TEXT.encode('utf-8')
+    # 樣本長度落在三位元組字元中間
+    assert CharsetResolver(sample_bytes=4).resolve(make_response(body)) == 'utf-8'
+
+
+@pytest.mark.skipif(not charset_module.CHARDET_AVAILABLE, reason='需要chardet')
+def test_detects_big5_without_declaration():
+    response = CharsetResolver().apply(make_response(TEXT.encode('cp950')))
+    assert response.encoding == 'cp950'
+    assert response.text == TEXT
+
+
+def test_detected_charset_is_cached_per_host(monkeypatch):
+    resolver = CharsetResolver()
+    calls = []
+
+    def detect(content):
+        calls.append(content)
+        return 'cp950'
+
+    monkeypatch.setattr(resolver, '_detect', detect)
+    first = make_response(TEXT.encode('cp950'), url='https://news.example/a')
+    second = make_response(TEXT.encode('cp950'), url='https://NEWS.example/b')
+    other_host = make_response(TEXT.encode('cp950'), url='https://other.example/a')
+
+    assert resolver.resolve(first) == 'cp950'
+    assert resolver.resolve(second) == 'cp950'
+    assert len(calls) == 1
+
+    resolver.resolve(other_host)
+    assert len(calls) == 2
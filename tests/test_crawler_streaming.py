@@ -0,0 +1,106 @@
+import json
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+import requests
+
+from src.crawler.finance_direct_crawler import FinanceNewsDirectCrawler
+from src.crawler.rss_crawler import RssCrawler
+
+FAST_FEED = 'https://fast.example/rss'
+SLOW_FEED = 'https://slow.example/rss'
+
+
+def make_response(url, body, content_type='text/html; charset=utf-8'):
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body.encode('utf-8')
+    response.headers['Content-Type'] = content_type
+    return response
+
+
+def make_feed(guid, title):
+    now = format_datetime(datetime.now(timezone.utc))
+    return (
+        '<?xml version="1.0"?><rss version="2.0"><channel><title>測試</title>'
+        f'<item><guid>{guid}</guid><title>{title}</title><link>https://news.example/{guid}</link>'
+        f'<pubDate>{now}</pubDate><description>{"保險業者推出新的醫療險保單" * 10}</description></item>'
+        '</channel></rss>'
+    )
+
+
+def make_rss_crawler(tmp_path):
+    return RssCrawler({
+        'search_terms': ['保險'],
+        'state_dir': str(tmp_path),
+        'seen_index': {'enabled': False},
+        'extraction_profiles': {'enabled': False},
+        'rss_feeds': [FAST_FEED, SLOW_FEED],
+    })
+
+
+def test_rss_yields_each_feed_as_it_completes(tmp_path):
+    crawler = make_rss_crawler(tmp_path)
+    release = threading.Event()
+    slow_finished = threading.Event()
+
+    def fetch(url, headers=None, **kwargs):
+        if url == SLOW_FEED:
+            release.wait(5)
+            slow_finished.set()
+            return make_response(url, make_feed('slow', '壽險業者調整保費'), 'application/rss+xml')
+        return make_response(url, make_feed('fast', '壽險業者推出新保單'), 'application/rss+xml')
+
+    crawler._fetch = fetch
+    items = crawler.iter_crawl()
+
+    first = next(items)
+    assert first.url == 'https://news.example/fast'
+    assert not slow_finished.is_set()
+
+    # 取消後不再產出，已完成訂閱源的狀態仍會保存
+    crawler.cancel()
+    release.set()
+    assert list(items) == []
+
+    with open(tmp_path / 'feed_state.json', encoding='utf-8') as f:
+        state = json.load(f)
+    assert state[FAST_FEED]['pending_ids'] == ['fast']
+    assert SLOW_FEED not in state
+
+
+def make_finance_crawler(tmp_path, max_requests):
+    crawler = FinanceNewsDirectCrawler({
+        'search_terms': ['保險'],
+        'state_dir': str(tmp_path),
+        'seen_index': {'enabled': False},
+        'extraction_profiles': {'enabled': False},
+        'publish_time': {'head_fetch': False},
+        'finance_body_fetch': {'max_requests': max_requests},
+    })
+    crawler.sites = [
+        {'name': '網站A', 'url': 'https://a.example/list', 'article_selector': 'a', 'base_url': 'https://a.example'},
+        {'name': '網站B', 'url': 'https://b.example/list', 'article_selector': 'a', 'base_url': 'https://b.example'},
+    ]
+    return crawler
+
+
+def test_finance_body_requests_are_shared_across_sites(tmp_path, monkeypatch):
+    crawler = make_finance_crawler(tmp_path, max_requests=1)
+    article_requests = []
+
+    def fetch(url, **kwargs):
+        if url.endswith('/list'):
+            return make_response(url, '<html><body><a href="/news/1">新光人壽推出新的健康險保單</a></body></html>')
+        article_requests.append(url)
+        return make_response(url, f'<html><body><article><p>{"新光人壽今日宣布推出健康險新商品。" * 10}</p></article></body></html>')
+
+    crawler._fetch = fetch
+    monkeypatch.setattr(crawler.http, 'is_cached', lambda url, kind: False)
+    items = list(crawler.iter_crawl())
+
+    assert sorted(item.source for item in items) == ['網站A', '網站B']
+    assert len(article_requests) == 1
+    assert sum(item.body_fetched for item in items) == 1
@@ -0,0 +1,151 @@
+import io
+import os
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+
+from src.crawler.google_news_crawler import GoogleNewsCrawler
+from src.crawler.html_parser import HtmlParser
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+NOW = datetime(2024, 1, 1, 12, 0)
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as file:
+        return file.read()
+
+
+def make_crawler(tmp_path, **overrides):
+    config = {
+        'search_terms': ['新光人壽'],
+        'state_dir': str(tmp_path),
+        'seen_index': {'enabled': False},
+        'hours_limit': 24,
+    }
+    config.update(overrides)
+    return GoogleNewsCrawler(config)
+
+
+@pytest.mark.parametrize('backend', ['lxml', 'bs4'])
+def test_extract_headed_links_basic_layout(backend):
+    cards = HtmlParser(backend).extract_headed_links(load_fixture('google_news_basic.html'))
+
+    assert [title for _, title, _ in cards] == [
+        '新光人壽推出新醫療險 保障範圍擴大', '壽險業上半年獲利回溫', '查看更多新光人壽相關新聞', '相關搜尋'
+    ]
+    href, _, texts = cards[0]
+    assert href.startswith('/url?q=https://money.udn.com/')
+    # 來源在連結內，時間與摘要在連結之外的同一張卡片
+    assert texts[1:3] == ['經濟日報', '3 小時前']
+    assert texts[-1].startswith('新光人壽今日宣布')
+
+
+@pytest.mark.parametrize('backend', ['lxml', 'bs4'])
+def test_extract_headed_links_modern_layout(backend):
+    cards = HtmlParser(backend).extract_headed_links(load_fixture('google_news_modern.html'))
+
+    assert len(cards) == 4
+    href, title, texts = cards[0]
+    assert href == 'https://news.cnyes.com/news/id/5500001'
+    assert title == '台新人壽理賠申請全面數位化'
+    assert texts == ['鉅亨網', title, '台新人壽宣布理賠申請全面數位化，保戶透過App即可完成申請，平均理賠天數縮短至三天。', '5 小時前']
+
+
+def test_parse_results_basic_layout(tmp_path):
+    crawler = make_crawler(tmp_path)
+    cards = crawler.html_parser.extract_headed_links(load_fixture('google_news_basic.html'))
+
+    items = crawler.parse_results(cards, '新光人壽', now=NOW)
+
+    # 2天前的新聞超出24小時，站內搜尋連結不是新聞
+    assert len(items) == 1
+    item = items[0]
+    assert item.url == 'https://money.udn.com/money/story/5613/7890123'
+    assert item.source == '經濟日報'
+    assert item.published_time == NOW - timedelta(hours=3)
+    assert item.content.startswith('新光人壽今日宣布推出全新實支實付醫療險')
+    assert item.keyword == '新光人壽'
+
+
+def test_parse_results_modern_layout(tmp_path):
+    crawler = make_crawler(tmp_path)
+    cards = crawler.html_parser.extract_headed_links(load_fixture('google_news_modern.html'))
+
+    items = crawler.parse_results(cards, '台新人壽', now=NOW)
+
+    assert [(item.source, item.published_time) for item in items] == [
+        ('鉅亨網', NOW - timedelta(hours=5)),
+        ('工商時報', NOW - timedelta(minutes=45)),
+    ]
+    assert items[1].url.startswith('https://news.google.com/rss/articles/')
+    assert items[0].content.startswith('台新人壽宣布理賠申請全面數位化')
+
+
+class FakeSeenIndex:
+    def __init__(self, urls):
+        self.urls = set(urls)
+
+    def contains(self, url=None, content_hash=None):
+        return url in self.urls
+
+
+def test_search_page_drops_seen_articles_after_redirect(tmp_path):
+    crawler = make_crawler(tmp_path)
+    crawler.seen_index = FakeSeenIndex(['https://www.ctee.com.tw/news/20240101700002-430301'])
+
+    def fetch(url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(b'')
+        if url.startswith('https://news.google.com/'):
+            response.url = 'https://www.ctee.com.tw/news/20240101700002-430301'
+        else:
+            response.url = url
+            response._content = load_fixture('google_news_modern.html').encode('utf-8')
+            response.headers['Content-Type'] = 'text/html; charset=UTF-8'
+        return response
+
+    crawler._fetch = fetch
+    items = crawler._search_page(('台新人壽', 0))
+
+    # 轉址前的 news.google.com 網址不在索引中，轉址後才能辨識為已處理
+    assert [item.url for item in items] == ['https://news.cnyes.com/news/id/5500001']
+
+
+def test_parse_results_keeps_cards_without_time(tmp_path):
+    crawler = make_crawler(tmp_path)
+    cards = [('https://news.example/1', '壽險新聞', ['壽險新聞', '測試日報'])]
+
+    items = crawler.parse_results(cards, '壽險', now=NOW)
+
+    assert items[0].published_time == NOW
+    assert items[0].content == '壽險新聞'
+
+
+def test_resolve_link(tmp_path):
+    crawler = make_crawler(tmp_path)
+
+    assert crawler._resolve_link('/url?q=https://ec.ltn.com.tw/article/1&sa=U&ved=x') == 'https://ec.ltn.com.tw/article/1'
+    assert crawler._resolve_link('https://www.google.com/url?url=https://news.example/a&sa=t') == 'https://news.example/a'
+    assert crawler._resolve_link('https://news.cnyes.com/news/id/1') == 'https://news.cnyes.com/news/id/1'
+    assert crawler._resolve_link('https://news.google.com/rss/articles/abc').startswith('https://news.google.com/')
+    # Google站內連結與指向站內的轉址都不是新聞
+    assert crawler._resolve_link('/search?q=test&tbm=nws') is None
+    assert crawler._resolve_link('https://www.google.com/search?q=test&tbm=isch') is None
+    assert crawler._resolve_link('/url?q=/search%3Fq%3Dinternal&sa=U') is None
+    assert crawler._resolve_link('https://maps.google.com/maps?q=taipei') is None
+
+
+@pytest.mark.parametrize('time_period, expected', [
+    ('1d', 'qdr:d'),
+    ('d', 'qdr:d'),
+    ('7d', 'qdr:d7'),
+    ('12h', 'qdr:h12'),
+    ('1w', 'qdr:w'),
+    ('3m', 'qdr:m3'),
+    ('invalid', 'qdr:d'),
+])
+def test_time_filter(tmp_path, time_period, expected):
+    assert make_crawler(tmp_path, time_period=time_period)._time_filter() == expected
@@ -0,0 +1,139 @@
+import os
+
+import requests
+
+from src.crawler import http_cache
+from src.crawler.http_cache import HttpCache
+from src.crawler.http_client import HttpClient
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_response(body, status_code=200, **headers):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response._content_consumed = True
+    response.headers.update(headers)
+    return response
+
+
+def make_cache(tmp_path, monkeypatch, **kwargs):
+    clock = Clock()
+    monkeypatch.setattr(http_cache.time, 'time', clock)
+    return HttpCache(str(tmp_path / 'http_cache.sqlite3'), **kwargs), clock
+
+
+def test_freshness_depends_on_kind(tmp_path, monkeypatch):
+    cache, clock = make_cache(tmp_path, monkeypatch, ttls={'list': 60, 'article': 3600})
+    cache.store('https://news.example/a', make_response(b'body', **{'Content-Type': 'text/html'}), 'article')
+
+    clock.now += 120
+    entry = cache.lookup('https://news.example/a')
+    assert entry.body == b'body'
+    assert entry.headers == {'Content-Type': 'text/html'}
+    assert cache.is_fresh(entry, 'article')
+    assert not cache.is_fresh(entry, 'list')
+    assert not cache.is_fresh(entry, 'unknown')
+
+    clock.now += 3600
+    assert not cache.is_fresh(cache.lookup('https://news.example/a'), 'article')
+
+
+def test_refresh_extends_freshness(tmp_path, monkeypatch):
+    cache, clock = make_cache(tmp_path, monkeypatch, ttls={'list': 60})
+    cache.store('https://news.example/list', make_response(b'v1', ETag='"v1"'), 'list')
+
+    clock.now += 120
+    entry = cache.lookup('https://news.example/list')
+    assert not cache.is_fresh(entry, 'list')
+    assert cache.validators(entry) == {'If-None-Match': '"v1"'}
+
+    cache.refresh(entry)
+    assert cache.is_fresh(cache.lookup('https://news.example/list'), 'list')
+
+
+def test_uncacheable_responses_are_not_stored(tmp_path, monkeypatch):
+    cache, _ = make_cache(tmp_path, monkeypatch)
+    cache.store('https://news.example/missing', make_response(b'gone', status_code=404), 'article')
+    cache.store('https://news.example/private', make_response(b'secret', **{'Cache-Control': 'no-store'}), 'article')
+
+    assert cache.lookup('https://news.example/missing') is None
+    assert cache.lookup('https://news.example/private') is None
+
+
+def test_lookup_uses_normalized_url(tmp_path, monkeypatch):
+    cache, _ = make_cache(tmp_path, monkeypatch)
+    cache.store('https://News.Example/a?utm_source=line', make_response(b'body'), 'article')
+
+    assert cache.lookup('https://news.example/a#top').body == b'body'
+
+
+def test_identical_bodies_are_stored_once(tmp_path, monkeypatch):
+    cache, _ = make_cache(tmp_path, monkeypatch)
+    body = os.urandom(2000)
+    cache.store('https://news.example/a', make_response(body), 'article')
+    size = cache._total_bytes
+    cache.store('https://mirror.example/a', make_response(body), 'article')
+
+    assert cache._total_bytes == size
+
+    # 原網址改存其他內文後，共用的內文仍由另一個網址引用
+    cache.store('https://news.example/a', make_response(b'updated'), 'article')
+    assert cache.lookup('https://mirror.example/a').body == body
+
+
+def test_evicts_least_recently_used(tmp_path, monkeypatch):
+    cache, clock = make_cache(tmp_path, monkeypatch, max_bytes=10_000)
+    for name in ['a', 'b', 'c']:
+        clock.now += 1
+        cache.store(f'https://news.example/{name}', make_response(os.urandom(3000)), 'article')
+
+    # 讀取a使其成為最近使用，超出容量時改淘汰b
+    clock.now += 1
+    cache.lookup('https://news.example/a')
+    clock.now += 1
+    cache.store('https://news.example/d', make_response(os.urandom(3000)), 'article')
+
+    assert cache.lookup('https://news.example/b') is None
+    assert cache.lookup('https://news.example/a') is not None
+    assert cache.lookup('https://news.example/d') is not None
+    assert cache._total_bytes <= 10_000 * 0.9
+
+    # 重新開啟時由資料庫還原容量統計
+    reopened = HttpCache(str(tmp_path / 'http_cache.sqlite3'), max_bytes=10_000)
+    assert reopened._total_bytes == cache._total_bytes
+
+
+def test_client_serves_fresh_entries_and_revalidates_stale_ones(tmp_path, monkeypatch):
+    client = HttpClient({'state_dir': str(tmp_path), 'http_cache': {'ttl_seconds': {'list': 60}}})
+    clock = Clock()
+    monkeypatch.setattr(http_cache.time, 'time', clock)
+    sent = []
+
+    def request(url, headers, timeout, cancel_event, **kwargs):
+        sent.append(headers)
+        if len(sent) == 1:
+            return make_response(b'list page', ETag='"v1"')
+        return make_response(b'', status_code=304)
+
+    monkeypatch.setattr(client, '_request', request)
+    url = 'https://news.example/list'
+
+    assert client.get(url, kind='list').content == b'list page'
+    assert client.is_cached(url, 'list')
+    assert client.get(url, kind='list').content == b'list page'
+    assert len(sent) == 1
+
+    clock.now += 120
+    assert not client.is_cached(url, 'list')
+    response = client.get(url, kind='list')
+    assert response.content == b'list page'
+    assert sent[-1]['If-None-Match'] == '"v1"'
+    assert client.is_cached(url, 'list')
@@ -0,0 +1,46 @@
+from src.crawler.keyword_matcher import KeywordMatcher
+from src.notification.subscribers import SubscriberRegistry
+
+
+def test_find_matches_nested_keywords_in_priority_order():
+    matcher = KeywordMatcher({'company': ['新光人壽'], 'brand': ['新光'], 'insurance': ['保險', '壽險']})
+
+    assert matcher.find("新光人壽推出壽險新商品") == {'新光人壽': 'company', '新光': 'brand', '壽險': 'insurance'}
+    assert matcher.best_match("新光人壽推出壽險新商品") == ('新光人壽', 'company')
+    assert matcher.tiers_in("保險業動態") == {'insurance'}
+
+
+def test_results_agree_with_substring_checks():
+    keywords = ['新光', '新光人壽', '人壽', '壽險', '險', 'ETF']
+    matcher = KeywordMatcher(keywords)
+    for text in ["新光人壽壽險", "台新金控", "保險ETF與etf", ""]:
+        expected = {keyword for keyword in keywords if keyword.lower() in text.lower()}
+        assert set(matcher.find(text)) == expected
+        assert matcher.contains_any(text) == bool(expected)
+
+
+def test_ignore_case_and_first_tier_wins():
+    matcher = KeywordMatcher({'primary': ['ETF'], 'secondary': ['etf', '基金']})
+
+    assert matcher.find("高股息etf") == {'ETF': 'primary'}
+    assert KeywordMatcher(['ETF'], ignore_case=False).find("etf") == {}
+
+
+def test_empty_matcher():
+    matcher = KeywordMatcher([])
+
+    assert matcher.find("保險") == {}
+    assert matcher.best_match("保險") is None
+    assert not matcher.contains_any("保險")
+
+
+def test_subscriber_keywords_differing_by_case_share_a_mask():
+    registry = SubscriberRegistry({'U1': ['ETF'], 'U2': ['etf'], 'U3': ['壽險']})
+    news_items = [
+        {'title': '高股息ETF受捧', 'summary': '', 'keyword': ''},
+        {'title': '壽險業獲利成長', 'summary': '', 'keyword': ''},
+    ]
+
+    plan = {tuple(user_ids): [item['title'] for item in items] for user_ids, items in registry.plan(news_items)}
+
+    assert plan == {('U1', 'U2'): ['高股息ETF受捧'], ('U3',): ['壽險業獲利成長']}
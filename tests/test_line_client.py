@@ -0,0 +1,116 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.notification.line_client import LineApiError, LineClient
+from src.notification.line_notifier import LineNotifier
+
+
+class StubLineServer:
+    """本機的LINE API替身：依序回應預先排定的狀態碼，並記錄收到的請求"""
+
+    def __init__(self):
+        self.responses = []  # (狀態碼, 標頭, 內容)，用完後一律回應200
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                stub.requests.append((self.path, dict(self.headers), json.loads(self.rfile.read(length))))
+                status, headers, body = stub.responses.pop(0) if stub.responses else (200, {}, {})
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubLineServer()
+    yield server
+    server.close()
+
+
+def make_client(stub):
+    return LineClient("token", {'api_base_url': stub.url, 'max_retries': 3, 'backoff_base': 0.01, 'backoff_max': 0.05})
+
+
+def test_retries_server_errors_and_429_with_one_retry_key(stub):
+    stub.responses = [
+        (500, {}, {'message': 'internal error'}),
+        (429, {'Retry-After': '0'}, {'message': 'rate limited'}),
+        (200, {}, {}),
+    ]
+    make_client(stub).broadcast([{'type': 'text', 'text': 'hi'}])
+
+    assert len(stub.requests) == 3
+    assert len({headers['X-Line-Retry-Key'] for _, headers, _ in stub.requests}) == 1
+    assert all(path == '/v2/bot/message/broadcast' for path, _, _ in stub.requests)
+
+
+def test_409_means_already_accepted(stub):
+    stub.responses = [(409, {}, {'message': 'The retry key is already accepted'})]
+    make_client(stub).push("U1", [{'type': 'text', 'text': 'hi'}], retry_key="fixed-key")
+
+    assert len(stub.requests) == 1
+
+
+def test_monthly_limit_is_not_retried(stub):
+    stub.responses = [(429, {}, {'message': 'You have reached your monthly limit.'})]
+    with pytest.raises(LineApiError) as error:
+        make_client(stub).broadcast([{'type': 'text', 'text': 'hi'}])
+
+    assert error.value.status_code == 429
+    assert len(stub.requests) == 1
+
+
+def test_multicast_is_chunked_at_500_recipients(stub, tmp_path):
+    notifier = LineNotifier({
+        'channel_access_token': 'token',
+        'api_base_url': stub.url,
+        'broadcast_enabled': False,
+        'subscribers': [{'user_id': f"U{index}"} for index in range(1201)],
+        'state_dir': str(tmp_path),
+        'outbox': {'enabled': False},
+    })
+    news_items = [{'title': '壽險新聞', 'summary': '摘要', 'url': 'https://news.example/1',
+                   'source': '測試', 'keyword': '保險', 'published_time': '2024-01-01 09:00'}]
+
+    assert notifier.send_news_summary(news_items).sent
+    assert [len(body['to']) for _, _, body in stub.requests] == [500, 500, 201]
+    assert all(path == '/v2/bot/message/multicast' for path, _, _ in stub.requests)
+
+
+def test_send_reports_whether_the_batch_was_queued(stub, tmp_path):
+    news_items = [{'title': '壽險新聞', 'summary': '摘要', 'url': 'https://news.example/1',
+                   'source': '測試', 'keyword': '保險', 'published_time': '2024-01-01 09:00'}]
+    config = {'api_base_url': stub.url, 'state_dir': str(tmp_path), 'max_retries': 0}
+
+    # 未設定token時不會寫入佇列
+    result = LineNotifier(dict(config, channel_access_token=None)).send_news_summary(news_items)
+    assert (result.sent, result.queued) == (False, False)
+
+    # 發送失敗的批次保留在佇列中
+    stub.responses = [(500, {}, {'message': 'internal error'})]
+    notifier = LineNotifier(dict(config, channel_access_token='token'))
+    result = notifier.send_news_summary(news_items)
+    assert (result.sent, result.queued) == (False, True)
+    assert len(notifier.outbox.pending()) == 1
@@ -0,0 +1,87 @@
+import json
+from datetime import datetime
+
+from src.notification.message_packer import (
+    MAX_ALT_TEXT_LENGTH, MAX_CAROUSEL_BUBBLES, MAX_FLEX_BYTES, MessagePacker
+)
+
+NOW = datetime(2024, 5, 1, 8, 0)
+
+
+def make_item(index, summary='新光人壽推出新的醫療險商品，保障範圍擴大。', url=None):
+    return {
+        'title': f'保險新聞{index}',
+        'summary': summary,
+        'url': url or f'https://news.example/{index}',
+        'source': '經濟日報',
+        'keyword': '保險',
+        'published_time': '2024-05-01 07:00',
+    }
+
+
+def test_empty_input_makes_no_calls():
+    assert MessagePacker({}).pack([], NOW) == []
+
+
+def test_text_messages_respect_length_limit_and_keep_order():
+    packer = MessagePacker({'max_message_length': 300})
+    calls = packer.pack([make_item(index) for index in range(1, 31)], NOW)
+
+    messages = [message for call in calls for message in call]
+    assert all(len(call) <= 5 for call in calls)
+    assert all(message['type'] == 'text' and len(message['text']) <= 300 for message in messages)
+
+    text = ''.join(message['text'] for message in messages)
+    positions = [text.index(f'保險新聞{index}\n') for index in range(1, 31)]
+    assert positions == sorted(positions)
+    assert messages[0]['text'].startswith('📰 今日金融保險新聞摘要 (30則)')
+    assert messages[-1]['text'].endswith('2024-05-01 08:00')
+
+
+def test_few_items_fit_in_one_message():
+    calls = MessagePacker({}).pack([make_item(1), make_item(2)], NOW)
+    assert len(calls) == 1 and len(calls[0]) == 1
+
+
+def test_oversized_item_is_truncated():
+    packer = MessagePacker({'max_message_length': 200})
+    calls = packer.pack([make_item(1, summary='很長的摘要' * 100), make_item(2)], NOW)
+
+    messages = [message for call in calls for message in call]
+    assert all(len(message['text']) <= 200 for message in messages)
+    # 標題列不單獨佔用一則訊息
+    assert messages[0]['text'].startswith('📰 今日金融保險新聞摘要 (2則)\n\n1. 【保險】')
+    assert messages[0]['text'].count('...') == 1
+    assert any('保險新聞2' in message['text'] for message in messages)
+
+
+def test_calls_are_capped_by_configured_messages_per_call():
+    packer = MessagePacker({'max_message_length': 200, 'max_messages_per_call': 9})
+    calls = packer.pack([make_item(index) for index in range(1, 31)], NOW)
+    # LINE每次呼叫最多5則，設定值不得超過
+    assert max(len(call) for call in calls) == 5
+
+
+def test_flex_carousels_respect_bubble_and_size_limits():
+    packer = MessagePacker({'message_format': 'flex'})
+    items = [make_item(index, summary='摘要' * 400) for index in range(1, 41)]
+    calls = packer.pack(items, NOW)
+
+    messages = [message for call in calls for message in call]
+    carousels = [message['contents']['contents'] for message in messages]
+    assert sum(len(bubbles) for bubbles in carousels) == 40
+    for message, bubbles in zip(messages, carousels):
+        assert len(bubbles) <= MAX_CAROUSEL_BUBBLES
+        assert len(json.dumps(bubbles, ensure_ascii=False).encode('utf-8')) <= MAX_FLEX_BYTES
+        assert len(message['altText']) <= MAX_ALT_TEXT_LENGTH
+    # 大型泡泡使輪播提早分割
+    assert len(carousels) > 40 // MAX_CAROUSEL_BUBBLES + 1
+
+
+def test_flex_bubble_drops_overlong_link():
+    packer = MessagePacker({'message_format': 'flex'})
+    calls = packer.pack([make_item(1), make_item(2, url='https://news.example/' + 'a' * 1000)], NOW)
+
+    bubbles = calls[0][0]['contents']['contents']
+    assert bubbles[0]['footer']['contents'][0]['action']['uri'] == 'https://news.example/1'
+    assert 'footer' not in bubbles[1]
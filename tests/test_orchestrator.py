@@ -0,0 +1,85 @@
+import threading
+import time
+from datetime import datetime
+
+from src.crawler.base_crawler import NewItem
+from src.crawler.orchestrator import SourceOrchestrator
+
+
+def make_item(name):
+    return NewItem(name, '內容', f'https://news.example/{name}', datetime.now(), '測試', '保險')
+
+
+class FakeCrawler:
+    """依類別屬性產出新聞的測試爬蟲"""
+
+    items = []
+    block_after = False   # 產出後等待取消
+    fail_after = False    # 產出後拋出例外
+    produced = 0
+
+    def __init__(self, config):
+        self._cancel_event = threading.Event()
+
+    def iter_crawl(self):
+        for name in self.items:
+            type(self).produced += 1
+            yield make_item(name)
+        if self.block_after:
+            self._cancel_event.wait(5)
+        if self.fail_after:
+            raise RuntimeError('來源故障')
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+
+def make_source(**attributes):
+    return type('Source', (FakeCrawler,), dict(attributes, produced=0))
+
+
+def test_deadline_cancels_source_and_keeps_its_items():
+    fast = make_source(items=['f1', 'f2'])
+    slow = make_source(items=['s1'], block_after=True)
+    orchestrator = SourceOrchestrator(
+        {'sources': ['fast', 'slow'], 'source_timeouts': {'slow': 0.3}},
+        {'fast': fast, 'slow': slow}
+    )
+
+    started = time.monotonic()
+    results = sorted((source, item.title) for source, item in orchestrator.iter_sourced_items())
+
+    assert time.monotonic() - started < 2
+    assert results == [('fast', 'f1'), ('fast', 'f2'), ('slow', 's1')]
+    assert orchestrator.completed_sources == {'fast'}
+
+
+def test_failed_source_is_not_completed():
+    broken = make_source(items=['b1'], fail_after=True)
+    orchestrator = SourceOrchestrator({'sources': ['broken']}, {'broken': broken})
+
+    assert [item.title for item in orchestrator.iter_items()] == ['b1']
+    assert orchestrator.completed_sources == set()
+
+
+def test_bounded_queue_applies_backpressure():
+    names = [f'n{index}' for index in range(20)]
+    busy = make_source(items=names)
+    orchestrator = SourceOrchestrator({'sources': ['busy'], 'stream_queue_size': 2}, {'busy': busy})
+
+    stream = orchestrator.iter_items()
+    assert next(stream).title == 'n0'
+    time.sleep(0.3)
+    # 消費端停下時，爬蟲最多多產出佇列容量加上手中的一則
+    assert busy.produced <= 1 + 2 + 1
+
+    assert [item.title for item in stream] == names[1:]
+    assert orchestrator.completed_sources == {'busy'}
+
+
+def test_unknown_sources_are_ignored():
+    orchestrator = SourceOrchestrator({'sources': ['missing']}, {})
+    assert list(orchestrator.iter_items()) == []
@@ -0,0 +1,115 @@
+import pytest
+
+from src.notification import outbox as outbox_module
+from src.notification.line_client import LineApiError
+from src.notification.line_notifier import LineNotifier
+from src.notification.outbox import Outbox
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(outbox_module.time, 'time', clock)
+    return clock
+
+
+def make_deliveries(count):
+    return [{'mode': 'broadcast', 'to': None, 'messages': [{'type': 'text', 'text': f'訊息{index}'}],
+             'retry_key': f'key-{index}'} for index in range(count)]
+
+
+def test_pending_batches_keep_enqueue_order(tmp_path, clock):
+    outbox = Outbox(str(tmp_path / 'outbox.sqlite3'))
+    assert outbox.enqueue(make_deliveries(3)) == 3
+
+    batches = outbox.pending()
+    assert [batch['retry_key'] for batch in batches] == ['key-0', 'key-1', 'key-2']
+    assert batches[0]['messages'] == [{'type': 'text', 'text': '訊息0'}]
+    assert batches[0]['to'] is None
+
+    outbox.mark_sent(batches[0]['id'])
+    assert [batch['retry_key'] for batch in outbox.pending()] == ['key-1', 'key-2']
+    assert outbox.counts() == {'sent': 1, 'pending': 2}
+
+
+def test_failures_are_retried_until_max_attempts(tmp_path, clock):
+    outbox = Outbox(str(tmp_path / 'outbox.sqlite3'), max_attempts=2)
+    outbox.enqueue(make_deliveries(2))
+    first, second = outbox.pending()
+
+    outbox.mark_failed(first['id'], '500 internal error')
+    assert [batch['attempts'] for batch in outbox.pending()] == [1, 0]
+
+    outbox.mark_failed(first['id'], '500 internal error')
+    outbox.mark_failed(second['id'], '400 bad request', permanent=True)
+    assert outbox.pending() == []
+    assert outbox.counts() == {'failed': 2}
+
+
+def test_batches_expire_with_the_retry_key(tmp_path, clock):
+    # 設定值不得超過重試鍵的24小時有效期
+    outbox = Outbox(str(tmp_path / 'outbox.sqlite3'), max_age_hours=48)
+    outbox.enqueue(make_deliveries(1))
+
+    clock.now += 23 * 3600
+    assert len(outbox.pending()) == 1
+
+    clock.now += 2 * 3600
+    assert outbox.pending() == []
+    assert outbox.counts() == {'expired': 1}
+
+
+def test_purge_keeps_pending_and_recent_batches(tmp_path, clock):
+    path = str(tmp_path / 'outbox.sqlite3')
+    outbox = Outbox(path, retention_days=7)
+    outbox.enqueue(make_deliveries(2))
+    outbox.mark_sent(outbox.pending()[0]['id'])
+
+    clock.now += 6 * 86400
+    assert outbox.purge() == 0
+
+    clock.now += 2 * 86400
+    outbox.enqueue(make_deliveries(1))
+    # 重新開啟時清除保留期限外已結束的批次；待發送的批次不論新舊都保留
+    reopened = Outbox(path, retention_days=7)
+    assert reopened.counts() == {'pending': 2}
+
+
+def make_notifier(tmp_path, failures):
+    notifier = LineNotifier({'channel_access_token': 'token', 'state_dir': str(tmp_path)})
+    delivered = []
+
+    def deliver(batch):
+        error = failures.get(batch['retry_key'])
+        if error:
+            raise error
+        delivered.append(batch['retry_key'])
+
+    notifier.deliver = deliver
+    return notifier, delivered
+
+
+def test_transient_failure_stops_delivery_to_keep_order(tmp_path, clock):
+    notifier, delivered = make_notifier(tmp_path, {'key-1': LineApiError(503, 'busy')})
+    notifier.outbox.enqueue(make_deliveries(3))
+
+    assert not notifier.deliver_pending()
+    assert delivered == ['key-0']
+    assert [batch['retry_key'] for batch in notifier.outbox.pending()] == ['key-1', 'key-2']
+
+
+def test_permanent_failure_skips_to_the_next_batch(tmp_path, clock):
+    notifier, delivered = make_notifier(tmp_path, {'key-0': LineApiError(400, 'invalid')})
+    notifier.outbox.enqueue(make_deliveries(2))
+
+    assert not notifier.deliver_pending()
+    assert delivered == ['key-1']
+    assert notifier.outbox.counts() == {'failed': 1, 'sent': 1}
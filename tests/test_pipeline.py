@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from src.crawler.base_crawler import NewItem
+from src.pipeline import TopKSelector, select_top_k
+
+NOW = datetime(2024, 5, 1, 8, 0)
+
+
+def make_item(name, score, content='內容'):
+    return NewItem(name, content, f'https://news.example/{name}', NOW, '測試', '保險', priority_score=score)
+
+
+def titles(items):
+    return [item.title for item in items]
+
+
+def test_keeps_top_k_by_score():
+    items = [make_item(f'n{score}', score) for score in [3, 9, 1, 7, 5, 8]]
+    selected = select_top_k(enumerate(items), 3)
+    assert titles(selected) == ['n9', 'n8', 'n7']
+
+
+def test_one_item_per_cluster():
+    selector = TopKSelector(2)
+    selector.push(1, make_item('a', 5))
+    selector.push(1, make_item('a-better', 6))
+    selector.push(1, make_item('a-worse', 4))
+    selector.push(2, make_item('b', 3))
+    assert titles(selector.results()) == ['a-better', 'b']
+    assert selector.seen_count == 4
+
+
+def test_replaced_cluster_leader_does_not_leak_back():
+    selector = TopKSelector(2)
+    selector.push(1, make_item('a', 1))
+    selector.push(1, make_item('a-better', 10))
+    selector.push(2, make_item('b', 5))
+    # 新群組擠掉的應是目前最低分的b，而非已被取代的舊版本a
+    selector.push(3, make_item('c', 6))
+    assert titles(selector.results()) == ['a-better', 'c']
+
+
+def test_ties_prefer_longer_content():
+    selector = TopKSelector(1)
+    selector.push(1, make_item('short', 5, '短'))
+    selector.push(2, make_item('long', 5, '較長的內容'))
+    assert titles(selector.results()) == ['long']
+
+
+def test_heap_stays_bounded():
+    selector = TopKSelector(3)
+    for score in range(100):
+        selector.push(score % 2, make_item(f'n{score}', score))
+    assert len(selector._heap) <= 6
+    assert titles(selector.results()) == ['n99', 'n98']
+
+
+def test_zero_k_selects_nothing():
+    selector = TopKSelector(0)
+    selector.push(1, make_item('a', 5))
+    assert selector.results() == []
+    assert selector.seen_count == 1
@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+from src.crawler.rss_crawler import RssCrawler
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content.encode('utf-8')
+        self.status_code = status_code
+        self.headers = {'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+
+
+def make_feed(entries):
+    now = format_datetime(datetime.now(timezone.utc))
+    items = "".join(
+        f"<item><guid>{guid}</guid><title>{title}</title><link>https://news.example/{guid}</link>"
+        f"<pubDate>{now}</pubDate><description>{body}</description></item>"
+        for guid, title, body in entries
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>測試</title>{items}</channel></rss>'
+
+
+def make_crawler(tmp_path):
+    return RssCrawler({
+        'search_terms': ['保險'],
+        'state_dir': str(tmp_path),
+        'seen_index': {'enabled': False},
+        'rss_feeds': ['https://feed.example/rss'],
+    })
+
+
+def test_candidate_entries_are_not_remembered(tmp_path):
+    crawler = make_crawler(tmp_path)
+    feed = make_feed([
+        ('irrelevant', '台積電法說會', '半導體新聞' * 20),
+        ('excluded', '保險股股價大漲', '保險類股股價今日走高' * 10),
+        ('candidate', '壽險業者推出新保單', '保險業者推出新的醫療險保單' * 10),
+    ])
+    requests_headers = []
+
+    def fetch(url, headers=None, **kwargs):
+        requests_headers.append(headers)
+        return FakeResponse(feed)
+
+    crawler._fetch = fetch
+    items = crawler._parse_feed('https://feed.example/rss')
+
+    assert [item.url for item in items] == ['https://news.example/candidate']
+    state = crawler.feed_state.get('https://feed.example/rss')
+    assert state['seen_ids'] == ['irrelevant', 'excluded']
+    assert state['pending_ids'] == ['candidate']
+    assert state['etag'] == '"v1"'
+
+    # 仍有未摘要的候選條目時完整下載，避免被304略過
+    crawler._parse_feed('https://feed.example/rss')
+    assert 'If-None-Match' not in requests_headers[-1]
+
+
+def test_settled_feed_keeps_validators(tmp_path):
+    crawler = make_crawler(tmp_path)
+    feed = make_feed([('irrelevant', '台積電法說會', '半導體新聞' * 20)])
+    crawler._fetch = lambda url, **kwargs: FakeResponse(feed)
+
+    assert crawler._parse_feed('https://feed.example/rss') == []
+    state = crawler.feed_state.get('https://feed.example/rss')
+    assert state['etag'] == '"v1"'
+    assert state['seen_ids'] == ['irrelevant']
+    assert state['pending_ids'] == []
+
+    requests_headers = []
+    crawler._fetch = lambda url, headers=None, **kwargs: requests_headers.append(headers) or FakeResponse(feed, 304)
+    assert crawler._parse_feed('https://feed.example/rss') == []
+    assert requests_headers[-1]['If-None-Match'] == '"v1"'
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from src.crawler.base_crawler import NewItem
+from src.crawler.seen_index import SeenIndex, UNAVAILABLE_CONTENT
+from src.pipeline import filter_seen
+
+
+def make_item(url, content, body_fetched=False):
+    return NewItem(
+        title="標題", content=content, url=url, published_time=datetime.now(),
+        source="測試", keyword="", body_fetched=body_fetched
+    )
+
+
+def test_placeholder_and_empty_content_match_by_url_only(tmp_path):
+    index = SeenIndex(str(tmp_path / "seen.sqlite3"))
+    for item in (make_item("https://a.example/1", UNAVAILABLE_CONTENT, body_fetched=True),
+                 make_item("https://a.example/2", "")):
+        index.mark_keys(item.canonical_url, item.identity_hash())
+
+    fresh = [make_item("https://b.example/1", UNAVAILABLE_CONTENT), make_item("https://b.example/2", "")]
+    assert list(filter_seen(fresh, index)) == fresh
+
+    repeat = [make_item("https://a.example/1?utm_source=x", UNAVAILABLE_CONTENT)]
+    assert list(filter_seen(repeat, index)) == []
+
+
+def test_real_content_matches_across_urls(tmp_path):
+    index = SeenIndex(str(tmp_path / "seen.sqlite3"))
+    body = "保險業者公布第三季財報，" * 10
+    item = make_item("https://a.example/story", body)
+    index.mark_keys(item.canonical_url, item.identity_hash())
+
+    assert list(filter_seen([make_item("https://b.example/copy", body)], index)) == []
+
+
+def test_short_content_needs_fetched_body_to_be_hashed():
+    assert make_item("https://a.example/1", "短內容").identity_hash() is None
+    assert make_item("https://a.example/1", "短內容", body_fetched=True).identity_hash() is not None
+
+
+def test_marks_purge_expired_keys_from_memory(tmp_path):
+    index = SeenIndex(str(tmp_path / "seen.sqlite3"), ttl_hours=1, purge_every=2)
+    index.mark("https://a.example/old", "舊文章內容" * 20)
+    index._conn.execute("UPDATE seen SET last_seen = 0")
+    index._conn.commit()
+
+    index.mark("https://a.example/new-1")
+    index.mark("https://a.example/new-2")
+
+    assert not index.contains(url="https://a.example/old")
+    assert not index.contains(content="舊文章內容" * 20)
+    assert index.contains(url="https://a.example/new-2")
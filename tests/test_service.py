@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from src.crawler.base_crawler import BaseCrawler, NewItem
+from src.service import NewsService
+
+
+class FailingCrawler(BaseCrawler):
+    def crawl(self):
+        raise RuntimeError("feed unavailable")
+
+
+class StaticCrawler(BaseCrawler):
+    def crawl(self):
+        return [NewItem("壽險新聞", "保險業者推出新保單" * 10, "https://news.example/1",
+                        datetime.now(), "測試", "保險")]
+
+
+def make_service(tmp_path, crawler_class, token=None):
+    config = {
+        'crawler': {
+            'sources': ['rss'],
+            'search_terms': ['保險'],
+            'state_dir': str(tmp_path),
+            'seen_index': {'enabled': False},
+        },
+        'line_notify': {'channel_access_token': token, 'state_dir': str(tmp_path), 'outbox': {'enabled': False}},
+        'summarizer': {},
+        'service': {'digest_minutes': 60},
+    }
+    service = NewsService(config, {'rss': crawler_class})
+    service._get_summarizer = lambda: None
+    return service
+
+
+def test_failed_source_keeps_its_watermark(tmp_path):
+    service = make_service(tmp_path, FailingCrawler)
+    service.poll(['rss'], now=1000.0)
+
+    source_state = service._source_state('rss')
+    assert source_state['attempted'] == 1000.0
+    assert 'watermark' not in source_state
+
+
+def test_completed_source_advances_its_watermark(tmp_path):
+    service = make_service(tmp_path, StaticCrawler)
+    service.poll(['rss'], now=1000.0)
+
+    assert service._source_state('rss')['watermark'] == 1000.0
+    assert len(service._load_pending()) == 1
+
+
+def test_undelivered_digest_keeps_pending_items(tmp_path):
+    service = make_service(tmp_path, StaticCrawler)
+    service.poll(['rss'], now=1000.0)
+
+    # 未設定token時無法發送，候選新聞保留至下次摘要
+    service.digest(now=2000.0)
+    assert [item.url for item in service._load_pending()] == ['https://news.example/1']
@@ -0,0 +1,23 @@
+from src.summarizer.summary_cache import SummaryCache
+from src.summarizer.text_summarizer import TextSummarizer
+
+
+def test_put_enforces_max_entries(tmp_path):
+    cache = SummaryCache(str(tmp_path / "summaries.sqlite3"), max_entries=3, purge_every=2)
+    for index in range(10):
+        cache.put(f"key-{index}", f"摘要{index}")
+
+    count = cache._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+    assert count <= 3
+    assert cache.get("key-9") == "摘要9"
+
+
+def test_cache_key_depends_on_abstractive_model(tmp_path):
+    def make(model_name):
+        return TextSummarizer({
+            'type': 'abstractive', 'state_dir': str(tmp_path),
+            'abstractive': {'model_name': model_name}
+        })
+
+    content = "新光人壽推出新的醫療險保單，保障範圍擴大。"
+    assert make("model-a")._cache_key(content) != make("model-b")._cache_key(content)